@@ -1,10 +1,17 @@
+import abc
+import collections
 import contextlib
 import logging
-import logging.config
 import os
+import random
+import threading
 import time
-from collections.abc import Callable
+from collections.abc import (
+    Callable,
+    Iterator,
+)
 from typing import (
+    Any,
     TypeVar,
 )
 
@@ -24,8 +31,22 @@ try:
 except Exception:
     CHUNK_SIZE = 4096
 
+# default chunk size (in bytes) for streaming large archives to disk
+STREAM_CHUNK_SIZE = 1024**2
+
+
+def __getattr__(name: str) -> Any:
+    # The library-wide configuration is read from the config files only when
+    # first accessed, to keep ``import bioblend`` fast
+    if name == "config":
+        config = globals()["config"] = Config()
+        return config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-config = Config()
+
+# Importing bioblend.config above bound the submodule to the ``config`` name,
+# which would shadow the lazily created configuration
+globals().pop("config", None)
 
 
 def get_version() -> str:
@@ -40,8 +61,13 @@ def init_logging() -> None:
     Initialize BioBlend's logging from a configuration file.
     """
     for config_file in BioBlendConfigLocations:
-        with contextlib.suppress(Exception):
-            logging.config.fileConfig(os.path.expanduser(config_file))
+        config_file = os.path.expanduser(config_file)
+        # avoid importing logging.config if there is no configuration file
+        if os.path.exists(config_file):
+            import logging.config
+
+            with contextlib.suppress(Exception):
+                logging.config.fileConfig(config_file)
 
 
 class NullHandler(logging.Handler):
@@ -126,7 +152,173 @@ class NotReady(Exception):
 T = TypeVar("T")
 
 
-def wait_on(func: Callable[[], T], maxwait: float = 60, interval: float = 3) -> T:
+class PollingStrategy(abc.ABC):
+    """
+    Base class for the strategies used to compute the time to wait between 2
+    consecutive checks when polling for the state of a Galaxy object.
+
+    Subclasses must implement the :meth:`intervals` method. An instance of a
+    polling strategy can be passed as the ``interval`` argument of
+    :func:`wait_on` and of the ``wait_for_*()`` methods of the Galaxy clients.
+    """
+
+    def __init__(self, jitter: float = 0) -> None:
+        """
+        :type jitter: float
+        :param jitter: Fraction of each interval to randomly add or subtract,
+          e.g. ``0.1`` means that each interval is randomly increased or
+          decreased by up to 10%. This avoids many clients polling in lockstep.
+        """
+        assert 0 <= jitter < 1
+        self.jitter = jitter
+
+    @abc.abstractmethod
+    def intervals(self) -> Iterator[float]:
+        """
+        Return an iterator over the successive times (in seconds) to wait
+        between 2 consecutive checks of a single wait operation.
+        """
+
+    def record(self, elapsed: float) -> None:  # noqa: B027  # optional for subclasses
+        """
+        Record that a wait operation using this strategy has completed.
+
+        :type elapsed: float
+        :param elapsed: Time (in seconds) taken by the operation, from the
+          first check until it completed.
+        """
+
+    def _jittered(self, interval: float) -> float:
+        if self.jitter:
+            interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return interval
+
+
+class FixedInterval(PollingStrategy):
+    """
+    Wait a fixed time between 2 consecutive checks.
+    """
+
+    def __init__(self, interval: float = 3, jitter: float = 0) -> None:
+        """
+        :type interval: float
+        :param interval: Time (in seconds) to wait between 2 consecutive checks.
+        """
+        assert interval > 0
+        super().__init__(jitter=jitter)
+        self.interval = interval
+
+    def intervals(self) -> Iterator[float]:
+        while True:
+            yield self._jittered(self.interval)
+
+
+class ExponentialBackoff(PollingStrategy):
+    """
+    Multiply the time to wait between 2 consecutive checks by a constant
+    factor after each check, up to a maximum.
+    """
+
+    def __init__(self, initial: float = 1, factor: float = 2, max_interval: float = 60, jitter: float = 0) -> None:
+        """
+        :type initial: float
+        :param initial: Time (in seconds) to wait after the first check.
+
+        :type factor: float
+        :param factor: Factor by which the interval is multiplied after each
+          check.
+
+        :type max_interval: float
+        :param max_interval: Maximum time (in seconds) to wait between 2
+          consecutive checks.
+        """
+        assert 0 < initial <= max_interval
+        assert factor >= 1
+        super().__init__(jitter=jitter)
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+
+    def intervals(self) -> Iterator[float]:
+        interval = self.initial
+        while True:
+            yield self._jittered(interval)
+            interval = min(interval * self.factor, self.max_interval)
+
+
+class AdaptiveInterval(PollingStrategy):
+    """
+    Adapt the time to wait between 2 consecutive checks to how long the
+    previous wait operations using the same strategy instance took.
+
+    The interval is a fraction of the average duration of the last
+    ``window`` completed wait operations, bounded by ``min_interval`` and
+    ``max_interval``. Therefore, an instance of this class should be shared
+    by wait operations on similar objects, e.g. jobs running the same tool.
+    It is safe to share an instance between threads.
+    """
+
+    def __init__(
+        self,
+        initial: float = 3,
+        fraction: float = 0.1,
+        min_interval: float = 1,
+        max_interval: float = 60,
+        window: int = 20,
+        jitter: float = 0,
+    ) -> None:
+        """
+        :type initial: float
+        :param initial: Time (in seconds) to wait between 2 consecutive checks
+          until a wait operation has been recorded.
+
+        :type fraction: float
+        :param fraction: Fraction of the average duration of the previous wait
+          operations to use as interval.
+
+        :type min_interval: float
+        :param min_interval: Minimum time (in seconds) to wait between 2
+          consecutive checks.
+
+        :type max_interval: float
+        :param max_interval: Maximum time (in seconds) to wait between 2
+          consecutive checks.
+
+        :type window: int
+        :param window: Number of the most recent wait operations to consider.
+        """
+        assert 0 < min_interval <= initial <= max_interval
+        assert fraction > 0
+        super().__init__(jitter=jitter)
+        self.initial = initial
+        self.fraction = fraction
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._durations: collections.deque[float] = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def interval(self) -> float:
+        """
+        The current time (in seconds) to wait between 2 consecutive checks.
+        """
+        with self._lock:
+            if not self._durations:
+                return self.initial
+            average = sum(self._durations) / len(self._durations)
+        return min(max(average * self.fraction, self.min_interval), self.max_interval)
+
+    def intervals(self) -> Iterator[float]:
+        interval = self.interval
+        while True:
+            yield self._jittered(interval)
+
+    def record(self, elapsed: float) -> None:
+        with self._lock:
+            self._durations.append(elapsed)
+
+
+def wait_on(func: Callable[[], T], maxwait: float = 60, interval: float | PollingStrategy = 3) -> T:
     """
     Wait until a function returns without raising a NotReady exception
 
@@ -136,19 +328,26 @@ def wait_on(func: Callable[[], T], maxwait: float = 60, interval: float = 3) ->
       without raising a NotReady exception. After this time, a
       ``TimeoutException`` will be raised.
 
-    :param interval: Time (in seconds) to wait between 2 consecutive checks.
+    :param interval: Time (in seconds) to wait between 2 consecutive checks,
+      or a :class:`PollingStrategy` instance to compute it.
     """
     assert maxwait >= 0
-    assert interval > 0
+    strategy = interval if isinstance(interval, PollingStrategy) else FixedInterval(interval)
+    intervals = strategy.intervals()
 
+    start = time.monotonic()
     time_left = maxwait
     while True:
         try:
-            return func()
+            ret = func()
         except NotReady as e:
             if time_left > 0:
                 log.info("%s. Will wait %s more s", e, time_left)
-                time.sleep(min(time_left, interval))
-                time_left -= interval
+                sleep_time = next(intervals)
+                time.sleep(min(time_left, sleep_time))
+                time_left -= sleep_time
             else:
                 raise TimeoutException(f"{e} after {maxwait} s")
+        else:
+            strategy.record(time.monotonic() - start)
+            return ret
@@ -0,0 +1,175 @@
+"""
+Offline benchmarks of BioBlend against the local mock Galaxy server.
+
+They require the pytest-benchmark plugin and are not collected by default,
+run them with::
+
+    pytest bioblend/_tests/Benchmarks.py
+
+The latency (in seconds) and bandwidth (in bytes per second) of the mock
+server can be set with the ``BIOBLEND_BENCHMARK_LATENCY`` and
+``BIOBLEND_BENCHMARK_BANDWIDTH`` environment variables. Each benchmark stores
+its throughput (items or bytes per second) in the ``extra_info`` of the
+results, e.g. for comparisons with ``--benchmark-compare``.
+"""
+
+import itertools
+import os
+import tempfile
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from bioblend.galaxy import GalaxyInstance
+from bioblend.galaxy.objects import (
+    galaxy_instance,
+    wrappers,
+)
+from .mock_galaxy import (
+    encode_id,
+    MockGalaxy,
+)
+
+pytest.importorskip("pytest_benchmark")
+
+N_HISTORIES = 200
+N_JOBS = 1000
+DATASET_SIZE = 50 * 1024**2
+UPLOAD_SIZE = 50 * 1024**2
+UPLOAD_CHUNK_SIZE = 10 * 1024**2
+N_WAITED_JOBS = 20
+N_CONTENTS = 100_000
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[MockGalaxy]:
+    bandwidth = os.environ.get("BIOBLEND_BENCHMARK_BANDWIDTH")
+    with MockGalaxy(
+        n_histories=N_HISTORIES,
+        n_jobs=N_JOBS,
+        dataset_size=DATASET_SIZE,
+        job_polls=2,
+        latency=float(os.environ.get("BIOBLEND_BENCHMARK_LATENCY", "0")),
+        bandwidth=float(bandwidth) if bandwidth else None,
+    ) as server:
+        yield server
+
+
+@pytest.fixture
+def gi(server: MockGalaxy) -> GalaxyInstance:
+    return GalaxyInstance(server.url, key="fake")
+
+
+def history_contents(n: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": f"{i:016x}",
+            "name": f"dataset_{i}.txt",
+            "type": "file",
+            "history_content_type": "dataset",
+            "hid": i + 1,
+            "state": "ok",
+            "deleted": False,
+            "visible": True,
+            "tags": [],
+            "update_time": "2024-01-01T00:00:00.000000",
+            "url": f"/api/histories/0123456789abcdef/contents/{i:016x}",
+        }
+        for i in range(n)
+    ]
+
+
+def record_throughput(benchmark: Any, n: int, unit: str) -> None:
+    benchmark.extra_info[f"{unit}_per_second"] = n / benchmark.stats.stats.mean
+
+
+def test_list_histories(benchmark: Any, gi: GalaxyInstance) -> None:
+    histories = benchmark(gi.histories.get_histories)
+    assert len(histories) == N_HISTORIES
+    record_throughput(benchmark, N_HISTORIES, "histories")
+
+
+def test_list_jobs(benchmark: Any, gi: GalaxyInstance) -> None:
+    jobs = benchmark(gi.jobs.get_jobs)
+    assert len(jobs) == N_JOBS
+    record_throughput(benchmark, N_JOBS, "jobs")
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_wrap_histories(benchmark: Any, server: MockGalaxy, lazy: bool) -> None:
+    obj_gi = galaxy_instance.GalaxyInstance(server.url, api_key="fake")
+    histories = benchmark(obj_gi.histories.list, lazy=lazy)
+    assert len(histories) == N_HISTORIES
+    record_throughput(benchmark, N_HISTORIES, "histories")
+
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_wrap_history_content_infos(benchmark: Any, copy: bool) -> None:
+    contents = history_contents(N_CONTENTS)
+
+    def wrap() -> list[wrappers.HistoryContentInfo]:
+        return [wrappers.HistoryContentInfo(_, copy=copy) for _ in contents]
+
+    infos = benchmark(wrap)
+    assert len(infos) == N_CONTENTS
+    record_throughput(benchmark, N_CONTENTS, "wrappers")
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_history_content_infos_memory(benchmark: Any, compact: bool) -> None:
+    def wrap() -> int:
+        """
+        Return the memory retained by the wrappers once the decoded API
+        response has been released.
+        """
+        tracemalloc.start()
+        try:
+            contents = history_contents(N_CONTENTS)
+            infos = [wrappers.HistoryContentInfo(_, copy=False, compact=compact) for _ in contents]
+            del contents
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        assert len(infos) == N_CONTENTS
+        return size
+
+    size = benchmark.pedantic(wrap, rounds=1)
+    benchmark.extra_info["bytes_per_wrapper"] = size / N_CONTENTS
+
+
+def test_download_to_memory(benchmark: Any, gi: GalaxyInstance) -> None:
+    content = benchmark(gi.datasets.download_dataset, encode_id(0))
+    assert len(content) == DATASET_SIZE
+    record_throughput(benchmark, DATASET_SIZE, "bytes")
+
+
+def test_download_to_file(benchmark: Any, gi: GalaxyInstance) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = benchmark(gi.datasets.download_dataset, encode_id(0), file_path=tmpdir)
+        assert os.path.getsize(path) == DATASET_SIZE
+    record_throughput(benchmark, DATASET_SIZE, "bytes")
+
+
+def test_tus_upload(benchmark: Any, gi: GalaxyInstance) -> None:
+    with tempfile.NamedTemporaryFile() as f:
+        f.truncate(UPLOAD_SIZE)
+
+        def upload() -> None:
+            gi.get_tus_uploader(f.name, chunk_size=UPLOAD_CHUNK_SIZE).upload()
+
+        benchmark(upload)
+    record_throughput(benchmark, UPLOAD_SIZE, "bytes")
+
+
+def test_wait_for_jobs(benchmark: Any, gi: GalaxyInstance) -> None:
+    # a new set of jobs for each round, since the mock jobs stay ok once done
+    job_ids = (encode_id(i) for i in itertools.count(N_JOBS))
+
+    def wait() -> None:
+        for job_id in itertools.islice(job_ids, N_WAITED_JOBS):
+            gi.jobs.wait_for_job(job_id, interval=0.001)
+
+    benchmark(wait)
+    record_throughput(benchmark, N_WAITED_JOBS, "jobs")
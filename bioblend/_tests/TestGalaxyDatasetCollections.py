@@ -1,15 +1,33 @@
+import io
 import os
+import struct
 import tarfile
 import tempfile
+import time
+import unittest
+import zipfile
+import zlib
 from collections.abc import Callable
 from inspect import signature
 from typing import (
     Any,
 )
+from unittest import mock
 from zipfile import ZipFile
 
-from bioblend.galaxy import dataset_collections
+import pytest
+
+from bioblend.galaxy import (
+    dataset_collections,
+    GalaxyInstance,
+)
+from bioblend.util import extract_zip
 from . import GalaxyTestBase
+from .mock_galaxy import (
+    encode_id,
+    MockGalaxy,
+    UnseekableWriter,
+)
 
 
 class TestGalaxyDatasetCollections(GalaxyTestBase.GalaxyTestBase):
@@ -178,6 +196,18 @@ class TestGalaxyDatasetCollections(GalaxyTestBase.GalaxyTestBase):
                 with open(file_path) as f:
                     assert expected_contents == f.read()
 
+        extracted = self.gi.dataset_collections.download_dataset_collection(
+            dataset_collection_id, file_path=os.path.join(tempdir, "streamed"), extract=True
+        )
+        assert len(extracted["extracted_files"]) == 2
+        for file_path in extracted["extracted_files"]:
+            with open(file_path) as f:
+                assert expected_contents == f.read()
+        extracted = self.gi.dataset_collections.download_dataset_collection(
+            dataset_collection_id, file_path=os.path.join(tempdir, "forward"), extract=True, identifiers=["forward"]
+        )
+        assert [os.path.basename(_).split(".")[0] for _ in extracted["extracted_files"]] == ["forward"]
+
     def test_wait_for_dataset_collection(self):
         history_id = self.gi.histories.create_history(name="TestDatasetCollectionWait")["id"]
         dataset_collection_id = self._create_pair_in_history(history_id)["id"]
@@ -201,3 +231,157 @@ class TestGalaxyDatasetCollections(GalaxyTestBase.GalaxyTestBase):
             copy_elements=False,
         )
         return collection_response
+
+
+class TestDownloadDatasetCollection(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _download(self, version: str, **kwargs: Any) -> tuple[MockGalaxy, list[dict[str, Any]]]:
+        with MockGalaxy(n_datasets=3, dataset_size=100_000, version=version) as server:
+            gi = GalaxyInstance(server.url, key="fake")
+            results = [
+                gi.dataset_collections.download_dataset_collection(
+                    encode_id(1), os.path.join(self.tmpdir.name, str(i)), **kwargs
+                )
+                for i in range(2)
+            ]
+        return server, results
+
+    def test_extract_zip(self):
+        server, results = self._download("25.0", extract=True)
+        # the version is requested only once
+        assert server.requests[("GET", "/api/version")] == 1
+        result = results[0]
+        assert result["archive_type"] == "zip"
+        assert len(result["extracted_files"]) == 6
+        path = os.path.join(self.tmpdir.name, "0", "Collection 1", "sample2", "reverse.txt")
+        assert path in result["extracted_files"]
+        with open(path, "rb") as f:
+            assert f.read() == server._content
+
+    def test_extract_tgz(self):
+        results = self._download("20.09", extract=True, identifiers=["sample1", "forward"])[1]
+        result = results[0]
+        assert result["archive_type"] == "tgz"
+        assert sorted(os.path.relpath(_, result["file_path"]) for _ in result["extracted_files"]) == [
+            os.path.join("Collection 1", "sample0", "forward.txt"),
+            os.path.join("Collection 1", "sample1", "forward.txt"),
+            os.path.join("Collection 1", "sample1", "reverse.txt"),
+            os.path.join("Collection 1", "sample2", "forward.txt"),
+        ]
+
+    def test_extract_multipart_extension(self):
+        f = io.BytesIO()
+        with ZipFile(UnseekableWriter(f), "w") as zip_file:
+            for sample in ("sample1", "sample1.1"):
+                for direction in ("forward", "reverse"):
+                    zip_file.writestr(f"Collection 1/{sample}/{direction}.fastqsanger.gz", b"@")
+        with (
+            MockGalaxy() as server,
+            mock.patch.object(server, "collection_archive", return_value=f.getvalue()),
+        ):
+            gi = GalaxyInstance(server.url, key="fake")
+            result = gi.dataset_collections.download_dataset_collection(
+                encode_id(1), self.tmpdir.name, extract=True, identifiers=["forward", "sample1.1"]
+            )
+        assert sorted(os.path.relpath(_, self.tmpdir.name) for _ in result["extracted_files"]) == [
+            os.path.join("Collection 1", "sample1.1", "forward.fastqsanger.gz"),
+            os.path.join("Collection 1", "sample1.1", "reverse.fastqsanger.gz"),
+            os.path.join("Collection 1", "sample1", "forward.fastqsanger.gz"),
+        ]
+
+    def test_download(self):
+        results = self._download("25.0")[1]
+        with ZipFile(results[0]["file_path"]) as zip_file:
+            assert len(zip_file.namelist()) == 6
+        with pytest.raises(ValueError):
+            self._download("25.0", identifiers=["sample1"])
+
+    def test_extract_zip_formats(self):
+        files = {
+            "c/a.txt": b"hello" * 1000,
+            "c/s1/forward.txt": os.urandom(300_000),
+            # content looking like a data descriptor signature
+            "c/s1/reverse.txt": b"PK\x07\x08" * 10,
+            "c/empty.txt": b"",
+        }
+        for seekable in (True, False):
+            for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                for force_zip64 in (False, True):
+                    f = io.BytesIO()
+                    with ZipFile(f if seekable else UnseekableWriter(f), "w", compression=compression) as zip_file:
+                        for name, content in files.items():
+                            with zip_file.open(name, "w", force_zip64=force_zip64) as member:
+                                member.write(content)
+                    path = os.path.join(self.tmpdir.name, f"{seekable}_{compression}_{force_zip64}")
+                    f.seek(0)
+                    extracted = extract_zip(f, path, buffer_size=1000)
+                    assert len(extracted) == len(files)
+                    for name, content in files.items():
+                        with open(os.path.join(path, name), "rb") as member_file:
+                            assert member_file.read() == content
+
+    def test_extract_zip_many_members(self):
+        # the time to read an archive of small streamed entries must grow
+        # linearly with their number, not with the data read ahead
+        def extract_time(n_members: int, compression: int) -> float:
+            f = io.BytesIO()
+            with ZipFile(UnseekableWriter(f), "w", compression=compression) as zip_file:
+                for i in range(n_members):
+                    with zip_file.open(f"c/{i}.txt", "w") as member:
+                        member.write(b"x" * 100)
+            times = []
+            for _ in range(3):
+                f.seek(0)
+                start = time.perf_counter()
+                extract_zip(f, self.tmpdir.name, buffer_size=1024**2, select=lambda _: False)
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            assert extract_time(4000, compression) < 8 * extract_time(1000, compression)
+
+    def test_extract_zip64_size(self):
+        # a local header with only the uncompressed size in the zip64 field
+        content = b"zip64"
+        name = b"a.txt"
+        extra = struct.pack("<HHQ", 0x0001, 8, len(content))
+        header = struct.pack(
+            "<4sHHHHHLLLHH",
+            b"PK\x03\x04",
+            45,
+            0,
+            zipfile.ZIP_STORED,
+            0,
+            0,
+            zlib.crc32(content),
+            len(content),
+            0xFFFFFFFF,
+            len(name),
+            len(extra),
+        )
+        extracted = extract_zip(io.BytesIO(header + name + extra + content), self.tmpdir.name)
+        with open(extracted[0], "rb") as f:
+            assert f.read() == content
+
+    def test_extract_zip_errors(self):
+        f = io.BytesIO()
+        with ZipFile(UnseekableWriter(f), "w") as zip_file:
+            zip_file.writestr("../evil.txt", b"evil")
+        archive = f.getvalue()
+        with pytest.raises(ValueError):
+            extract_zip(io.BytesIO(archive), os.path.join(self.tmpdir.name, "unsafe"))
+        f = io.BytesIO()
+        with ZipFile(f, "w") as zip_file:
+            zip_file.writestr("a.txt", b"good")
+        archive = f.getvalue()
+        with pytest.raises(zipfile.BadZipFile):
+            extract_zip(io.BytesIO(archive.replace(b"good", b"gooe")), self.tmpdir.name)
+        with pytest.raises(zipfile.BadZipFile):
+            extract_zip(io.BytesIO(archive[:40]), self.tmpdir.name)
+        with pytest.raises(zipfile.BadZipFile):
+            extract_zip(io.BytesIO(b"not a zip archive"), self.tmpdir.name)
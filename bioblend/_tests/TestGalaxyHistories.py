@@ -2,19 +2,31 @@
 Tests for the bioblend.galaxy.histories module.
 """
 
+import io
 import os
 import shutil
 import tarfile
 import tempfile
+import unittest
+from typing import Any
+from unittest import mock
 
 import pytest
 
-from bioblend import ConnectionError
+from bioblend import (
+    ConnectionError,
+    FixedInterval,
+)
 from bioblend.galaxy import GalaxyInstance
+from bioblend.util import extract_tar
 from . import (
     GalaxyTestBase,
     test_util,
 )
+from .mock_galaxy import (
+    encode_id,
+    MockGalaxy,
+)
 
 
 class TestGalaxyHistories(GalaxyTestBase.GalaxyTestBase):
@@ -159,6 +171,20 @@ class TestGalaxyHistories(GalaxyTestBase.GalaxyTestBase):
         contents = self.gi.histories.show_history(history_id, contents=True, types=["dataset", "dataset_collection"])
         assert len(contents) == 1
 
+    def test_show_history_with_contents_paginated(self):
+        history_id = self.history["id"]
+        dataset_ids = [self._test_dataset(history_id) for _ in range(3)]
+        contents = self.gi.histories.show_history(history_id, contents=True, limit=2)
+        assert [item["id"] for item in contents] == dataset_ids[:2]
+        contents = self.gi.histories.show_history(history_id, contents=True, limit=2, offset=2)
+        assert [item["id"] for item in contents] == dataset_ids[2:]
+        contents = self.gi.histories.show_history(history_id, contents=True, types=["dataset_collection"], offset=0)
+        assert contents == []
+        contents = self.gi.histories.show_history(
+            history_id, contents=True, ids=[dataset_ids[0], dataset_ids[2]], limit=1, offset=1
+        )
+        assert [item["id"] for item in contents] == [dataset_ids[2]]
+
     def test_create_history_tag(self):
         new_tag = "tag1"
         self.gi.histories.create_history_tag(self.history["id"], new_tag)
@@ -223,6 +249,20 @@ class TestGalaxyHistories(GalaxyTestBase.GalaxyTestBase):
             updated_dataset = self.gi.histories.show_dataset(history_id, dataset1_id)
         assert not updated_dataset["visible"]
 
+    @test_util.skip_unless_galaxy("release_22.05")
+    def test_bulk_update_contents(self):
+        history_id = self.history["id"]
+        dataset_ids = [self._test_dataset(history_id) for _ in range(3)]
+        result = self.gi.histories.bulk_update_contents(history_id, "hide", items=dataset_ids[:2], chunk_size=1)
+        assert result == {"success_count": 2, "errors": []}
+        hidden = self.gi.histories.show_history(history_id, contents=True, visible=False)
+        assert {_["id"] for _ in hidden} == set(dataset_ids[:2])
+        result = self.gi.histories.bulk_update_contents(
+            history_id, "add_tags", filters={"visible": True}, params={"tags": ["name:foo"]}
+        )
+        assert result["success_count"] == 1
+        assert self.gi.histories.show_dataset(history_id, dataset_ids[2])["tags"] == ["name:foo"]
+
     def test_upload_dataset_from_library(self):
         pass
 
@@ -245,6 +285,27 @@ class TestGalaxyHistories(GalaxyTestBase.GalaxyTestBase):
         state = self.gi.histories.get_status(self.history["id"])
         assert "new" == state["state"]
 
+    @test_util.skip_unless_galaxy("release_21.05")
+    def test_changes_since(self):
+        history_id = self.history["id"]
+        changes = self.gi.histories.changes_since(history_id)
+        assert changes["contents"] == []
+        assert changes["cursor"] is None
+        dataset1_id = self._test_dataset(history_id)
+        self.gi.datasets.wait_for_dataset(dataset1_id)
+        changes = self.gi.histories.changes_since(history_id, keys=["state"])
+        assert [item["id"] for item in changes["contents"]] == [dataset1_id]
+        assert changes["contents"][0]["state"] == "ok"
+        cursor = changes["cursor"]
+        assert cursor is not None
+        changes = self.gi.histories.changes_since(history_id, since=cursor)
+        assert changes["contents"] == []
+        assert changes["cursor"] == cursor
+        dataset2_id = self._test_dataset(history_id)
+        changes = self.gi.histories.changes_since(history_id, since=cursor)
+        assert [item["id"] for item in changes["contents"]] == [dataset2_id]
+        assert changes["cursor"] > cursor
+
     def test_get_most_recently_used_history(self):
         most_recently_used_history = self.gi.histories.get_most_recently_used_history()
         # if the user has been created via the API, it does not have
@@ -266,6 +327,20 @@ class TestGalaxyHistories(GalaxyTestBase.GalaxyTestBase):
         finally:
             shutil.rmtree(tempdir)
 
+    @test_util.skip_unless_galaxy("release_22.05")
+    def test_export_to(self):
+        self._test_dataset(self.history["id"])
+        with tempfile.TemporaryDirectory(prefix="bioblend_test_") as tempdir:
+            archive_path = os.path.join(tempdir, "export.tar.gz")
+            self.gi.histories.export_to(self.history["id"], archive_path, maxwait=60)
+            assert tarfile.is_tarfile(archive_path)
+            extract_dir = os.path.join(tempdir, "export")
+            self.gi.histories.export_to(self.history["id"], extract_dir, extract=True, maxwait=60)
+            with tarfile.open(archive_path) as tar:
+                file_names = {_.name for _ in tar if _.isfile()}
+            for name in file_names:
+                assert os.path.isfile(os.path.join(extract_dir, name))
+
     def test_import_history(self):
         path = test_util.get_abspath(os.path.join("data", "Galaxy-History-Test-history-for-export.tar.gz"))
         self.gi.histories.import_history(file_path=path)
@@ -299,3 +374,260 @@ class TestGalaxyHistories(GalaxyTestBase.GalaxyTestBase):
 
     def tearDown(self):
         self.gi.histories.delete_history(self.history["id"], purge=True)
+
+
+class TestShowHistoryContents(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+
+    def test_ids(self):
+        with mock.patch.object(self.gi.histories, "_get", return_value=[]) as get:
+            self.gi.histories.show_history("h1", contents=True, ids=["a", "b"])
+        assert get.call_args.kwargs["params"] == {"ids": "a,b"}
+
+    def test_ids_paginated(self):
+        with mock.patch.object(self.gi.histories, "_get", return_value=[]) as get:
+            self.gi.histories.show_history("h1", contents=True, types=["dataset"], ids=["a", "b"], limit=2, offset=1)
+        assert get.call_args.kwargs["params"] == {
+            "v": "dev",
+            "order": "hid-asc",
+            "q": ["history_content_type-eq", "encoded_id-in"],
+            "qv": ["dataset", "a,b"],
+            "limit": 2,
+            "offset": 1,
+        }
+
+
+class TestChangesSince(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        self.history: dict[str, Any] = {
+            "state": "ok",
+            "state_details": {"ok": 3},
+            "update_time": "2026-01-01T00:00:03.000000",
+        }
+
+    def _changes_since(self, contents: list[dict[str, Any]], since: str | None = None) -> dict[str, Any]:
+        with (
+            mock.patch.object(self.gi.histories, "show_history", return_value=self.history),
+            mock.patch.object(self.gi.histories, "_get", return_value=contents) as get,
+        ):
+            changes = self.gi.histories.changes_since("h1", since=since)
+        self.params = get.call_args.kwargs["params"]
+        return changes
+
+    def test_tied_update_times(self):
+        t1, t2 = "2026-01-01T00:00:01.000000", "2026-01-01T00:00:02.000000"
+        a = {"id": "a", "update_time": t1}
+        b = {"id": "b", "update_time": t2}
+        c = {"id": "c", "update_time": t2}
+        changes = self._changes_since([a, b])
+        assert changes["contents"] == [a, b]
+        cursor = changes["cursor"]
+        # c is updated at the same time as b, after the previous call
+        changes = self._changes_since([b, c], since=cursor)
+        assert self.params["q"] == ["update_time-ge"]
+        assert self.params["qv"] == [t2]
+        assert changes["contents"] == [c]
+        cursor = changes["cursor"]
+        changes = self._changes_since([b, c], since=cursor)
+        assert changes["contents"] == []
+        assert changes["cursor"] == cursor
+        # a plain update time is accepted too
+        assert self._changes_since([b, c], since=t2)["contents"] == [b, c]
+
+    def test_not_updated(self):
+        with (
+            mock.patch.object(self.gi.histories, "show_history", return_value=self.history),
+            mock.patch.object(self.gi.histories, "_get") as get,
+        ):
+            changes = self.gi.histories.changes_since("h1", since=self.history["update_time"])
+        # the contents are not requested
+        get.assert_not_called()
+        assert changes["contents"] == []
+        assert changes["cursor"] == self.history["update_time"]
+
+
+class TestBulkUpdateContents(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        self.gi.server_version = {"version_major": "24.2"}
+        self.tags = {"a": ["x"], "b": []}
+
+    def test_chunks(self):
+        with mock.patch.object(
+            self.gi.histories, "_put", side_effect=lambda payload, url, params: {"success_count": 1, "errors": []}
+        ) as put:
+            result = self.gi.histories.bulk_update_contents("h1", "hide", items=["a", "b", "c"], chunk_size=2)
+        assert result == {"success_count": 2, "errors": []}
+        assert [call.kwargs["payload"]["items"] for call in put.call_args_list] == [
+            [{"id": "a", "history_content_type": "dataset"}, {"id": "b", "history_content_type": "dataset"}],
+            [{"id": "c", "history_content_type": "dataset"}],
+        ]
+        assert put.call_args.kwargs["url"] == "http://localhost:8080/api/histories/h1/contents/bulk"
+
+    def test_filters(self):
+        with mock.patch.object(self.gi.histories, "_put", return_value={"success_count": 5, "errors": []}) as put:
+            self.gi.histories.bulk_update_contents(
+                "h1", "change_dbkey", filters={"deleted": False, "extension-eq": "bed"}, params={"dbkey": "hg38"}
+            )
+        put.assert_called_once()
+        assert put.call_args.kwargs["payload"] == {
+            "operation": "change_dbkey",
+            "params": {"type": "change_dbkey", "dbkey": "hg38"},
+        }
+        assert put.call_args.kwargs["params"] == {"q": ["deleted", "extension-eq"], "qv": ["False", "bed"]}
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            self.gi.histories.bulk_update_contents("h1", "explode", items=["a"])  # type: ignore[arg-type]
+        with pytest.raises(ValueError):
+            self.gi.histories.bulk_update_contents("h1", "hide", items=["a"], filters={"deleted": False})
+
+    def _show(self, history_id: str, dataset_id: str) -> dict[str, Any]:
+        return {"id": dataset_id, "tags": self.tags.get(dataset_id, [])}
+
+    def _update(self, history_id: str, dataset_id: str, **kwargs: Any) -> dict[str, Any]:
+        if dataset_id == "c":
+            raise ConnectionError("Not found", status_code=404)
+        return {}
+
+    def test_partial(self):
+        def put(payload: dict[str, Any], url: str, params: Any) -> dict[str, Any]:
+            if payload["items"][0]["id"] == "c":
+                raise ConnectionError("Bad gateway", status_code=502)
+            return {"success_count": len(payload["items"]), "errors": []}
+
+        with mock.patch.object(self.gi.histories, "_put", side_effect=put):
+            result = self.gi.histories.bulk_update_contents("h1", "hide", items=["a", "b", "c", "d", "e"], chunk_size=2)
+        assert result["success_count"] == 2
+        assert [_["item"]["id"] for _ in result["errors"]] == ["c", "d", "e"]
+
+    def test_fallback(self):
+        self.gi.server_version = {"version_major": "22.01"}
+        with (
+            mock.patch.object(self.gi.histories, "_put") as put,
+            mock.patch.object(self.gi.histories, "show_dataset", side_effect=self._show),
+            mock.patch.object(self.gi.histories, "update_dataset", side_effect=self._update) as update_dataset,
+        ):
+            result = self.gi.histories.bulk_update_contents(
+                "h1", "add_tags", items=["a", "b", "c"], params={"tags": ["x", "y"]}
+            )
+        assert result["success_count"] == 2
+        assert [_["item"]["id"] for _ in result["errors"]] == ["c"]
+        update_dataset.assert_any_call("h1", "a", tags=["x", "y"])
+        update_dataset.assert_any_call("h1", "b", tags=["x", "y"])
+        put.assert_not_called()
+
+    def test_fallback_filters(self):
+        contents = [{"id": "a", "history_content_type": "dataset"}, {"id": "b", "history_content_type": "dataset"}]
+        self.gi.server_version = {"version_major": "21.09"}
+        with (
+            mock.patch.object(self.gi.histories, "_get", return_value=contents) as get,
+            mock.patch.object(self.gi.histories, "update_dataset", side_effect=self._update) as update_dataset,
+        ):
+            result = self.gi.histories.bulk_update_contents("h1", "unhide", filters={"visible": False})
+        assert result == {"success_count": 2, "errors": []}
+        assert get.call_args.kwargs["params"]["q"] == ["visible"]
+        update_dataset.assert_any_call("h1", "b", visible=True)
+
+    def test_no_fallback_on_error(self):
+        for status_code in (400, 500):
+            with (
+                mock.patch.object(
+                    self.gi.histories, "_put", side_effect=ConnectionError("Error", status_code=status_code)
+                ),
+                mock.patch.object(self.gi.histories, "update_dataset") as update_dataset,
+                pytest.raises(ConnectionError),
+            ):
+                self.gi.histories.bulk_update_contents("h1", "change_dbkey", items=["a"], params={"dbkey": "foo"})
+            update_dataset.assert_not_called()
+
+
+class TestCopyContents(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+
+    def _copy(self, history_id: str, content_id: str, source: str) -> dict[str, Any]:
+        if content_id == "b":
+            raise ConnectionError("Not found", status_code=404)
+        return {
+            "id": f"{content_id}_copy",
+            "history_content_type": "dataset_collection" if source == "hdca" else "dataset",
+        }
+
+    def test_copy_contents(self):
+        with mock.patch.object(self.gi.histories, "copy_content", side_effect=self._copy) as copy_content:
+            results = self.gi.histories.copy_contents("h1", ["a", "b", {"id": "c", "src": "hdca"}, {"id": "d"}])
+        assert [_.content_id for _ in results] == ["a", "b", "c", "d"]
+        assert [_.ok for _ in results] == [True, False, True, True]
+        assert isinstance(results[1].error, ConnectionError)
+        assert results[1].content is None
+        assert results[2].source == "hdca"
+        assert results[2].content == {"id": "c_copy", "history_content_type": "dataset_collection"}
+        copy_content.assert_any_call("h1", "d", "hda")
+        assert copy_content.call_count == 4
+
+    def test_source(self):
+        with mock.patch.object(self.gi.histories, "copy_content", side_effect=self._copy) as copy_content:
+            results = self.gi.histories.copy_contents("h1", ["a"], source="library", max_workers=1)
+        copy_content.assert_called_once_with("h1", "a", "library")
+        assert results[0].content["id"] == "a_copy"
+        assert self.gi.histories.copy_contents("h1", []) == []
+
+
+class TestExportTo(unittest.TestCase):
+    server: MockGalaxy
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockGalaxy(n_histories=2, n_datasets=3, dataset_size=100_000, job_polls=2)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.gi = GalaxyInstance(self.server.url, key="fake")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive = self.server.history_archive(encode_id(1))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_export_to_file(self):
+        path = os.path.join(self.tmpdir.name, "export.tar.gz")
+        self.gi.histories.export_to(encode_id(1), path, interval=0.001)
+        with open(path, "rb") as f:
+            assert f.read() == self.archive
+        sink = io.BytesIO()
+        self.gi.histories.export_to(encode_id(1), sink, interval=FixedInterval(0.001))
+        assert sink.getvalue() == self.archive
+
+    def test_extract(self):
+        with mock.patch("time.sleep") as sleep:
+            self.gi.histories.export_to(encode_id(1), self.tmpdir.name, extract=True, chunk_size=1000)
+        # the default polling strategy is used for the 2 not ready checks
+        assert sleep.call_count == 2
+        assert self.gi.histories._export_interval.interval < 1
+        for j in range(3, 6):
+            with open(os.path.join(self.tmpdir.name, "datasets", f"Dataset_{encode_id(j)}.txt"), "rb") as f:
+                assert f.read() == self.server._content
+        assert os.path.isfile(os.path.join(self.tmpdir.name, "history_attrs.txt"))
+        with pytest.raises(ValueError):
+            self.gi.histories.export_to(encode_id(1), self.tmpdir.name, extract=True, model_store_format="rocrate.zip")
+        with pytest.raises(ConnectionError):
+            self.gi.histories.export_to(encode_id(2), self.tmpdir.name, extract=True)
+
+    def test_unsafe_archive(self):
+        f = io.BytesIO()
+        with tarfile.open(fileobj=f, mode="w") as tar:
+            info = tarfile.TarInfo("../evil.txt")
+            info.size = 4
+            tar.addfile(info, io.BytesIO(b"evil"))
+        f.seek(0)
+        extract_dir = os.path.join(self.tmpdir.name, "export")
+        with pytest.raises(ValueError):
+            extract_tar(f, extract_dir)
+        assert not os.path.exists(os.path.join(self.tmpdir.name, "evil.txt"))
@@ -2,9 +2,13 @@ import contextlib
 import os
 import tempfile
 import time
+import unittest
 import zipfile
 from typing import Any
+from unittest import mock
 
+from bioblend.galaxy import GalaxyInstance
+from bioblend.galaxy.waiter import InvocationProgress
 from . import (
     GalaxyTestBase,
     test_util,
@@ -219,3 +223,55 @@ class TestGalaxyInvocations(GalaxyTestBase.GalaxyTestBase):
             history_id=self.history_id,
             inputs_by="name",
         )
+
+
+class TestInvocationProgress(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        self.invocations = {
+            f"inv{i}": {"id": f"inv{i}", "state": "ready", "update_time": "2026-01-01T00:00:00"} for i in range(3)
+        }
+        self.jobs = {f"inv{i}": [{"id": f"job{i}", "states": {"running": 1}}] for i in range(3)}
+
+    def _get_invocations(self, include_terminal: bool, limit: int, offset: int, **kwargs: Any) -> list[dict[str, Any]]:
+        assert not include_terminal
+        invocations = [dict(_) for _ in self.invocations.values() if _["state"] == "ready"]
+        return invocations[offset : offset + limit]
+
+    def _refresh(self, progress: InvocationProgress) -> tuple[set[str], list[str]]:
+        with (
+            mock.patch.object(self.gi.invocations, "get_invocations", side_effect=self._get_invocations),
+            mock.patch.object(self.gi.invocations, "show_invocation", side_effect=lambda _: self.invocations[_]),
+            mock.patch.object(
+                self.gi.invocations, "get_invocation_step_jobs_summary", side_effect=lambda _: self.jobs[_]
+            ) as jobs_summary,
+        ):
+            changed = progress.refresh()
+        return changed, [call.args[0] for call in jobs_summary.call_args_list]
+
+    def test_refresh(self):
+        progress = InvocationProgress(self.gi, self.invocations)
+        assert len(progress) == 3
+        changed, summarized = self._refresh(progress)
+        assert changed == set(summarized) == set(self.invocations)
+        assert progress.job_states() == {"running": 3}
+        # inv0 jobs terminate, inv1 is scheduled and gets new jobs
+        self.jobs["inv0"] = [{"id": "job0", "states": {"ok": 1}}]
+        self.invocations["inv1"] = {**self.invocations["inv1"], "state": "scheduled"}
+        self.jobs["inv1"] = [{"id": "job1", "states": {"running": 1}}, {"id": "job3", "states": {"queued": 2}}]
+        changed, summarized = self._refresh(progress)
+        assert changed == {"inv0", "inv1"}
+        assert progress.job_states() == {"ok": 1, "queued": 2, "running": 2}
+        assert progress.job_states("inv1") == {"queued": 2, "running": 1}
+        assert progress.invocation_states()["inv1"] == "scheduled"
+        # inv0 has no active jobs and has not changed, so it is skipped
+        changed, summarized = self._refresh(progress)
+        assert changed == set()
+        assert sorted(summarized) == ["inv1", "inv2"]
+        assert not progress._is_done("inv1")
+        for i in range(3):
+            self.invocations[f"inv{i}"] = {**self.invocations[f"inv{i}"], "state": "scheduled"}
+            self.jobs[f"inv{i}"] = [{"id": f"job{i}", "states": {"ok": 1}}]
+        self._refresh(progress)
+        assert progress.done
+        assert progress.job_states() == {"ok": 3}
@@ -9,6 +9,7 @@ from bioblend.galaxy.tools.inputs import (
     dataset,
     inputs,
 )
+from bioblend.galaxy.waiter import Waiter
 from . import (
     GalaxyTestBase,
     test_util,
@@ -33,6 +34,24 @@ class TestGalaxyJobs(GalaxyTestBase.GalaxyTestBase):
         job = self.gi.jobs.wait_for_job(job_id)
         assert job["state"] == "ok"
 
+    @test_util.skip_unless_tool("cat1")
+    def test_waiter(self):
+        tool_inputs = inputs().set("input1", dataset(self.dataset_id))
+        waiter = Waiter(self.gi, check=True)
+        job_ids = set()
+        for _ in range(2):
+            tool_output = self.gi.tools.run_tool(history_id=self.history_id, tool_id="cat1", tool_inputs=tool_inputs)
+            job_id = tool_output["jobs"][0]["id"]
+            job_ids.add(job_id)
+            waiter.add_job(job_id, history_id=self.history_id)
+            waiter.add_dataset(tool_output["outputs"][0]["id"], history_id=self.history_id)
+        waiter.add_job(job_id)
+        results = list(waiter.wait())
+        assert len(waiter) == 0
+        assert {result.id for result in results if result.type == "job"} == job_ids
+        assert len([result for result in results if result.type == "dataset"]) == 2
+        assert {result.state for result in results} == {"ok"}
+
     @test_util.skip_unless_tool("random_lines1")
     def test_get_jobs(self):
         self._run_tool()
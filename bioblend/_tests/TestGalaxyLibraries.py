@@ -89,6 +89,29 @@ class TestGalaxyLibraries(GalaxyTestBase.GalaxyTestBase):
         ldda_dict = ret[0]
         assert ldda_dict["name"] == os.path.basename(filename)
 
+    def test_upload_multiple_files_from_local_path(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            fnames = [os.path.join(tempdir, f"f{i}.txt") for i in range(2)]
+            for fn in fnames:
+                with open(fn, "w") as f:
+                    f.write(FOO_DATA)
+            ret = self.gi.libraries.upload_file_from_local_path(self.library["id"], fnames)
+        assert len(ret) == 2
+        assert {ldda_dict["name"] for ldda_dict in ret} == {"f0.txt", "f1.txt"}
+
+    @test_util.skip_unless_galaxy("release_22.01")
+    def test_upload_file_from_local_path_tus(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            fnames = [os.path.join(tempdir, f"f{i}.txt") for i in range(2)]
+            for fn in fnames:
+                with open(fn, "w") as f:
+                    f.write(FOO_DATA)
+            ret = self.gi.libraries.upload_file_from_local_path_tus(self.library["id"], fnames)
+        assert len(ret["jobs"]) == 1
+        self.gi.jobs.wait_for_job(ret["jobs"][0]["id"])
+        names = {dataset["name"] for dataset in self.gi.libraries.show_library(self.library["id"], contents=True)}
+        assert {"/f0.txt", "/f1.txt"} <= names
+
     # def test_upload_file_from_server(self):
     #     pass
 
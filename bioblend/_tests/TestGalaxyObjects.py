@@ -1,11 +1,15 @@
 # pylint: disable=C0103,E1101
+import gc
 import json
 import os
+import pickle
 import shutil
 import socket
 import sys
 import tarfile
 import tempfile
+import threading
+import time
 import unittest
 import uuid
 from collections.abc import (
@@ -13,11 +17,13 @@ from collections.abc import (
     Collection,
     Iterable,
 )
+from concurrent.futures import ThreadPoolExecutor
 from ssl import SSLError
 from typing import (
     Any,
     Literal,
 )
+from unittest import mock
 from urllib.error import URLError
 from urllib.request import urlopen
 
@@ -202,6 +208,404 @@ class TestWrapper(unittest.TestCase):
         with pytest.raises(AttributeError):
             w.parent = 0  # type: ignore[assignment,misc]  # ty: ignore[invalid-assignment]
 
+    def test_validate(self):
+        with pytest.raises(ValueError):
+            MockWrapper({"a": object()})
+        w = MockWrapper({"a": 1, "b": object()}, copy=False)
+        assert w.a == 1
+
+    def test_no_copy(self):
+        w = MockWrapper(self.d, copy=False)
+        assert w.wrapped is self.d
+        w.a = 222
+        assert w.a == 222
+        assert w.is_modified
+        assert w.wrapped is not self.d
+        assert self.d["a"] == 1
+        c = w.clone()
+        c.b[0] = 111
+        assert self.d["b"][0] == 2
+
+    def test_read_through(self):
+        self.w.wrapped["a"] = 333
+        assert self.w.a == 333
+        self.w.wrapped["c"] = {"x": 5}
+        self.w.c = {"x": 6}  # type: ignore[assignment]
+        assert self.w.c == {"x": 6}  # type: ignore[attr-defined]
+        assert self.w.wrapped["c"] == {"x": 6}
+
+    def test_pickle(self):
+        info = wrappers.HistoryContentInfo({"id": "abc", "name": "foo", "type": "file", "extension": "txt"})
+        info.extension = "bed"
+        for w in (self.w, info):
+            other = pickle.loads(pickle.dumps(w))
+            assert other.wrapped == w.wrapped
+            assert other.is_modified == w.is_modified
+        # the key set on the slotted wrapper is still exposed as an attribute
+        assert other.extension == "bed"
+
+    def test_compact(self):
+        w = MockWrapper(self.d, compact=True)
+        assert w.wrapped == {"a": 1, "b": [2, 3]}
+        assert w.b == [2, 3]
+        assert self.d["c"] == {"x": 4}
+
+    def test_slots(self):
+        info = wrappers.HistoryContentInfo(
+            {"id": "abc", "name": "foo", "type": "file", "state": "ok", "extension": "txt"}, copy=False
+        )
+        assert not hasattr(info, "__dict__")
+        assert info.id == "abc"
+        assert info.name == "foo"
+        info.state = "deleted"
+        assert info.state == "deleted"
+        assert info.is_modified
+        # keys not in BASE_ATTRS can be set too, like on the other wrappers
+        info.extension = "bed"
+        assert info.extension == "bed"  # type: ignore[attr-defined]  # ty: ignore[unresolved-attribute]
+        assert info.wrapped["extension"] == "bed"
+        with pytest.raises(AttributeError):
+            _ = info.foo  # type: ignore[attr-defined]  # ty: ignore[unresolved-attribute]
+        with pytest.raises(AttributeError):
+            info.foo = 0  # type: ignore[assignment]  # ty: ignore[invalid-assignment]
+        for preview in (
+            wrappers.HistoryPreview({"id": "abc", "name": "foo"}),
+            wrappers.WorkflowPreview({"id": "abc", "name": "foo"}),
+            wrappers.JobPreview({"id": "abc", "state": "ok"}),
+        ):
+            assert not hasattr(preview, "__dict__")
+
+
+class TestIdentityMap(unittest.TestCase):
+    def setUp(self):
+        self.gi = galaxy_instance.GalaxyInstance("http://localhost:8080", api_key="fake", identity_map=True)
+
+    def test_get(self):
+        with mock.patch.object(self.gi.gi.invocations, "show_invocation", return_value=SAMPLE_INV_DICT) as show:
+            inv = self.gi.invocations.get(SAMPLE_INV_DICT["id"])
+            assert self.gi.invocations.get(SAMPLE_INV_DICT["id"]) is inv
+        show.assert_called_once_with(SAMPLE_INV_DICT["id"])
+        assert self.gi.identity_map is not None
+        assert len(self.gi.identity_map) == 1
+        del inv
+        gc.collect()  # invocation steps reference their invocation
+        assert len(self.gi.identity_map) == 0
+
+    def test_stale(self):
+        updated_inv_dict = {**SAMPLE_INV_DICT, "state": "scheduled", "update_time": "2015-10-31T22:10:00"}
+        with mock.patch.object(self.gi.gi.invocations, "show_invocation", return_value=SAMPLE_INV_DICT):
+            inv = self.gi.invocations.get(SAMPLE_INV_DICT["id"])
+        with mock.patch.object(self.gi.gi.invocations, "get_invocations", return_value=[SAMPLE_INV_DICT]):
+            self.gi.invocations.get_previews()
+        with mock.patch.object(self.gi.gi.invocations, "show_invocation", return_value=updated_inv_dict) as show:
+            assert self.gi.invocations.get(SAMPLE_INV_DICT["id"]) is inv
+            show.assert_not_called()
+            with mock.patch.object(self.gi.gi.invocations, "get_invocations", return_value=[updated_inv_dict]):
+                self.gi.invocations.get_previews()
+            assert self.gi.invocations.get(SAMPLE_INV_DICT["id"]) is inv
+            show.assert_called_once_with(SAMPLE_INV_DICT["id"])
+        assert inv.state == "scheduled"
+
+    def test_get_after_delete(self):
+        hist_dict = {"id": "hist_id", "name": "foo", "deleted": False}
+        with (
+            mock.patch.object(self.gi.histories, "_show_f", return_value=hist_dict) as show_history,
+            mock.patch.object(self.gi.gi.histories, "delete_history", return_value={}),
+        ):
+            hist = self.gi.histories.get("hist_id")
+            hist.delete()
+            assert not hist.is_mapped
+            assert self.gi.identity_map is not None
+            assert len(self.gi.identity_map) == 0
+            other_hist = self.gi.histories.get("hist_id")
+        assert other_hist is not hist
+        assert other_hist.id == "hist_id"
+        # 1 for each get() and 1 to refresh the history after deleting it
+        assert show_history.call_count == 3
+
+    def test_get_after_client_delete(self):
+        hist_dict = {"id": "hist_id", "name": "foo", "deleted": False}
+        with (
+            mock.patch.object(self.gi.histories, "_show_f", return_value=hist_dict) as show_history,
+            mock.patch.object(self.gi.gi.histories, "delete_history", return_value={}),
+        ):
+            hist = self.gi.histories.get("hist_id")
+            self.gi.histories.delete(id_="hist_id")
+            other_hist = self.gi.histories.get("hist_id")
+        assert other_hist is not hist
+        assert show_history.call_count == 2
+
+    def test_concurrent_get_or_fetch(self):
+        assert self.gi.identity_map is not None
+        identity_map = self.gi.identity_map
+        barrier = threading.Barrier(4)
+
+        def fetch() -> wrappers.History:
+            # all threads fetch before any of them adds its wrapper to the map
+            barrier.wait()
+            return wrappers.History({"id": "hist_id", "name": "foo"}, gi=self.gi)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            hists = list(
+                executor.map(lambda _: identity_map.get_or_fetch(wrappers.History, "hist_id", fetch), range(4))
+            )
+        assert all(_ is hists[0] for _ in hists)
+        assert identity_map.get(wrappers.History, "hist_id") is hists[0]
+
+    def test_disabled(self):
+        gi = galaxy_instance.GalaxyInstance("http://localhost:8080", api_key="fake")
+        assert gi.identity_map is None
+        with mock.patch.object(gi.gi.invocations, "show_invocation", return_value=SAMPLE_INV_DICT) as show:
+            assert gi.invocations.get(SAMPLE_INV_DICT["id"]) is not gi.invocations.get(SAMPLE_INV_DICT["id"])
+        assert show.call_count == 2
+
+
+class TestToolIds(unittest.TestCase):
+    def setUp(self):
+        self.gi = galaxy_instance.GalaxyInstance("http://localhost:8080", api_key="fake")
+
+    def test_missing_ids(self):
+        with mock.patch.object(self.gi.gi.tools, "get_tools", return_value=[{"id": "Paste1"}]) as get_tools:
+            wfs = [wrappers.Workflow(SAMPLE_WF_DICT, gi=self.gi) for _ in range(3)]
+            get_tools.assert_not_called()
+            for wf in wfs:
+                assert wf.missing_ids == []
+                assert wf.is_runnable
+            get_tools.assert_called_once()
+        with (
+            mock.patch.object(self.gi.gi.config, "_put") as put,
+            mock.patch.object(self.gi.gi.tools, "get_tools", return_value=[]) as get_tools,
+        ):
+            self.gi.tools.reload_toolbox()
+            put.assert_called_once()
+            wf = wrappers.Workflow(SAMPLE_WF_DICT, gi=self.gi)
+            assert wf.missing_ids == ["573"]
+            assert not wf.is_runnable
+            get_tools.assert_called_once()
+
+    def test_toolbox_changes(self):
+        toolshed = self.gi.gi.toolshed
+        with (
+            mock.patch.object(self.gi.gi.config, "_put"),
+            mock.patch.object(toolshed, "_post", return_value=[]),
+            mock.patch.object(toolshed, "_delete", return_value={}),
+            mock.patch.object(self.gi.gi.tools, "get_tools", return_value=[{"id": "Paste1"}]) as get_tools,
+        ):
+            assert self.gi.tools.get_tool_ids() == {"Paste1"}
+            assert self.gi.tools.get_tool_ids() == {"Paste1"}
+            get_tools.assert_called_once()
+            self.gi.gi.config.reload_toolbox()
+            self.gi.tools.get_tool_ids()
+            assert get_tools.call_count == 2
+            toolshed.install_repository_revision("https://toolshed.g2.bx.psu.edu", "name", "owner", "rev")
+            self.gi.tools.get_tool_ids()
+            assert get_tools.call_count == 3
+            toolshed.uninstall_repository_revision("name", "owner", "rev", "https://toolshed.g2.bx.psu.edu")
+            self.gi.tools.get_tool_ids()
+            assert get_tools.call_count == 4
+            self.gi.tools.get_tool_ids(refresh=True)
+            assert get_tools.call_count == 5
+
+
+class TestHistoryContents(unittest.TestCase):
+    def setUp(self):
+        self.gi = galaxy_instance.GalaxyInstance("http://localhost:8080", api_key="fake")
+        self.contents = [
+            {"id": f"id{i}", "name": f"ds{i}", "history_content_type": "dataset", "hid": i, "state": "ok"}
+            for i in range(5)
+        ]
+
+    def _get_page(self, history_id, contents, limit, offset):
+        assert contents
+        return [dict(_) for _ in self.contents[offset : offset + limit]]
+
+    def test_content_infos(self):
+        with mock.patch.object(self.gi.gi.histories, "show_history", side_effect=self._get_page) as show_history:
+            hist = wrappers.History({"id": "hist_id", "name": "foo"}, gi=self.gi)
+            show_history.assert_not_called()
+            infos = list(hist.iter_content_infos(page_size=2))
+            assert [_.id for _ in infos] == [_["id"] for _ in self.contents]
+            assert show_history.call_count == 3
+            show_history.reset_mock()
+            with mock.patch.object(wrappers.History, "CONTENTS_PAGE_SIZE", 10):
+                assert hist.dataset_ids == [_["id"] for _ in self.contents]
+                assert hist.content_infos[0].type == "file"
+            show_history.assert_called_once_with("hist_id", contents=True, limit=10, offset=0)
+
+    def test_preview(self):
+        hist = wrappers.History({"id": "hist_id", "name": "foo"}, gi=self.gi)
+        p_dict = {"id": "hist_id", "name": "foo", "deleted": True}
+        with mock.patch.object(self.gi.gi.histories, "show_history", return_value=p_dict) as show_history:
+            preview = hist.preview()
+        assert isinstance(preview, wrappers.HistoryPreview)
+        assert preview.deleted
+        assert show_history.call_args.args == ("hist_id",)
+        assert "name" in show_history.call_args.kwargs["keys"]
+        error = bioblend.ConnectionError("Not found", status_code=404)
+        with (
+            mock.patch.object(self.gi.gi.histories, "show_history", side_effect=error),
+            pytest.raises(ValueError),
+        ):
+            hist.preview()
+
+    def test_get_datasets(self):
+        def get_datasets(limit, offset, **kwargs):
+            return [dict(_) for _ in self.contents[offset : offset + limit]]
+
+        with (
+            mock.patch.object(self.gi.gi.datasets, "get_datasets", side_effect=get_datasets) as get_datasets_mock,
+            mock.patch.object(wrappers.History, "CONTENTS_PAGE_SIZE", 2),
+        ):
+            hist = wrappers.History({"id": "hist_id", "name": "foo"}, gi=self.gi)
+            datasets = hist.get_datasets()
+        assert [_.id for _ in datasets] == [_["id"] for _ in self.contents]
+        assert all(_.container is hist for _ in datasets)
+        assert get_datasets_mock.call_count == 3
+        assert get_datasets_mock.call_args.kwargs["history_id"] == "hist_id"
+
+    def test_wait_polling_strategy(self):
+        hist = wrappers.History({"id": "hist_id", "name": "foo"}, gi=self.gi)
+        hda = wrappers.HistoryDatasetAssociation({"id": "id0", "name": "ds0", "state": "queued"}, hist, gi=self.gi)
+        states = iter(["queued", "running", "running", "ok"])
+
+        def show_history(history_id, contents, ids, keys):
+            return [{"id": "id0", "state": next(states)}]
+
+        strategy = bioblend.ExponentialBackoff(initial=1, factor=2)
+        with (
+            mock.patch.object(self.gi.gi.histories, "show_history", side_effect=show_history),
+            mock.patch.object(
+                self.gi.gi.histories, "show_dataset", return_value={"id": "id0", "name": "ds0", "state": "ok"}
+            ),
+            mock.patch.object(strategy, "record") as record,
+            mock.patch("time.sleep") as sleep,
+            mock.patch("time.monotonic", side_effect=[100, 107.5]),
+        ):
+            hda.wait(polling_interval=strategy)
+        assert hda.state == "ok"
+        assert [call.args[0] for call in sleep.call_args_list] == [1, 2, 4]
+        # the measured time, not the sum of the sleeps
+        record.assert_called_once_with(7.5)
+
+    def test_copy_contents(self):
+        hist = wrappers.History({"id": "hist_id", "name": "foo"}, gi=self.gi)
+        hda = wrappers.HistoryDatasetAssociation({"id": "id0", "name": "ds0"}, hist, gi=self.gi)
+        hdca = wrappers.HistoryDatasetCollectionAssociation({"id": "id1", "name": "dsc1"}, hist, gi=self.gi)
+        ld = wrappers.LibraryDataset(
+            {"id": "id2", "name": "ld2"}, wrappers.Library({"id": "lib_id"}, gi=self.gi), gi=self.gi
+        )
+        error = bioblend.ConnectionError("Not found", status_code=404)
+
+        def copy_content(history_id, content_id, source):
+            if content_id == "id2":
+                raise error
+            return {"id": f"{content_id}_copy", "name": "copy", "state": "ok"}
+
+        with (
+            mock.patch.object(self.gi.gi.histories, "copy_content", side_effect=copy_content) as copy_content_mock,
+            mock.patch.object(wrappers.History, "refresh") as refresh,
+        ):
+            copies = hist.copy_contents([hda, hdca, ld], max_workers=2)
+        assert [call.args[2] for call in sorted(copy_content_mock.call_args_list)] == ["hda", "hdca", "library"]
+        refresh.assert_called_once()
+        assert isinstance(copies[0], wrappers.HistoryDatasetAssociation)
+        assert isinstance(copies[1], wrappers.HistoryDatasetCollectionAssociation)
+        assert [_.id for _ in copies[:2]] == ["id0_copy", "id1_copy"]  # type: ignore[union-attr]
+        assert copies[2] is error
+        with pytest.raises(TypeError):
+            hist.copy_contents([hist])  # type: ignore[list-item]
+
+
+class TestObjClientList(unittest.TestCase):
+    def setUp(self):
+        self.gi = galaxy_instance.GalaxyInstance("http://localhost:8080", api_key="fake")
+        self.dicts = [{"id": f"id{i}", "name": f"hist{i}", "deleted": False} for i in range(10)]
+
+    def _show_history(self, history_id):
+        # make later requests complete first, to check that the order is preserved
+        time.sleep(0.01 * (10 - int(history_id[2:])))
+        return {"id": history_id, "name": "foo", "state": "ok"}
+
+    def test_list(self):
+        with (
+            mock.patch.object(self.gi.histories, "_get_f", return_value=self.dicts),
+            mock.patch.object(self.gi.histories, "_show_f", side_effect=self._show_history) as show_history,
+        ):
+            histories = self.gi.histories.list()
+        assert [_.id for _ in histories] == [_["id"] for _ in self.dicts]
+        assert all(isinstance(_, wrappers.History) for _ in histories)
+        assert show_history.call_count == len(self.dicts)
+
+    def test_list_lazy(self):
+        wf_dicts = [{"id": "wf_id", "name": "foo", "number_of_steps": 2}]
+        wf_dict = {"id": "wf_id", "name": "foo", "steps": {}, "inputs": {}}
+        with (
+            mock.patch.object(self.gi.gi.workflows, "get_workflows", return_value=wf_dicts),
+            mock.patch.object(self.gi.gi.workflows, "show_workflow", return_value=wf_dict) as show_workflow,
+        ):
+            wf = self.gi.workflows.list(lazy=True)[0]
+            assert wf.name == "foo"
+            assert wf.number_of_steps == 2
+            show_workflow.assert_not_called()
+            assert wf.steps == {}
+            assert wf.inputs == {}
+            show_workflow.assert_called_once_with("wf_id")
+        assert isinstance(wf, wrappers.LazyWrapper)
+
+
+class TestDAGIndex(unittest.TestCase):
+    def setUp(self):
+        # scatter/gather workflow: 1 input, N parallel tool steps, 1 gather step
+        n = 2000
+        steps: dict[str, dict[str, Any]] = {
+            "0": {"id": 0, "input_steps": {}, "label": "input", "tool_inputs": {}, "type": "data_input"},
+        }
+        for i in range(1, n + 1):
+            steps[str(i)] = {
+                "id": i,
+                "input_steps": {"input1": {"source_step": 0, "step_output": "output"}},
+                "tool_id": "Paste1",
+                "tool_inputs": {},
+                "type": "tool",
+            }
+        steps[str(n + 1)] = {
+            "id": n + 1,
+            "input_steps": {f"input{i}": {"source_step": i, "step_output": "out_file1"} for i in range(1, n + 1)},
+            "label": "gather",
+            "tool_id": "cat1",
+            "tool_inputs": {},
+            "type": "tool",
+        }
+        self.n = n
+        self.wf = wrappers.Workflow(
+            {"id": "wf_id", "inputs": {"0": {"label": "input", "value": ""}}, "name": "scatter", "steps": steps},
+            copy=False,
+        )
+
+    def test_index(self):
+        index = self.wf.dag_index
+        assert len(index) == self.n + 2
+        assert index.get_step_id("gather") == str(self.n + 1)
+        assert index.get_step_id("foo") is None
+        assert index.predecessors("1") == ["0"]
+        assert index.successors("1") == [str(self.n + 1)]
+        assert index.in_degree(str(self.n + 1)) == self.n
+        ids = self.wf.sorted_step_ids()
+        assert ids[0] == "0"
+        assert ids[-1] == str(self.n + 1)
+        assert len(ids) == self.n + 2
+        assert self.wf.source_ids == {"0"}
+        assert self.wf.sink_ids == {str(self.n + 1)}
+        assert self.wf.dag_index is index
+
+    def test_invalidate(self):
+        index = self.wf.dag_index
+        gather = self.wf.steps[str(self.n + 1)]
+        gather.input_steps = {"input1": {"source_step": "1", "step_output": "out_file1"}}
+        assert self.wf.dag_index is not index
+        assert self.wf.inv_dag[str(self.n + 1)] == {"1"}
+        assert self.wf.sink_ids == {str(_) for _ in range(2, self.n + 2)}
+
 
 @test_util.skip_unless_galaxy()
 class GalaxyObjectsTestBase(unittest.TestCase):
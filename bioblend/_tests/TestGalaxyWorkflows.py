@@ -3,14 +3,20 @@ import os
 import shutil
 import tempfile
 import time
+import unittest
 from typing import (
     Any,
     Literal,
 )
+from unittest import mock
 
 import pytest
 
-from bioblend import ConnectionError
+from bioblend import (
+    ConnectionError,
+    FixedInterval,
+)
+from bioblend.galaxy import GalaxyInstance
 from bioblend.galaxy.invocations import INVOCATION_SUCCESS_STATES
 from . import (
     GalaxyTestBase,
@@ -341,3 +347,68 @@ class TestGalaxyWorkflowVersions(GalaxyTestBase.GalaxyTestBase):
                 inputs_by="name",
                 version=2,
             )
+
+
+class TestInvokeWorkflowBatch(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        self.inputs_list = [{"0": {"src": "hda", "id": f"ds{i}"}} for i in range(6)]
+
+    def _post(self, payload: dict[str, Any], url: str) -> Any:
+        assert url.endswith("/workflows/wf_id/invocations")
+        if payload.get("batch"):
+            return [{"id": f"inv_{_['id']}"} for _ in payload["inputs"]["0"]["values"]]
+        return {"id": f"inv_{payload['inputs']['0']['id']}"}
+
+    def test_invoke_workflow_batch(self):
+        with mock.patch.object(self.gi.workflows, "_post", side_effect=self._post) as post:
+            results = self.gi.workflows.invoke_workflow_batch("wf_id", self.inputs_list, history_id="hist_id")
+        assert [_.invocation_id for _ in results] == [f"inv_ds{i}" for i in range(6)]
+        assert all(_.ok and _.attempts == 1 for _ in results)
+        assert post.call_count == 6
+        assert post.call_args.args[0]["history"] == "hist_id=hist_id"
+
+    def test_batch_size(self):
+        with mock.patch.object(self.gi.workflows, "_post", side_effect=self._post) as post:
+            results = self.gi.workflows.invoke_workflow_batch("wf_id", self.inputs_list, batch_size=4)
+        assert [_.invocation_id for _ in results] == [f"inv_ds{i}" for i in range(6)]
+        assert post.call_count == 2
+
+    def test_batch_rejected(self):
+        def post_no_batch(payload, url):
+            if payload.get("batch"):
+                raise ConnectionError("Unexpected HTTP status code: 400", status_code=400)
+            return self._post(payload, url)
+
+        with mock.patch.object(self.gi.workflows, "_post", side_effect=post_no_batch) as post:
+            results = self.gi.workflows.invoke_workflow_batch("wf_id", self.inputs_list, batch_size=10)
+        assert [_.invocation_id for _ in results] == [f"inv_ds{i}" for i in range(6)]
+        assert post.call_count == 7
+
+    def test_retries(self):
+        errors = {
+            "ds1": [ConnectionError("Unexpected HTTP status code: 503", status_code=503)],
+            "ds2": [ConnectionError("Unexpected HTTP status code: 400", status_code=400)],
+            "ds3": [ConnectionError("Unexpected HTTP status code: 502", status_code=502)] * 3,
+        }
+
+        def flaky_post(payload, url):
+            ds_errors = errors.get(payload["inputs"]["0"]["id"])
+            if ds_errors:
+                raise ds_errors.pop()
+            return self._post(payload, url)
+
+        with (
+            mock.patch.object(self.gi.workflows, "_post", side_effect=flaky_post),
+            mock.patch("time.sleep") as sleep,
+        ):
+            results = self.gi.workflows.invoke_workflow_batch(
+                "wf_id", self.inputs_list, max_workers=1, max_retries=2, retry_interval=FixedInterval(5)
+            )
+        assert [call.args[0] for call in sleep.call_args_list] == [5, 5, 5]
+        assert [_.ok for _ in results] == [True, True, False, False, True, True]
+        assert [_.attempts for _ in results] == [1, 2, 1, 3, 1, 1]
+        error = results[2].error
+        assert isinstance(error, ConnectionError)
+        assert error.status_code == 400
+        assert results[3].invocation_id is None
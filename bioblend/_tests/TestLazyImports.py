@@ -0,0 +1,62 @@
+"""
+Tests that importing BioBlend and creating a ``GalaxyInstance`` stay fast, by
+loading the client modules and the heavy dependencies only when needed.
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+
+# Modules which must not be imported by ``import bioblend.galaxy`` and
+# ``GalaxyInstance()``
+HEAVY_MODULES = ("aiohttp", "logging.config", "requests_toolbelt", "tarfile", "tusclient", "yaml")
+
+# Maximum cumulative time (in seconds) spent importing BioBlend's own modules,
+# excluding their dependencies. It is deliberately generous, to avoid
+# spurious failures on slow machines.
+MAX_SELF_IMPORT_TIME = 0.2
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args, "-c", code], capture_output=True, check=True, text=True)
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_lazy_clients(self):
+        code = """
+import json
+import sys
+
+import bioblend.galaxy
+
+gi = bioblend.galaxy.GalaxyInstance("http://localhost:8080", key="fake")
+before = sorted(sys.modules)
+gi.histories
+print(json.dumps([before, sorted(sys.modules)]))
+"""
+        before, after = json.loads(run_python(code).stdout)
+        for name in HEAVY_MODULES:
+            assert not any(m == name or m.startswith(f"{name}.") for m in before), f"{name} imported"
+        assert not [m for m in before if m.startswith("bioblend.galaxy.")]
+        assert "bioblend.galaxy.histories" in after
+        assert "bioblend.galaxy.libraries" not in after
+
+    def test_lazy_submodules(self):
+        code = """
+import bioblend.galaxy
+
+print(bioblend.galaxy.jobs.JobsClient.__name__)
+"""
+        assert run_python(code).stdout.strip() == "JobsClient"
+
+    def test_import_time(self):
+        # -X importtime writes "import time: self [us] | cumulative | module"
+        # lines to stderr
+        stderr = run_python("import bioblend.galaxy", "-X", "importtime").stderr
+        self_time = 0
+        for line in stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip().startswith("bioblend"):
+                self_time += int(fields[0].rsplit(":", 1)[1])
+        assert 0 < self_time / 1e6 < MAX_SELF_IMPORT_TIME
@@ -0,0 +1,188 @@
+"""
+Tests for the collection of request metrics.
+"""
+
+import unittest
+import warnings
+from unittest import mock
+
+import pytest
+import requests
+
+from bioblend import ConnectionError
+from bioblend.galaxy import GalaxyInstance
+from bioblend.metrics import (
+    endpoint_template,
+    Metrics,
+    NPlusOneWarning,
+    RequestBudgetWarning,
+)
+
+
+def make_response(status_code: int, content: bytes = b"") -> requests.Response:
+    r = requests.Response()
+    r.status_code = status_code
+    r._content = content
+    return r
+
+
+class TestMetrics(unittest.TestCase):
+    def test_endpoint_template(self):
+        assert (
+            endpoint_template("https://usegalaxy.org/api/histories/f2db41e1fa331b3e/contents?deleted=true")
+            == "/api/histories/{id}/contents"
+        )
+        assert endpoint_template("http://localhost:8080/galaxy/api/jobs/42") == "/api/jobs/{id}"
+        assert (
+            endpoint_template("http://localhost:8080/api/invocations/0e3a8f3c-34c4-4d4e-9a2b-6f1a9bd3b5a1/report")
+            == "/api/invocations/{id}/report"
+        )
+        assert endpoint_template("http://localhost:8080/api/histories/published") == "/api/histories/published"
+
+    def test_record(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+        url = "http://localhost:8080/api/histories/f2db41e1fa331b3e"
+        metrics.record("GET", url, 200, 0.05, bytes_in=100)
+        metrics.record("GET", url.replace("f2db41e1fa331b3e", "1cd8e2f6b131e891"), 404, 0.5, bytes_in=20)
+        metrics.record("GET", url, None, 2.0)
+        metrics.record_retry("GET", url)
+        metrics.record("PUT", url, 200, 0.2, bytes_out=30)
+        snapshot = metrics.snapshot()
+        assert list(snapshot) == [("GET", "/api/histories/{id}"), ("PUT", "/api/histories/{id}")]
+        stats = snapshot[("GET", "/api/histories/{id}")]
+        assert stats["count"] == 3
+        assert stats["total_time"] == pytest.approx(2.55)
+        assert stats["latency_buckets"] == {0.1: 1, 1.0: 2, float("inf"): 3}
+        assert stats["bytes_in"] == 120
+        assert stats["bytes_out"] == 0
+        assert stats["retries"] == 1
+        assert stats["status_codes"] == {200: 1, 404: 1, None: 1}
+        assert snapshot[("PUT", "/api/histories/{id}")]["bytes_out"] == 30
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_to_prometheus(self):
+        metrics = Metrics(buckets=(0.1,))
+        metrics.record("GET", "http://localhost:8080/api/jobs/42", 200, 0.05, bytes_in=10)
+        text = metrics.to_prometheus()
+        assert "# TYPE bioblend_requests_total counter" in text
+        assert 'bioblend_requests_total{method="GET",endpoint="/api/jobs/{id}",status="200"} 1' in text
+        assert 'bioblend_request_duration_seconds_bucket{method="GET",endpoint="/api/jobs/{id}",le="0.1"} 1' in text
+        assert 'bioblend_request_duration_seconds_bucket{method="GET",endpoint="/api/jobs/{id}",le="+Inf"} 1' in text
+        assert 'bioblend_request_duration_seconds_count{method="GET",endpoint="/api/jobs/{id}"} 1' in text
+        assert 'bioblend_response_bytes_total{method="GET",endpoint="/api/jobs/{id}"} 10' in text
+        assert "# EOF" not in text
+        text = metrics.to_prometheus(prefix="galaxy", openmetrics=True)
+        assert "# TYPE galaxy_requests counter" in text
+        assert 'galaxy_requests_total{method="GET",endpoint="/api/jobs/{id}",status="200"} 1' in text
+        assert text.endswith("# EOF\n")
+
+
+class TestGalaxyInstanceMetrics(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        self.gi.metrics = Metrics()
+
+    def test_disabled(self):
+        self.gi.metrics = None
+        with mock.patch("requests.request", return_value=make_response(200, b"[]")) as request:
+            assert self.gi.histories.get_histories() == []
+        request.assert_called_once()
+
+    def test_requests(self):
+        assert self.gi.metrics is not None
+        with mock.patch("requests.request", return_value=make_response(200, b"[]")):
+            self.gi.histories.get_histories()
+        with mock.patch("requests.request", return_value=make_response(200, b'{"id": "f2db41e1fa331b3e"}')):
+            self.gi.histories.update_history("f2db41e1fa331b3e", name="foo")
+        snapshot = self.gi.metrics.snapshot()
+        get_stats = snapshot[("GET", "/api/histories")]
+        assert get_stats["count"] == 1
+        assert get_stats["bytes_in"] == 2
+        assert get_stats["status_codes"] == {200: 1}
+        put_stats = snapshot[("PUT", "/api/histories/{id}")]
+        assert put_stats["bytes_out"] == len('{"name": "foo"}')
+        assert put_stats["bytes_in"] == len('{"id": "f2db41e1fa331b3e"}')
+
+    def test_retries(self):
+        assert self.gi.metrics is not None
+        self.gi.max_get_attempts = 3
+        with (
+            mock.patch("requests.request", return_value=make_response(502)),
+            mock.patch("time.sleep"),
+            pytest.raises(ConnectionError),
+        ):
+            self.gi.histories.get_histories()
+        stats = self.gi.metrics.snapshot()[("GET", "/api/histories")]
+        assert stats["count"] == 3
+        assert stats["retries"] == 2
+        assert stats["status_codes"] == {502: 3}
+
+    def test_connection_error(self):
+        assert self.gi.metrics is not None
+        with (
+            mock.patch("requests.request", side_effect=requests.exceptions.ConnectionError),
+            pytest.raises(ConnectionError),
+        ):
+            self.gi.histories.get_histories()
+        assert self.gi.metrics.snapshot()[("GET", "/api/histories")]["status_codes"] == {None: 1}
+
+
+class TestRequestBudget(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        patcher = mock.patch("requests.request", return_value=make_response(200, b'{"state": "ok"}'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _show_jobs(self, job_ids: list[str]) -> None:
+        for job_id in job_ids:
+            self.gi.jobs.show_job(job_id)
+
+    def _show_datasets(self, dataset_ids: list[str]) -> None:
+        for dataset_id in dataset_ids:
+            self.gi.datasets.show_dataset(dataset_id)
+
+    def test_counts(self):
+        with self.gi.request_budget("show") as budget:
+            self.gi.jobs.show_job("f2db41e1fa331b3e")
+            self.gi.jobs.show_job("f2db41e1fa331b3e")
+            self.gi.histories.show_history("f2db41e1fa331b3e")
+        assert not self.gi.request_hooks
+        assert budget.total == 3
+        assert budget.counts == {("GET", "/api/jobs/{id}"): 2, ("GET", "/api/histories/{id}"): 1}
+        assert budget.report().startswith("3 requests in show\n")
+
+    def test_budget_exceeded(self):
+        with (
+            self.gi.request_budget("show jobs", max_requests=2),
+            pytest.warns(RequestBudgetWarning, match="Request budget of 2 exceeded in show jobs") as record,
+        ):
+            self._show_jobs(["f2db41e1fa331b3e"] * 4)
+        assert len(record) == 1
+        # the warning points to the code calling BioBlend
+        assert record[0].filename == __file__
+
+    def test_n_plus_one(self):
+        dataset_ids = [f"{i:016x}" for i in range(10)]
+        with (
+            self.gi.request_budget(threshold=5) as budget,
+            pytest.warns(NPlusOneWarning, match="GET /api/datasets/{id} requested with 5 different ids") as record,
+        ):
+            self._show_datasets(dataset_ids)
+        assert len(record) == 1
+        assert record[0].filename == __file__
+        (n_plus_one,) = budget.n_plus_one
+        assert n_plus_one.endpoint == "/api/datasets/{id}"
+        assert n_plus_one.n_ids == 5
+        assert n_plus_one.api and "show_dataset" in n_plus_one.api
+        assert n_plus_one.caller and n_plus_one.caller.startswith(f"{__file__}:")
+        assert "HistoryClient.show_history" in n_plus_one.suggestion
+        assert "N+1: GET /api/datasets/{id}" in budget.report()
+
+    def test_polling_is_not_n_plus_one(self):
+        with self.gi.request_budget(threshold=3) as budget, warnings.catch_warnings():
+            warnings.simplefilter("error")
+            for _ in range(10):
+                self.gi.jobs.show_job("f2db41e1fa331b3e")
+        assert not budget.n_plus_one
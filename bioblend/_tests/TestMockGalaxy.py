@@ -0,0 +1,59 @@
+"""
+Tests for the local mock Galaxy server used by the offline benchmarks.
+"""
+
+import os
+import tempfile
+import unittest
+
+from bioblend.galaxy import GalaxyInstance
+from bioblend.galaxy.objects import galaxy_instance
+from .mock_galaxy import (
+    encode_id,
+    MockGalaxy,
+)
+
+
+class TestMockGalaxy(unittest.TestCase):
+    server: MockGalaxy
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockGalaxy(n_histories=3, n_datasets=2, dataset_size=100_000, job_polls=2)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.gi = GalaxyInstance(self.server.url, key="fake")
+
+    def test_histories(self):
+        histories = self.gi.histories.get_histories()
+        assert [_["id"] for _ in histories] == [encode_id(i) for i in range(3)]
+        obj_gi = galaxy_instance.GalaxyInstance(self.server.url, api_key="fake")
+        history = obj_gi.histories.list()[1]
+        assert history.name == "History 1"
+        assert [_.id for _ in history.content_infos] == [encode_id(2), encode_id(3)]
+
+    def test_download(self):
+        assert self.gi.datasets.download_dataset(encode_id(0)) == self.server._content
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = self.gi.datasets.download_dataset(encode_id(0), file_path=tmpdir)
+            assert os.path.basename(path) == f"Dataset_{encode_id(0)}.txt"
+            assert os.path.getsize(path) == 100_000
+
+    def test_upload(self):
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b"x" * 2500)
+            f.flush()
+            uploader = self.gi.get_tus_uploader(f.name, chunk_size=1000)
+            uploader.upload()
+        assert self.server.uploads[uploader.session_id] == 2500  # type: ignore[attr-defined]
+
+    def test_wait_for_job(self):
+        job_id = encode_id(1000)
+        job = self.gi.jobs.wait_for_job(job_id, interval=0.01)
+        assert job["state"] == "ok"
+        assert self.server.job_shows[job_id] == 3
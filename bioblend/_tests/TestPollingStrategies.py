@@ -0,0 +1,76 @@
+"""
+Tests for the polling strategies used by ``bioblend.wait_on()``.
+"""
+
+import unittest
+from unittest import mock
+
+import pytest
+
+import bioblend
+from bioblend import (
+    AdaptiveInterval,
+    ExponentialBackoff,
+    FixedInterval,
+    NotReady,
+    TimeoutException,
+    wait_on,
+)
+
+
+def take(strategy: bioblend.PollingStrategy, n: int) -> list[float]:
+    intervals = strategy.intervals()
+    return [next(intervals) for _ in range(n)]
+
+
+class TestPollingStrategies(unittest.TestCase):
+    def test_fixed_interval(self):
+        assert take(FixedInterval(2), 3) == [2, 2, 2]
+
+    def test_exponential_backoff(self):
+        assert take(ExponentialBackoff(initial=1, factor=2, max_interval=5), 5) == [1, 2, 4, 5, 5]
+
+    def test_jitter(self):
+        for interval in take(FixedInterval(10, jitter=0.2), 100):
+            assert 8 <= interval <= 12
+
+    def test_adaptive_interval(self):
+        strategy = AdaptiveInterval(initial=3, fraction=0.1, min_interval=1, max_interval=60)
+        assert take(strategy, 2) == [3, 3]
+        strategy.record(100)
+        strategy.record(200)
+        assert take(strategy, 2) == [15, 15]
+        strategy.record(0)
+        assert strategy.interval == 10
+        strategy.record(10000)
+        assert strategy.interval == 60
+
+    def test_abstract(self):
+        class NoIntervals(bioblend.PollingStrategy):
+            pass
+
+        with pytest.raises(TypeError):
+            NoIntervals()  # type: ignore[abstract]
+
+    def test_wait_on(self):
+        attempts = iter(range(3))
+
+        def func() -> str:
+            if next(attempts) < 2:
+                raise NotReady("not ready")
+            return "done"
+
+        strategy = AdaptiveInterval(initial=2, min_interval=1)
+        with mock.patch("time.sleep") as sleep, mock.patch("time.monotonic", side_effect=[100, 104.5]):
+            assert wait_on(func, maxwait=60, interval=strategy) == "done"
+        assert [call.args[0] for call in sleep.call_args_list] == [2, 2]
+        # the measured time, not the sum of the sleeps
+        assert strategy._durations[-1] == 4.5
+
+    def test_wait_on_timeout(self):
+        def func() -> None:
+            raise NotReady("not ready")
+
+        with mock.patch("time.sleep") as sleep, pytest.raises(TimeoutException):
+            wait_on(func, maxwait=10, interval=ExponentialBackoff(initial=1, max_interval=4))
+        assert [call.args[0] for call in sleep.call_args_list] == [1, 2, 4, 3]
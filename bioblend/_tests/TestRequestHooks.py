@@ -0,0 +1,102 @@
+"""
+Tests for the request and response hooks of ``GalaxyClient``.
+"""
+
+import tempfile
+import unittest
+from typing import Any
+from unittest import mock
+
+import pytest
+import requests
+
+from bioblend import ConnectionError
+from bioblend.galaxy import GalaxyInstance
+from bioblend.galaxyclient import RequestDescriptor
+
+
+def make_response(status_code: int, content: bytes = b"", headers: dict[str, str] | None = None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status_code
+    r._content = content
+    r.headers.update(headers or {})
+    return r
+
+
+class TestRequestHooks(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        self.events: list[tuple[Any, ...]] = []
+        self.gi.request_hooks.append(self._on_request)
+        self.gi.response_hooks.append(self._on_response)
+
+    def _on_request(self, request: RequestDescriptor) -> None:
+        self.events.append(("request", request))
+
+    def _on_response(self, request: RequestDescriptor, response: Any, elapsed: float, error: Exception | None) -> None:
+        self.events.append(("response", request, response, elapsed, error))
+
+    def test_hooks(self):
+        r = make_response(200, b"[]")
+        with mock.patch("requests.request", return_value=r) as transport:
+            self.gi.histories.get_histories(deleted=True)
+        # only the copy of the headers passed to the hooks is masked
+        assert transport.call_args.kwargs["headers"]["x-api-key"] == "fake"
+        assert len(self.events) == 2
+        (_, request), (_, response_request, response, elapsed, error) = self.events
+        assert request is response_request
+        assert request.method == "GET"
+        assert request.url == "http://localhost:8080/api/histories"
+        assert request.params == {"q": ["deleted"], "qv": [True]}
+        assert request.headers["x-api-key"] != "fake"
+        assert request.headers["Content-Type"] == "application/json"
+        assert response is r
+        assert elapsed >= 0
+        assert error is None
+
+    def test_streamed_response_not_read(self):
+        r = make_response(200)
+        # requests marks the body as not read yet with False
+        r._content = False  # type: ignore[assignment]
+        r.raw = mock.Mock()
+        with mock.patch("requests.request", return_value=r):
+            self.gi.make_get_request("http://localhost:8080/api/datasets/f2db41e1fa331b3e/display", stream=True)
+        r.raw.read.assert_not_called()
+        assert self.events[-1][2] is r
+
+    def test_error(self):
+        with (
+            mock.patch("requests.request", side_effect=requests.exceptions.ConnectionError),
+            pytest.raises(ConnectionError),
+        ):
+            self.gi.histories.get_histories()
+        (_, request), (_, _, response, _, error) = self.events
+        assert request.method == "GET"
+        assert response is None
+        assert isinstance(error, requests.exceptions.ConnectionError)
+
+    def test_tus_upload(self):
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b"abcdef")
+            f.flush()
+            with (
+                mock.patch(
+                    "requests.post",
+                    return_value=make_response(201, headers={"Location": "/api/upload/resumable_upload/123"}),
+                ),
+                mock.patch("requests.patch", return_value=make_response(204, headers={"Upload-Offset": "6"})),
+            ):
+                self.gi.get_tus_uploader(f.name).upload()
+        assert [(_[0], _[1].method) for _ in self.events] == [
+            ("request", "POST"),
+            ("response", "POST"),
+            ("request", "PATCH"),
+            ("response", "PATCH"),
+        ]
+        assert self.events[0][1].url == "http://localhost:8080/api/upload/resumable_upload"
+        # the tus client does not expose the response to the upload creation
+        assert self.events[1][2] is None
+        assert all(_[1].headers["x-api-key"] != "fake" for _ in self.events)
+        patch_request, response = self.events[3][1:3]
+        assert patch_request.url == "http://localhost:8080/api/upload/resumable_upload/123"
+        assert response.status_code == 204
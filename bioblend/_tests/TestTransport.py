@@ -0,0 +1,124 @@
+"""
+Tests for the record/replay transports, using the local mock Galaxy server.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pytest
+import requests
+
+from bioblend.galaxy import GalaxyInstance
+from bioblend.metrics import Metrics
+from bioblend.transport import (
+    CassetteError,
+    RecordingTransport,
+    ReplayTransport,
+)
+from .mock_galaxy import (
+    encode_id,
+    MockGalaxy,
+)
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cassette = os.path.join(self.tmpdir.name, "cassette.json.gz")
+        # binary dataset content, to test base64 encoding
+        with MockGalaxy(n_histories=3, dataset_size=1000, job_polls=2) as server:
+            self.url = server.url
+            self.content = server._content
+            gi = GalaxyInstance(self.url, key="fake")
+            with RecordingTransport(self.cassette) as gi.transport:
+                self.histories = self._run(gi)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run(self, gi: GalaxyInstance) -> list[dict]:
+        histories = gi.histories.get_histories()
+        gi.jobs.wait_for_job(encode_id(100), interval=0.001)
+        assert gi.datasets.download_dataset(encode_id(0)) == self.content
+        path = gi.datasets.download_dataset(encode_id(1), file_path=self.tmpdir.name)
+        with open(path, "rb") as f:
+            assert f.read() == self.content
+        return histories
+
+    def test_replay(self):
+        gi = GalaxyInstance(self.url, key="fake")
+        gi.transport = transport = ReplayTransport(self.cassette)
+        gi.metrics = Metrics()
+        # the server is stopped
+        assert self._run(gi) == self.histories
+        assert transport.remaining == 0
+        # 1 to list histories, 3 to wait for the job, 2 for each download
+        assert transport.replayed == 8
+        assert gi.metrics.snapshot()[("GET", "/api/jobs/{id}")]["count"] == 3
+
+    def test_no_match(self):
+        gi = GalaxyInstance(self.url, key="fake")
+        gi.transport = ReplayTransport(self.cassette)
+        with pytest.raises(CassetteError):
+            gi.jobs.show_job(encode_id(101))
+        gi.histories.get_histories()
+        # all the recorded responses have been replayed
+        with pytest.raises(CassetteError):
+            gi.histories.get_histories()
+
+    def test_email_password(self):
+        cassette = os.path.join(self.tmpdir.name, "baseauth.json")
+        with MockGalaxy() as server:
+            url = server.url
+            with RecordingTransport(cassette) as transport:
+                gi = GalaxyInstance(url, email="user@example.org", password="secret", transport=transport)
+                gi.histories.get_histories()
+            assert gi.key == "fake"
+        with open(cassette) as f:
+            interactions = json.load(f)["interactions"]
+        assert [_["request"]["url"] for _ in interactions] == ["/api/authenticate/baseauth", "/api/histories"]
+        assert "fake" not in json.dumps(interactions)
+        # the server is stopped
+        with mock.patch("requests.request", side_effect=AssertionError("network request")):
+            gi = GalaxyInstance(url, email="user@example.org", password="secret", transport=ReplayTransport(cassette))
+            gi.histories.get_histories()
+
+    def test_scheme_guess(self):
+        r = requests.Response()
+        r.status_code = 200
+        transport = mock.Mock(return_value=r)
+        gi = GalaxyInstance("localhost:8080", key="fake", transport=transport)
+        assert gi.base_url == "https://localhost:8080"
+        transport.assert_called_once()
+        assert transport.call_args.args == ("GET", "https://localhost:8080")
+
+    def test_time_scale(self):
+        with self.assertRaises(ValueError):
+            ReplayTransport(self.cassette, time_scale=-1)
+        gi = GalaxyInstance(self.url, key="fake")
+        gi.transport = ReplayTransport(self.cassette, time_scale=2)
+        with mock.patch("time.sleep") as sleep:
+            gi.histories.get_histories()
+        sleep.assert_called_once()
+        assert sleep.call_args.args[0] >= 0
+
+    def test_cassette(self):
+        cassette = os.path.join(self.tmpdir.name, "cassette.json")
+        with MockGalaxy() as server:
+            gi = GalaxyInstance(server.url, key="fake")
+            with RecordingTransport(cassette) as gi.transport:
+                gi.histories.update_history(encode_id(0), name="foo")
+        with open(cassette) as f:
+            interactions = json.load(f)["interactions"]
+        assert len(interactions) == 1
+        request = interactions[0]["request"]
+        assert request == {"method": "PUT", "url": f"/api/histories/{encode_id(0)}", "body": '{"name": "foo"}'}
+        assert "fake" not in json.dumps(interactions)
+        gi.transport = ReplayTransport(cassette)
+        with pytest.raises(CassetteError):
+            gi.histories.update_history(encode_id(0), name="bar")
+        gi.transport = ReplayTransport(cassette, match_body=False)
+        gi.histories.update_history(encode_id(0), name="bar")
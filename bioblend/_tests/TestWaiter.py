@@ -0,0 +1,107 @@
+"""
+Offline tests for ``bioblend.galaxy.waiter.Waiter``.
+"""
+
+import unittest
+from typing import Any
+from unittest import mock
+
+import pytest
+
+import bioblend
+from bioblend import ConnectionError
+from bioblend.galaxy import GalaxyInstance
+from bioblend.galaxy.waiter import (
+    DATASET_KEYS,
+    Waiter,
+)
+
+
+class TestWaiter(unittest.TestCase):
+    def setUp(self):
+        self.gi = GalaxyInstance("http://localhost:8080", key="fake")
+        self.waiter = Waiter(self.gi, maxwait=10, interval=1)
+
+    def test_datasets(self):
+        states = {"a": iter(["queued", "ok"]), "b": iter(["running", "error"])}
+
+        def show_history(history_id: str, contents: bool, **kwargs: Any) -> list[dict[str, Any]]:
+            return [{"id": id_, "state": next(states[id_])} for id_ in kwargs["ids"]]
+
+        self.waiter.add_dataset("a", history_id="h1")
+        self.waiter.add_dataset("b", history_id="h1")
+        with (
+            mock.patch.object(self.gi.histories, "show_history", side_effect=show_history) as show_history_mock,
+            mock.patch("time.sleep") as sleep,
+        ):
+            results = list(self.waiter.wait())
+        assert sorted((_.id, _.state) for _ in results) == [("a", "ok"), ("b", "error")]
+        assert len(self.waiter) == 0
+        sleep.assert_called_once_with(1)
+        assert show_history_mock.call_count == 2
+        assert show_history_mock.call_args.kwargs["ids"] == ["a", "b"]
+        assert show_history_mock.call_args.kwargs["keys"] == DATASET_KEYS
+
+    def test_missing_from_listing(self):
+        self.waiter.add_dataset("a", history_id="h1")
+        self.waiter.add_dataset("b", history_id="h1")
+        self.waiter.add_job("j1", history_id="h1")
+        with (
+            mock.patch.object(self.gi.histories, "show_history", return_value=[{"id": "a", "state": "ok"}]),
+            mock.patch.object(
+                self.gi.datasets, "show_dataset", return_value={"id": "b", "state": "running"}
+            ) as show_dataset,
+            mock.patch.object(self.gi.jobs, "get_jobs", return_value=[]),
+            mock.patch.object(self.gi.jobs, "show_job", return_value={"id": "j1", "state": "ok"}) as show_job,
+        ):
+            results = self.waiter.poll()
+        assert sorted(_.id for _ in results) == ["a", "j1"]
+        show_dataset.assert_called_once_with("b")
+        show_job.assert_called_once_with("j1")
+        assert len(self.waiter) == 1
+        # an invalid ID raises instead of being polled until the timeout
+        with (
+            mock.patch.object(self.gi.histories, "show_history", return_value=[]),
+            mock.patch.object(
+                self.gi.datasets, "show_dataset", side_effect=ConnectionError("Not found", status_code=404)
+            ),
+            pytest.raises(ConnectionError),
+        ):
+            self.waiter.poll()
+
+    def test_dataset_collection(self):
+        self.waiter.add_dataset_collection("c1")
+        populating = {"id": "c1", "populated_state": "new", "elements": []}
+        populated = {
+            "id": "c1",
+            "populated_state": "ok",
+            "elements": [{"object": {"state": "ok"}}, {"object": {"state": "ok"}}],
+        }
+        with mock.patch.object(self.gi.dataset_collections, "show_dataset_collection", return_value=populating):
+            assert self.waiter.poll() == []
+        with mock.patch.object(self.gi.dataset_collections, "show_dataset_collection", return_value=populated):
+            (result,) = self.waiter.poll()
+        assert (result.type, result.state) == ("dataset_collection", "ok")
+        self.waiter.add_dataset_collection("c1")
+        failed = {"id": "c1", "populated_state": "failed", "elements": []}
+        with mock.patch.object(self.gi.dataset_collections, "show_dataset_collection", return_value=failed):
+            (result,) = self.waiter.poll()
+        assert result.state == "error"
+
+    def test_check_and_timeout(self):
+        waiter = Waiter(self.gi, maxwait=2, interval=1, check=True)
+        waiter.add_job("j1")
+        with (
+            mock.patch.object(self.gi.jobs, "show_job", return_value={"id": "j1", "state": "error"}),
+            pytest.raises(Exception, match="terminal state error"),
+        ):
+            waiter.poll()
+        waiter = Waiter(self.gi, maxwait=2, interval=1)
+        waiter.add_invocation("i1")
+        with (
+            mock.patch.object(self.gi.invocations, "show_invocation", return_value={"id": "i1", "state": "new"}),
+            mock.patch("time.sleep") as sleep,
+            pytest.raises(bioblend.TimeoutException),
+        ):
+            list(waiter.wait())
+        assert sleep.call_count == 2
@@ -0,0 +1,451 @@
+"""
+Lightweight local stand-in for a Galaxy server, used by the offline tests and
+benchmarks.
+
+It serves synthetic histories, jobs, datasets (with large bodies), history
+exports (via short term storage requests) and ``list:paired`` dataset
+collection archives, and the tus upload endpoints of the Galaxy API, with a configurable latency and
+bandwidth. Only the parts of the API needed by the tests and benchmarks are
+implemented.
+"""
+
+import gzip
+import io
+import json
+import re
+import tarfile
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from typing import Any
+from urllib.parse import urlsplit
+from zipfile import (
+    ZIP_STORED,
+    ZipFile,
+)
+
+from typing_extensions import Self
+
+ID = "[0-9a-f]{16}"
+TUS_URL = "/api/upload/resumable_upload"
+# Size of the blocks in which request and response bodies are throttled
+BLOCK_SIZE = 64 * 1024
+
+
+def encode_id(i: int) -> str:
+    """
+    Return a fake encoded Galaxy ID for an integer.
+    """
+    return f"{i:016x}"
+
+
+def tar_gz(files: dict[str, bytes]) -> bytes:
+    """
+    Return a gzip-compressed tar archive of the given files. The gzip header
+    has no modification time, so that the same files always give the same
+    archive.
+    """
+    f = io.BytesIO()
+    with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz, tarfile.open(fileobj=gz, mode="w") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return f.getvalue()
+
+
+class MockGalaxy:
+    """
+    Local HTTP server mimicking a Galaxy server, to be used as a context
+    manager::
+
+        with MockGalaxy(n_histories=1000, latency=0.01) as server:
+            gi = GalaxyInstance(server.url, key="fake")
+            gi.histories.get_histories()
+    """
+
+    def __init__(
+        self,
+        n_histories: int = 10,
+        n_datasets: int = 10,
+        n_jobs: int = 10,
+        dataset_size: int = 1024,
+        job_polls: int = 3,
+        latency: float = 0.0,
+        bandwidth: float | None = None,
+        version: str = "25.0",
+    ) -> None:
+        """
+        :type n_histories: int
+        :param n_histories: Number of histories
+
+        :type n_datasets: int
+        :param n_datasets: Number of datasets in each history
+
+        :type n_jobs: int
+        :param n_jobs: Number of jobs
+
+        :type dataset_size: int
+        :param dataset_size: Size (in bytes) of the dataset contents
+
+        :type job_polls: int
+        :param job_polls: Number of times a job (or a short term storage
+          request) is shown as ``running`` (or not ready) before becoming
+          ``ok`` (or ready)
+
+        :type latency: float
+        :param latency: Time (in seconds) to wait before answering each request
+
+        :type bandwidth: float
+        :param bandwidth: Maximum transfer rate (in bytes per second) of the
+          request and response bodies, or ``None`` for no limit
+
+        :type version: str
+        :param version: Major version of Galaxy to mimic, which determines the
+          format of the dataset collection archives
+        """
+        self.n_histories = n_histories
+        self.n_datasets = n_datasets
+        self.n_jobs = n_jobs
+        self.dataset_size = dataset_size
+        self.job_polls = job_polls
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.version = version
+        # Number of times each job has been shown
+        self.job_shows: Counter[str] = Counter()
+        # History ID and number of readiness checks for each short term
+        # storage request
+        self.storage_requests: dict[str, list[Any]] = {}
+        # Number of bytes received for each tus upload
+        self.uploads: dict[str, int] = {}
+        # Number of requests received for each (method, path)
+        self.requests: Counter[tuple[str, str]] = Counter()
+        self._lock = threading.Lock()
+        self._content = bytes(range(256)) * (dataset_size // 256) + bytes(dataset_size % 256)
+        self._routes: list[tuple[str, re.Pattern[str], Callable[..., tuple[int, Any, dict[str, str]]]]] = [
+            ("GET", re.compile("/api/version"), self._version),
+            ("GET", re.compile("/api/authenticate/baseauth"), self._baseauth),
+            ("GET", re.compile("/api/histories"), self._histories),
+            ("GET", re.compile(f"/api/histories/({ID})"), self._history),
+            ("PUT", re.compile(f"/api/histories/({ID})"), self._update_history),
+            ("GET", re.compile(f"/api/histories/({ID})/contents"), self._history_contents),
+            ("POST", re.compile(f"/api/histories/({ID})/prepare_store_download"), self._prepare_history_download),
+            ("GET", re.compile("/api/short_term_storage/([0-9a-f]+)/ready"), self._storage_ready),
+            ("GET", re.compile("/api/short_term_storage/([0-9a-f]+)"), self._storage_download),
+            ("GET", re.compile("/api/jobs"), self._jobs),
+            ("GET", re.compile(f"/api/jobs/({ID})"), self._job),
+            ("GET", re.compile(f"/api/datasets/({ID})"), self._dataset),
+            ("GET", re.compile(f"/api/datasets/({ID})/display"), self._display),
+            ("GET", re.compile(f"/api/dataset_collections/({ID})/download"), self._download_collection),
+            ("POST", re.compile(TUS_URL), self._create_upload),
+            ("HEAD", re.compile(f"{TUS_URL}/([0-9a-f]+)"), self._upload_offset),
+            ("PATCH", re.compile(f"{TUS_URL}/([0-9a-f]+)"), self._upload_chunk),
+        ]
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """
+        Root URL of the running server.
+        """
+        assert self._server
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> None:
+        """
+        Start the server on a free local port, in a background thread.
+        """
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        assert self._server and self._thread
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = self._thread = None
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    def throttle(self, n_bytes: int) -> None:
+        """
+        Wait for the time needed to transfer ``n_bytes`` at the configured
+        bandwidth.
+        """
+        if self.bandwidth:
+            time.sleep(n_bytes / self.bandwidth)
+
+    def route(self, method: str, path: str) -> tuple[Callable[..., tuple[int, Any, dict[str, str]]], tuple[str, ...]]:
+        for route_method, pattern, handler in self._routes:
+            if route_method == method:
+                match = pattern.fullmatch(path)
+                if match:
+                    return handler, match.groups()
+        return self._not_found, ()
+
+    def history_dict(self, i: int) -> dict[str, Any]:
+        return {
+            "id": encode_id(i),
+            "name": f"History {i}",
+            "deleted": False,
+            "purged": False,
+            "published": False,
+            "annotation": None,
+            "tags": [],
+            "state": "ok",
+            "state_ids": {"ok": [encode_id(i * self.n_datasets + j) for j in range(self.n_datasets)]},
+            "state_details": {"ok": self.n_datasets},
+            "count": self.n_datasets,
+            "size": self.n_datasets * self.dataset_size,
+            "update_time": "2026-01-01T00:00:00.000000",
+            "url": f"/api/histories/{encode_id(i)}",
+            "model_class": "History",
+        }
+
+    def dataset_dict(self, i: int) -> dict[str, Any]:
+        dataset_id = encode_id(i)
+        history_id = encode_id(i // max(self.n_datasets, 1))
+        return {
+            "id": dataset_id,
+            "name": f"Dataset {i}",
+            "hid": i % max(self.n_datasets, 1) + 1,
+            "history_id": history_id,
+            "history_content_type": "dataset",
+            "type": "file",
+            "state": "ok",
+            "deleted": False,
+            "purged": False,
+            "visible": True,
+            "file_ext": "txt",
+            "file_size": self.dataset_size,
+            "genome_build": "?",
+            "misc_info": "",
+            "annotation": None,
+            "download_url": f"/api/datasets/{dataset_id}/display",
+            "url": f"/api/histories/{history_id}/contents/{dataset_id}",
+            "model_class": "HistoryDatasetAssociation",
+        }
+
+    def job_dict(self, job_id: str, state: str) -> dict[str, Any]:
+        return {
+            "id": job_id,
+            "state": state,
+            "tool_id": "cat1",
+            "history_id": encode_id(0),
+            "exit_code": 0 if state == "ok" else None,
+            "create_time": "2026-01-01T00:00:00.000000",
+            "update_time": "2026-01-01T00:00:00.000000",
+            "model_class": "Job",
+        }
+
+    def _not_found(self, query: str, body: bytes) -> tuple[int, Any, dict[str, str]]:
+        return 404, {"err_msg": "Not found", "err_code": 404001}, {}
+
+    def _version(self, query: str, body: bytes) -> tuple[int, Any, dict[str, str]]:
+        return 200, {"version_major": self.version, "version_minor": "0"}, {}
+
+    def _baseauth(self, query: str, body: bytes) -> tuple[int, Any, dict[str, str]]:
+        return 200, {"api_key": "fake"}, {}
+
+    def _histories(self, query: str, body: bytes) -> tuple[int, Any, dict[str, str]]:
+        return 200, [self.history_dict(i) for i in range(self.n_histories)], {}
+
+    def _history(self, query: str, body: bytes, history_id: str) -> tuple[int, Any, dict[str, str]]:
+        i = int(history_id, 16)
+        if i >= self.n_histories:
+            return self._not_found(query, body)
+        return 200, self.history_dict(i), {}
+
+    def _update_history(self, query: str, body: bytes, history_id: str) -> tuple[int, Any, dict[str, str]]:
+        status, history, headers = self._history(query, body, history_id)
+        if status == 200:
+            # updates are not stored
+            history.update(json.loads(body))
+        return status, history, headers
+
+    def _history_contents(self, query: str, body: bytes, history_id: str) -> tuple[int, Any, dict[str, str]]:
+        first = int(history_id, 16) * self.n_datasets
+        return 200, [self.dataset_dict(first + j) for j in range(self.n_datasets)], {}
+
+    def history_archive(self, history_id: str) -> bytes:
+        """
+        Return a gzip-compressed tar archive of a history, with its attributes
+        and the content of its datasets.
+        """
+        i = int(history_id, 16)
+        files = {"history_attrs.txt": json.dumps(self.history_dict(i)).encode()}
+        for j in range(i * self.n_datasets, (i + 1) * self.n_datasets):
+            files[f"datasets/Dataset_{encode_id(j)}.txt"] = self._content
+        return tar_gz(files)
+
+    def collection_archive(self, collection_id: str) -> bytes:
+        """
+        Return the archive of a ``list:paired`` dataset collection with a pair
+        of datasets for each of ``n_datasets`` samples, as a zip archive
+        written sequentially (i.e. with data descriptors) for Galaxy 21.01 and
+        later, or as a gzip-compressed tar archive for earlier versions.
+        """
+        files = {
+            f"Collection {int(collection_id, 16)}/sample{j}/{direction}.txt": self._content
+            for j in range(self.n_datasets)
+            for direction in ("forward", "reverse")
+        }
+        f = io.BytesIO()
+        if self.version >= "21.01":
+            # as for a streamed response, the archive must be written without
+            # seeking back to the local headers
+            with ZipFile(UnseekableWriter(f), "w", compression=ZIP_STORED) as zip_file:
+                for name, content in files.items():
+                    zip_file.writestr(name, content)
+        else:
+            return tar_gz(files)
+        return f.getvalue()
+
+    def _prepare_history_download(self, query: str, body: bytes, history_id: str) -> tuple[int, Any, dict[str, str]]:
+        if int(history_id, 16) >= self.n_histories:
+            return self._not_found(query, body)
+        storage_request_id = uuid.uuid4().hex
+        with self._lock:
+            self.storage_requests[storage_request_id] = [history_id, 0]
+        return 200, {"storage_request_id": storage_request_id}, {}
+
+    def _storage_ready(self, query: str, body: bytes, storage_request_id: str) -> tuple[int, Any, dict[str, str]]:
+        if storage_request_id not in self.storage_requests:
+            return self._not_found(query, body)
+        with self._lock:
+            storage_request = self.storage_requests[storage_request_id]
+            storage_request[1] += 1
+            ready = storage_request[1] > self.job_polls
+        return 200, ready, {}
+
+    def _storage_download(self, query: str, body: bytes, storage_request_id: str) -> tuple[int, Any, dict[str, str]]:
+        if storage_request_id not in self.storage_requests:
+            return self._not_found(query, body)
+        history_id = self.storage_requests[storage_request_id][0]
+        return 200, self.history_archive(history_id), {"Content-Type": "application/x-tar"}
+
+    def _download_collection(self, query: str, body: bytes, collection_id: str) -> tuple[int, Any, dict[str, str]]:
+        archive_type = "zip" if self.version >= "21.01" else "tgz"
+        headers = {
+            "Content-Type": "application/zip" if archive_type == "zip" else "application/x-tar",
+            "Content-Disposition": f'attachment; filename="collection.{archive_type}"',
+        }
+        return 200, self.collection_archive(collection_id), headers
+
+    def _jobs(self, query: str, body: bytes) -> tuple[int, Any, dict[str, str]]:
+        return 200, [self.job_dict(encode_id(i), "ok") for i in range(self.n_jobs)], {}
+
+    def _job(self, query: str, body: bytes, job_id: str) -> tuple[int, Any, dict[str, str]]:
+        # any job ID is accepted, so that each caller can use its own jobs
+        with self._lock:
+            self.job_shows[job_id] += 1
+            state = "ok" if self.job_shows[job_id] > self.job_polls else "running"
+        return 200, self.job_dict(job_id, state), {}
+
+    def _dataset(self, query: str, body: bytes, dataset_id: str) -> tuple[int, Any, dict[str, str]]:
+        return 200, self.dataset_dict(int(dataset_id, 16)), {}
+
+    def _display(self, query: str, body: bytes, dataset_id: str) -> tuple[int, Any, dict[str, str]]:
+        headers = {
+            "Content-Type": "text/plain",
+            "Content-Disposition": f'attachment; filename="Dataset_{dataset_id}.txt"',
+        }
+        return 200, self._content, headers
+
+    def _create_upload(self, query: str, body: bytes) -> tuple[int, Any, dict[str, str]]:
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self.uploads[session_id] = 0
+        return 201, b"", {"Location": f"{TUS_URL}/{session_id}"}
+
+    def _upload_offset(self, query: str, body: bytes, session_id: str) -> tuple[int, Any, dict[str, str]]:
+        if session_id not in self.uploads:
+            return self._not_found(query, body)
+        return 200, b"", {"Upload-Offset": str(self.uploads[session_id]), "Tus-Resumable": "1.0.0"}
+
+    def _upload_chunk(self, query: str, body: bytes, session_id: str) -> tuple[int, Any, dict[str, str]]:
+        if session_id not in self.uploads:
+            return self._not_found(query, body)
+        with self._lock:
+            self.uploads[session_id] += len(body)
+            offset = self.uploads[session_id]
+        return 204, b"", {"Upload-Offset": str(offset), "Tus-Resumable": "1.0.0"}
+
+
+class UnseekableWriter(io.RawIOBase):
+    """
+    Write-only wrapper of a ``BytesIO`` hiding that it is seekable, e.g. to
+    write zip archives like a streaming server does.
+    """
+
+    def __init__(self, f: io.BytesIO) -> None:
+        self.f = f
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        return self.f.write(b)
+
+
+def _make_handler(server: MockGalaxy) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # keep connections alive between requests, like a real server
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _handle(self) -> None:
+            url = urlsplit(self.path)
+            with server._lock:
+                server.requests[(self.command, url.path)] += 1
+            length = int(self.headers.get("Content-Length") or 0)
+            body = bytearray()
+            while len(body) < length:
+                block = self.rfile.read(min(BLOCK_SIZE, length - len(body)))
+                if not block:
+                    break
+                body += block
+                server.throttle(len(block))
+            if server.latency:
+                time.sleep(server.latency)
+            handler, args = server.route(self.command, url.path)
+            status, payload, headers = handler(url.query, bytes(body), *args)
+            content = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            self.send_response(status)
+            if not isinstance(payload, bytes):
+                self.send_header("Content-Type", "application/json")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            if self.command == "HEAD":
+                return
+            for start in range(0, len(content), BLOCK_SIZE):
+                block = content[start : start + BLOCK_SIZE]
+                self.wfile.write(block)
+                server.throttle(len(block))
+
+        do_GET = do_HEAD = do_PATCH = do_POST = do_PUT = do_DELETE = _handle
+
+    return Handler
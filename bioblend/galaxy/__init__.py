@@ -2,33 +2,78 @@
 A base representation of an instance of Galaxy
 """
 
-from bioblend.galaxy import (
-    config,
-    container_resolution,
-    dataset_collections,
-    datasets,
-    datatypes,
-    folders,
-    forms,
-    ftpfiles,
-    genomes,
-    groups,
-    histories,
-    invocations,
-    jobs,
-    libraries,
-    quotas,
-    roles,
-    tool_data,
-    tool_dependencies,
-    tools,
-    toolshed,
-    unprivileged_tools,
-    users,
-    visual,
-    workflows,
+import importlib
+from functools import cached_property
+from typing import (
+    Any,
+    TYPE_CHECKING,
 )
-from bioblend.galaxyclient import GalaxyClient
+
+from bioblend.galaxyclient import (
+    GalaxyClient,
+    Transport,
+)
+
+if TYPE_CHECKING:
+    from bioblend.galaxy.config import ConfigClient
+    from bioblend.galaxy.container_resolution import ContainerResolutionClient
+    from bioblend.galaxy.dataset_collections import DatasetCollectionClient
+    from bioblend.galaxy.datasets import DatasetClient
+    from bioblend.galaxy.datatypes import DatatypesClient
+    from bioblend.galaxy.folders import FoldersClient
+    from bioblend.galaxy.forms import FormsClient
+    from bioblend.galaxy.ftpfiles import FTPFilesClient
+    from bioblend.galaxy.genomes import GenomeClient
+    from bioblend.galaxy.groups import GroupsClient
+    from bioblend.galaxy.histories import HistoryClient
+    from bioblend.galaxy.invocations import InvocationClient
+    from bioblend.galaxy.jobs import JobsClient
+    from bioblend.galaxy.libraries import LibraryClient
+    from bioblend.galaxy.quotas import QuotaClient
+    from bioblend.galaxy.roles import RolesClient
+    from bioblend.galaxy.tool_data import ToolDataClient
+    from bioblend.galaxy.tool_dependencies import ToolDependenciesClient
+    from bioblend.galaxy.tools import ToolClient
+    from bioblend.galaxy.toolshed import ToolShedClient
+    from bioblend.galaxy.unprivileged_tools import UnprivilegedToolsClient
+    from bioblend.galaxy.users import UserClient
+    from bioblend.galaxy.visual import VisualClient
+    from bioblend.galaxy.workflows import WorkflowClient
+
+# The client subpackages are imported only when first accessed, either as
+# attributes of this package or through the clients of a GalaxyInstance
+_SUBMODULES = {
+    "config",
+    "container_resolution",
+    "dataset_collections",
+    "datasets",
+    "datatypes",
+    "folders",
+    "forms",
+    "ftpfiles",
+    "genomes",
+    "groups",
+    "histories",
+    "invocations",
+    "jobs",
+    "libraries",
+    "quotas",
+    "roles",
+    "tool_data",
+    "tool_dependencies",
+    "tools",
+    "toolshed",
+    "unprivileged_tools",
+    "users",
+    "visual",
+    "workflows",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class GalaxyInstance(GalaxyClient):
@@ -42,6 +87,7 @@ class GalaxyInstance(GalaxyClient):
         token: str | None = None,
         verify: bool = True,
         user_agent: str | None = None,
+        transport: Transport | None = None,
     ) -> None:
         """
         A base representation of a connection to a Galaxy instance, identified
@@ -57,6 +103,9 @@ class GalaxyInstance(GalaxyClient):
 
             hl = gi.histories.get_histories()
 
+        Each of these clients, and the module defining it, is loaded when it is
+        first accessed.
+
         :type url: str
         :param url: A FQDN or IP for a given instance of Galaxy. For example:
                     http://127.0.0.1:8080 . If a Galaxy instance is served under
@@ -89,35 +138,186 @@ class GalaxyInstance(GalaxyClient):
 
         :param verify: Whether to verify the server's TLS certificate
         :type verify: bool
+
+        :type transport: callable
+        :param transport: Transport used to send the requests, see
+                          :mod:`bioblend.transport`. It can also be assigned
+                          to the ``transport`` attribute later, but passing it
+                          here also covers the request made to get the API
+                          key from the email and password.
         """
         super().__init__(
-            url, key=key, email=email, password=password, token=token, verify=verify, user_agent=user_agent
+            url,
+            key=key,
+            email=email,
+            password=password,
+            token=token,
+            verify=verify,
+            user_agent=user_agent,
+            transport=transport,
         )
-        self.libraries = libraries.LibraryClient(self)
-        self.histories = histories.HistoryClient(self)
-        self.workflows = workflows.WorkflowClient(self)
-        self.invocations = invocations.InvocationClient(self)
-        self.datasets = datasets.DatasetClient(self)
-        self.dataset_collections = dataset_collections.DatasetCollectionClient(self)
-        self.users = users.UserClient(self)
-        self.genomes = genomes.GenomeClient(self)
-        self.tools = tools.ToolClient(self)
-        self.toolshed = toolshed.ToolShedClient(self)
-        self.toolShed = self.toolshed  # historical alias
-        self.config = config.ConfigClient(self)
-        self.container_resolution = container_resolution.ContainerResolutionClient(self)
-        self.visual = visual.VisualClient(self)
-        self.quotas = quotas.QuotaClient(self)
-        self.groups = groups.GroupsClient(self)
-        self.roles = roles.RolesClient(self)
-        self.datatypes = datatypes.DatatypesClient(self)
-        self.jobs = jobs.JobsClient(self)
-        self.forms = forms.FormsClient(self)
-        self.ftpfiles = ftpfiles.FTPFilesClient(self)
-        self.tool_data = tool_data.ToolDataClient(self)
-        self.folders = folders.FoldersClient(self)
-        self.tool_dependencies = tool_dependencies.ToolDependenciesClient(self)
-        self.unprivileged_tools = unprivileged_tools.UnprivilegedToolsClient(self)
+        # Incremented by the requests which may change the installed tools,
+        # to invalidate the tool ids cached by the objects tool client
+        self._toolbox_version = 0
+
+    @cached_property
+    def libraries(self) -> "LibraryClient":
+        from bioblend.galaxy.libraries import LibraryClient
+
+        return LibraryClient(self)
+
+    @cached_property
+    def histories(self) -> "HistoryClient":
+        from bioblend.galaxy.histories import HistoryClient
+
+        return HistoryClient(self)
+
+    @cached_property
+    def workflows(self) -> "WorkflowClient":
+        from bioblend.galaxy.workflows import WorkflowClient
+
+        return WorkflowClient(self)
+
+    @cached_property
+    def invocations(self) -> "InvocationClient":
+        from bioblend.galaxy.invocations import InvocationClient
+
+        return InvocationClient(self)
+
+    @cached_property
+    def datasets(self) -> "DatasetClient":
+        from bioblend.galaxy.datasets import DatasetClient
+
+        return DatasetClient(self)
+
+    @cached_property
+    def dataset_collections(self) -> "DatasetCollectionClient":
+        from bioblend.galaxy.dataset_collections import DatasetCollectionClient
+
+        return DatasetCollectionClient(self)
+
+    @cached_property
+    def users(self) -> "UserClient":
+        from bioblend.galaxy.users import UserClient
+
+        return UserClient(self)
+
+    @cached_property
+    def genomes(self) -> "GenomeClient":
+        from bioblend.galaxy.genomes import GenomeClient
+
+        return GenomeClient(self)
+
+    @cached_property
+    def tools(self) -> "ToolClient":
+        from bioblend.galaxy.tools import ToolClient
+
+        return ToolClient(self)
+
+    @cached_property
+    def toolshed(self) -> "ToolShedClient":
+        from bioblend.galaxy.toolshed import ToolShedClient
+
+        return ToolShedClient(self)
+
+    @property
+    def toolShed(self) -> "ToolShedClient":
+        # historical alias
+        return self.toolshed
+
+    @cached_property
+    def config(self) -> "ConfigClient":
+        from bioblend.galaxy.config import ConfigClient
+
+        return ConfigClient(self)
+
+    @cached_property
+    def container_resolution(self) -> "ContainerResolutionClient":
+        from bioblend.galaxy.container_resolution import ContainerResolutionClient
+
+        return ContainerResolutionClient(self)
+
+    @cached_property
+    def visual(self) -> "VisualClient":
+        from bioblend.galaxy.visual import VisualClient
+
+        return VisualClient(self)
+
+    @cached_property
+    def quotas(self) -> "QuotaClient":
+        from bioblend.galaxy.quotas import QuotaClient
+
+        return QuotaClient(self)
+
+    @cached_property
+    def groups(self) -> "GroupsClient":
+        from bioblend.galaxy.groups import GroupsClient
+
+        return GroupsClient(self)
+
+    @cached_property
+    def roles(self) -> "RolesClient":
+        from bioblend.galaxy.roles import RolesClient
+
+        return RolesClient(self)
+
+    @cached_property
+    def datatypes(self) -> "DatatypesClient":
+        from bioblend.galaxy.datatypes import DatatypesClient
+
+        return DatatypesClient(self)
+
+    @cached_property
+    def jobs(self) -> "JobsClient":
+        from bioblend.galaxy.jobs import JobsClient
+
+        return JobsClient(self)
+
+    @cached_property
+    def forms(self) -> "FormsClient":
+        from bioblend.galaxy.forms import FormsClient
+
+        return FormsClient(self)
+
+    @cached_property
+    def ftpfiles(self) -> "FTPFilesClient":
+        from bioblend.galaxy.ftpfiles import FTPFilesClient
+
+        return FTPFilesClient(self)
+
+    @cached_property
+    def tool_data(self) -> "ToolDataClient":
+        from bioblend.galaxy.tool_data import ToolDataClient
+
+        return ToolDataClient(self)
+
+    @cached_property
+    def folders(self) -> "FoldersClient":
+        from bioblend.galaxy.folders import FoldersClient
+
+        return FoldersClient(self)
+
+    @cached_property
+    def tool_dependencies(self) -> "ToolDependenciesClient":
+        from bioblend.galaxy.tool_dependencies import ToolDependenciesClient
+
+        return ToolDependenciesClient(self)
+
+    @cached_property
+    def unprivileged_tools(self) -> "UnprivilegedToolsClient":
+        from bioblend.galaxy.unprivileged_tools import UnprivilegedToolsClient
+
+        return UnprivilegedToolsClient(self)
+
+    @cached_property
+    def server_version(self) -> dict[str, Any]:
+        """
+        Version of the Galaxy server, as returned by
+        :meth:`~bioblend.galaxy.config.ConfigClient.get_version`. It is
+        fetched when first accessed and then cached, use ``get_version()`` to
+        get the current version of a server which may have been upgraded.
+        """
+        return self.config.get_version()
 
     def __repr__(self) -> str:
         """
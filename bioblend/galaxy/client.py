@@ -17,9 +17,14 @@ import requests
 
 import bioblend
 
-# The following import must be preserved for compatibility because
-# ConnectionError class was originally defined here
-from bioblend import ConnectionError
+# The import of ConnectionError must be preserved for compatibility because
+# this class was originally defined here
+from bioblend import (
+    ConnectionError,
+    NotReady,
+    PollingStrategy,
+    wait_on,
+)
 
 if TYPE_CHECKING:
     from bioblend.galaxyclient import GalaxyClient
@@ -165,6 +170,8 @@ class Client:
                 )
             else:
                 bioblend.log.warning(msg)
+                if self.gi.metrics is not None:
+                    self.gi.metrics.record_retry("GET", url)
                 time.sleep(retry_delay)
 
     def _post(
@@ -269,3 +276,40 @@ class Client:
             body=r.text,
             status_code=r.status_code,
         )
+
+    # TODO: Move to a new ``bioblend.galaxy.short_term_storage`` module
+    def _wait_for_short_term_storage(
+        self,
+        storage_request_id: str,
+        maxwait: float = 60,
+        interval: float | PollingStrategy = 3,
+        json: bool = True,
+        stream: bool = False,
+    ) -> Any:
+        """
+        Wait until a short term storage request is ready
+
+        :type storage_request_id: str
+        :param storage_request_id: Storage request ID to wait for.
+
+        :type maxwait: float
+        :param maxwait: Total time (in seconds) to wait for the storage request
+          to become ready. After this time, a ``TimeoutException`` will be
+          raised.
+
+        :type interval: float
+        :param interval: Time (in seconds) to wait between 2 consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it.
+
+        :return: The decoded response if ``json`` is set to ``True``, otherwise
+          the response object
+        """
+        url = f"{self.gi.url}/short_term_storage/{storage_request_id}"
+        is_ready_url = f"{url}/ready"
+
+        def check_and_get_short_term_storage() -> Any:
+            if self._get(url=is_ready_url):
+                return self._get(url=url, json=json, stream=stream)
+            raise NotReady(f"Storage request {storage_request_id} is not ready")
+
+        return wait_on(check_and_get_short_term_storage, maxwait=maxwait, interval=interval)
@@ -12,6 +12,7 @@ if TYPE_CHECKING:
 
 
 class ConfigClient(Client):
+    gi: "GalaxyInstance"
     module = "configuration"
 
     def __init__(self, galaxy_instance: "GalaxyInstance") -> None:
@@ -82,7 +83,8 @@ class ConfigClient(Client):
         :return: None
         """
         url = f"{self._make_url()}/toolbox"
-        return self._put(url=url)
+        self._put(url=url)
+        self.gi._toolbox_version += 1
 
     def decode_id(self, encoded_id: str) -> int:
         """
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Iterable
 from typing import (
     Any,
     TYPE_CHECKING,
@@ -8,11 +9,18 @@ from typing import (
 from bioblend import (
     CHUNK_SIZE,
     NotReady,
+    PollingStrategy,
+    STREAM_CHUNK_SIZE,
     TimeoutException,
     wait_on,
 )
 from bioblend.galaxy.client import Client
 from bioblend.galaxy.datasets import TERMINAL_STATES
+from bioblend.util import (
+    chunks_reader,
+    extract_tar,
+    extract_zip,
+)
 
 if TYPE_CHECKING:
     from bioblend.galaxy import GalaxyInstance
@@ -127,41 +135,92 @@ class DatasetCollectionClient(Client):
         url = self._make_url(module_id=dataset_collection_id)
         return self._get(id=dataset_collection_id, url=url, params=params)
 
-    def download_dataset_collection(self, dataset_collection_id: str, file_path: str) -> dict[str, Any]:
+    def download_dataset_collection(
+        self,
+        dataset_collection_id: str,
+        file_path: str,
+        extract: bool = False,
+        identifiers: Iterable[str] | None = None,
+    ) -> dict[str, Any]:
         """
-        Download a history dataset collection as an archive.
+        Download a history dataset collection as an archive, or extract its
+        elements while the archive is downloaded.
 
         :type dataset_collection_id: str
         :param dataset_collection_id: Encoded dataset collection ID
 
         :type file_path: str
-        :param file_path: The path to which the archive will be downloaded
+        :param file_path: The path to which the archive will be downloaded, or
+          the directory (created if needed) to which it will be extracted if
+          ``extract`` is ``True``
+
+        :type extract: bool
+        :param extract: if ``True``, extract the elements of the collection
+          while the archive is streamed, without saving the archive itself
+
+        :type identifiers: list of str
+        :param identifiers: If provided, extract only the elements with one of
+          these element identifiers. For nested collections (e.g.
+          ``list:paired``), an identifier selects all the elements below it,
+          e.g. ``sample1`` selects both datasets of the pair ``sample1``,
+          while ``forward`` selects the forward dataset of every pair.
+          Requires ``extract`` to be ``True``.
 
         :rtype: dict
-        :return: Information about the downloaded archive.
+        :return: Information about the downloaded archive. If ``extract`` is
+          ``True``, the ``extracted_files`` key contains the paths of the
+          extracted files.
 
         .. note::
           This method downloads a ``zip`` archive for Galaxy 21.01 and later.
           For earlier versions of Galaxy this method downloads a ``tgz`` archive.
         """
+        selected = None
+        if identifiers is not None:
+            if not extract:
+                raise ValueError("identifiers can only be used if extract is True")
+            selected = set(identifiers)
         url = self._make_url(module_id=dataset_collection_id) + "/download"
         r = self.gi.make_get_request(url, stream=True)
         r.raise_for_status()
 
-        archive_type = "zip" if self.gi.config.get_version()["version_major"] >= "21.01" else "tgz"
-
-        with open(file_path, "wb") as fp:
-            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
-                if chunk:
-                    fp.write(chunk)
+        archive_type = "zip" if self.gi.server_version["version_major"] >= "21.01" else "tgz"
+
+        if not extract:
+            with open(file_path, "wb") as fp:
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        fp.write(chunk)
+            return {"file_path": file_path, "archive_type": archive_type}
+
+        def select(name: str) -> bool:
+            assert selected is not None
+            # the archive member names are the collection name followed by the
+            # element identifiers, with the extension (which may contain dots,
+            # e.g. "fastqsanger.gz") appended to the last one
+            element_path = name.split("/")[1:]
+            if not element_path:
+                return False
+            *parents, file_name = element_path
+            return not selected.isdisjoint(parents) or any(
+                file_name == identifier or file_name.startswith(f"{identifier}.") for identifier in selected
+            )
 
-        return {"file_path": file_path, "archive_type": archive_type}
+        extract_archive = extract_zip if archive_type == "zip" else extract_tar
+        with r:
+            extracted_files = extract_archive(
+                chunks_reader(r.iter_content(chunk_size=STREAM_CHUNK_SIZE), STREAM_CHUNK_SIZE),
+                file_path,
+                STREAM_CHUNK_SIZE,
+                select if selected is not None else None,
+            )
+        return {"file_path": file_path, "archive_type": archive_type, "extracted_files": extracted_files}
 
     def wait_for_dataset_collection(
         self,
         dataset_collection_id: str,
         maxwait: float = 12000,
-        interval: float = 3,
+        interval: float | PollingStrategy = 3,
         proportion_complete: float = 1.0,
         check: bool = True,
     ) -> dict[str, Any]:
@@ -178,7 +237,8 @@ class DatasetCollectionClient(Client):
           a ``TimeoutException`` will be raised.
 
         :type interval: float
-        :param interval: Time (in seconds) to wait between two consecutive checks.
+        :param interval: Time (in seconds) to wait between two consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it.
 
         :type proportion_complete: float
         :param proportion_complete: Proportion of elements in this collection
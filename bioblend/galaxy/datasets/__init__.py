@@ -18,6 +18,7 @@ from requests import Response
 from bioblend import (
     CHUNK_SIZE,
     NotReady,
+    PollingStrategy,
     TimeoutException,
     wait_on,
 )
@@ -203,6 +204,7 @@ class DatasetClient(Client):
         update_time_min: str | None = None,
         update_time_max: str | None = None,
         order: str = "create_time-dsc",
+        view: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Get the latest datasets, or select another subset by specifying optional
@@ -271,6 +273,10 @@ class DatasetClient(Client):
           for ascending and descending order respectively. Multiple attributes can be
           stacked as a comma-separated list of values, e.g. ``create_time-asc,hid-dsc``.
 
+        :type view: str
+        :param view: Serialization view of the returned datasets, e.g.
+          ``detailed`` to get the same information as ``show_dataset()``.
+
         :rtype: list
         :return: A list of datasets
         """
@@ -281,6 +287,8 @@ class DatasetClient(Client):
         }
         if history_id:
             params["history_id"] = history_id
+        if view:
+            params["view"] = view
 
         q: list[str] = []
         qv = []
@@ -398,7 +406,7 @@ class DatasetClient(Client):
         return self.gi.datasets._put(url=url, payload=payload)
 
     def wait_for_dataset(
-        self, dataset_id: str, maxwait: float = 12000, interval: float = 3, check: bool = True
+        self, dataset_id: str, maxwait: float = 12000, interval: float | PollingStrategy = 3, check: bool = True
     ) -> dict[str, Any]:
         """
         Wait until a dataset is in a terminal state.
@@ -411,7 +419,8 @@ class DatasetClient(Client):
           become terminal. After this time, a ``TimeoutException`` will be raised.
 
         :type interval: float
-        :param interval: Time (in seconds) to wait between 2 consecutive checks.
+        :param interval: Time (in seconds) to wait between 2 consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it.
 
         :type check: bool
         :param check: Whether to check if the dataset terminal state is 'ok'.
@@ -5,33 +5,97 @@ Contains possible interactions with the Galaxy Histories
 import logging
 import re
 import sys
-import time
 import typing
-import webbrowser
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from re import Pattern
 from typing import (
     Any,
     IO,
     Literal,
+    NamedTuple,
     overload,
     Union,
 )
 
 import bioblend
 from bioblend import (
+    AdaptiveInterval,
     ConnectionError,
+    ExponentialBackoff,
     NotReady,
+    PollingStrategy,
+    STREAM_CHUNK_SIZE,
+    TimeoutException,
     wait_on,
 )
 from bioblend.galaxy.client import Client
 from bioblend.galaxy.dataset_collections import CollectionDescription
-from bioblend.util import attach_file
+from bioblend.util import (
+    attach_file,
+    chunks_reader,
+    extract_tar,
+)
 
 if typing.TYPE_CHECKING:
     from bioblend.galaxy import GalaxyInstance
 
 log = logging.getLogger(__name__)
 
+# Operations of the history contents bulk API
+BULK_OPERATIONS = (
+    "add_tags",
+    "change_datatype",
+    "change_dbkey",
+    "delete",
+    "hide",
+    "purge",
+    "remove_tags",
+    "undelete",
+    "unhide",
+)
+# Updates applied to each item by the per-item fallback of the bulk operations
+# which do not depend on the parameters or the current item
+_BULK_ITEM_UPDATES = {
+    "hide": {"visible": False},
+    "unhide": {"visible": True},
+    "undelete": {"deleted": False},
+}
+# Separator between the update time and the item ids in the cursors of
+# HistoryClient.changes_since()
+_CURSOR_SEPARATOR = "|"
+
+
+class CopiedContent(NamedTuple):
+    """
+    Outcome of the copy of one of the items requested with
+    :meth:`HistoryClient.copy_contents`.
+    """
+
+    content_id: str
+    """ID of the copied item"""
+    source: str
+    """Source of the copied item: 'hda', 'hdca', 'library' or 'library_folder'"""
+    content: Any
+    """Information about the new history item, or ``None`` if the copy failed"""
+    error: Exception | None
+    """Exception raised by the copy, if it failed"""
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the item was copied successfully.
+        """
+        return self.error is None
+
+
+def _filter_params(filters: dict[str, Any]) -> dict[str, list[str]]:
+    """
+    Convert history contents filters to the q/qv query parameters of the
+    Galaxy API.
+    """
+    return {"q": list(filters), "qv": [str(_) for _ in filters.values()]}
+
 
 class HistoryClient(Client):
     gi: "GalaxyInstance"
@@ -39,6 +103,9 @@ class HistoryClient(Client):
 
     def __init__(self, galaxy_instance: "GalaxyInstance") -> None:
         super().__init__(galaxy_instance)
+        # Shared by the exports, so that the polling adapts to how long they
+        # usually take on this server
+        self._export_interval = AdaptiveInterval(initial=1, fraction=0.2, min_interval=0.5, max_interval=30)
 
     def create_history(self, name: str | None = None) -> dict[str, Any]:
         """
@@ -331,6 +398,8 @@ class HistoryClient(Client):
         self,
         history_id: str,
         contents: Literal[False] = False,
+        *,
+        keys: list[str] | None = None,
     ) -> dict[str, Any]: ...
 
     @overload
@@ -343,6 +412,9 @@ class HistoryClient(Client):
         details: str | None = None,
         types: list[str] | None = None,
         keys: list[str] | None = None,
+        ids: list[str] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
     ) -> list[dict[str, Any]]: ...
 
     def show_history(
@@ -354,6 +426,9 @@ class HistoryClient(Client):
         details: str | None = None,
         types: list[str] | None = None,
         keys: list[str] | None = None,
+        ids: list[str] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
     ) -> dict[str, Any] | list[dict[str, Any]]:
         """
         Get details of a given history. By default, just get the history meta
@@ -392,6 +467,21 @@ class HistoryClient(Client):
         :type keys: List[str]
         :param keys: List of fields to return
 
+        :type ids: List[str]
+        :param ids: When ``contents=True``, return only the history items with
+          these encoded IDs.
+
+        :type limit: int
+        :param limit: When ``contents=True``, maximum number of history items
+          to return, ordered by hid. Setting ``limit`` or ``offset`` makes
+          Galaxy serialize the items with the newer history contents API,
+          so the keys of the returned dicts may differ slightly.
+
+        :type offset: int
+        :param offset: When ``contents=True``, number of history items to
+          skip, ordered by hid. The other filters, including ``ids``, are
+          applied before the items are paginated.
+
         :rtype: dict or list of dicts
         :return: details of the given history or list of dataset info
 
@@ -401,16 +491,41 @@ class HistoryClient(Client):
             more extensive functionality for filtering and ordering the results.
 
         """
-        params: dict[str, bool | list | str] = {}
+        params: dict[str, bool | int | list | str] = {}
         if contents:
             if details:
                 params["details"] = details
-            if deleted is not None:
-                params["deleted"] = deleted
-            if visible is not None:
-                params["visible"] = visible
-            if types is not None:
-                params["types"] = types
+            if limit is None and offset is None:
+                if ids is not None:
+                    params["ids"] = ",".join(ids)
+                if deleted is not None:
+                    params["deleted"] = deleted
+                if visible is not None:
+                    params["visible"] = visible
+                if types is not None:
+                    params["types"] = types
+            else:
+                # the newer API expresses the filters as q/qv pairs
+                q: list[str] = []
+                qv: list[str] = []
+                if deleted is not None:
+                    q.append("deleted")
+                    qv.append(str(deleted))
+                if visible is not None:
+                    q.append("visible")
+                    qv.append(str(visible))
+                if types is not None and len(set(types)) == 1:
+                    # there are only 2 history content types
+                    q.append("history_content_type-eq")
+                    qv.append(types[0])
+                if ids is not None:
+                    q.append("encoded_id-in")
+                    qv.append(",".join(ids))
+                params.update(v="dev", order="hid-asc", q=q, qv=qv)
+                if limit is not None:
+                    params["limit"] = limit
+                if offset is not None:
+                    params["offset"] = offset
         if keys:
             params["keys"] = ",".join(keys)
         return self._get(id=history_id, contents=contents, params=params)
@@ -707,6 +822,174 @@ class HistoryClient(Client):
         url = "/".join((self._make_url(history_id, contents=True), "dataset_collections", dataset_collection_id))
         return self._put(payload=kwargs, url=url)
 
+    def bulk_update_contents(
+        self,
+        history_id: str,
+        operation: Literal[
+            "add_tags",
+            "change_datatype",
+            "change_dbkey",
+            "delete",
+            "hide",
+            "purge",
+            "remove_tags",
+            "undelete",
+            "unhide",
+        ],
+        items: list[str] | list[dict[str, str]] | None = None,
+        filters: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        chunk_size: int = 500,
+        max_workers: int = 4,
+    ) -> dict[str, Any]:
+        """
+        Apply an operation to many history items at once, using the history
+        contents bulk API of Galaxy.
+
+        :type history_id: str
+        :param history_id: Encoded history ID
+
+        :type operation: str
+        :param operation: Operation to apply: ``add_tags``,
+          ``change_datatype``, ``change_dbkey``, ``delete``, ``hide``,
+          ``purge``, ``remove_tags``, ``undelete`` or ``unhide``
+
+        :type items: list
+        :param items: History items to apply the operation to, either as a
+          list of dataset IDs or as a list of dicts with ``id`` and
+          ``history_content_type`` (``dataset`` or ``dataset_collection``)
+          keys. Cannot be combined with ``filters``.
+
+        :type filters: dict
+        :param filters: Filters selecting the history items to apply the
+          operation to, mapping filter names to values, e.g.
+          ``{"deleted": False, "extension-eq": "bed"}``. If neither ``items``
+          nor ``filters`` is specified, the operation is applied to all the
+          items of the history.
+
+        :type params: dict
+        :param params: Parameters of the operation: ``{"tags": [...]}`` for
+          ``add_tags`` and ``remove_tags``, ``{"datatype": ...}`` for
+          ``change_datatype`` and ``{"dbkey": ...}`` for ``change_dbkey``
+
+        :type chunk_size: int
+        :param chunk_size: Maximum number of ``items`` sent with each request
+
+        :type max_workers: int
+        :param max_workers: Maximum number of concurrent requests when
+          falling back to updating the items one by one
+
+        :rtype: dict
+        :return: Outcome of the operation, with the ``success_count`` and
+          ``errors`` (list of dicts with ``item`` and ``error`` keys) keys.
+          If the request for a chunk of ``items`` other than the first one
+          fails, the items of the previous chunks have already been updated:
+          the error is then reported for each of the items not updated yet,
+          instead of being raised.
+
+        .. note::
+          On Galaxy releases without the bulk API (before 22.05), the
+          operation is applied to each item separately, with up to
+          ``max_workers`` concurrent requests.
+        """
+        if operation not in BULK_OPERATIONS:
+            raise ValueError(f"Invalid operation: {operation}")
+        if items is not None and filters is not None:
+            raise ValueError("Only one of items and filters can be specified")
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be >= 1 (got: {chunk_size})")
+        content_items = (
+            None
+            if items is None
+            else [item if isinstance(item, dict) else {"id": item, "history_content_type": "dataset"} for item in items]
+        )
+        filter_params = _filter_params(filters) if filters else None
+        payload: dict[str, Any] = {"operation": operation}
+        if params:
+            payload["params"] = {"type": operation, **params}
+        url = "/".join((self._make_url(history_id, contents=True), "bulk"))
+        chunks = (
+            [None]
+            if content_items is None
+            else [content_items[i : i + chunk_size] for i in range(0, len(content_items), chunk_size)]
+        )
+        if self.gi.server_version["version_major"] < "22.05":
+            if content_items is None:
+                content_items = self._get(
+                    id=history_id,
+                    contents=True,
+                    params={**(filter_params or {}), "v": "dev", "keys": "id,history_content_type"},
+                )
+            return self._update_contents_one_by_one(history_id, operation, content_items, params, max_workers)
+        result: dict[str, Any] = {"success_count": 0, "errors": []}
+        for i, chunk in enumerate(chunks):
+            chunk_payload = payload if chunk is None else {**payload, "items": chunk}
+            try:
+                chunk_result = self._put(payload=chunk_payload, url=url, params=filter_params)
+            except ConnectionError as e:
+                if i == 0:
+                    raise
+                log.warning(
+                    "Bulk update of history %s contents failed after %d items: %s", history_id, i * chunk_size, e
+                )
+                result["errors"].extend(
+                    {"item": item, "error": str(e)} for remaining in chunks[i:] for item in remaining or []
+                )
+                return result
+            result["success_count"] += chunk_result["success_count"]
+            result["errors"].extend(chunk_result["errors"])
+        return result
+
+    def _update_contents_one_by_one(
+        self,
+        history_id: str,
+        operation: str,
+        items: list[dict[str, str]],
+        params: dict[str, Any] | None,
+        max_workers: int,
+    ) -> dict[str, Any]:
+        """
+        Apply a bulk operation to each history item separately.
+        """
+        params = params or {}
+
+        def update_item(item: dict[str, str]) -> str | None:
+            is_collection = item["history_content_type"] == "dataset_collection"
+            show = self.show_dataset_collection if is_collection else self.show_dataset
+            update = self.update_dataset_collection if is_collection else self.update_dataset
+            try:
+                if operation in ("delete", "purge"):
+                    if is_collection:
+                        url = "/".join((self._make_url(history_id, contents=True), "dataset_collections", item["id"]))
+                        self._delete(payload={"purge": True} if operation == "purge" else {}, url=url)
+                    else:
+                        self.delete_dataset(history_id, item["id"], purge=operation == "purge")
+                elif operation in ("add_tags", "remove_tags"):
+                    tags = show(history_id, item["id"])["tags"]
+                    if operation == "add_tags":
+                        tags = tags + [_ for _ in params["tags"] if _ not in tags]
+                    else:
+                        tags = [_ for _ in tags if _ not in params["tags"]]
+                    update(history_id, item["id"], tags=tags)
+                elif operation == "change_dbkey":
+                    update(history_id, item["id"], genome_build=params["dbkey"])
+                elif operation == "change_datatype":
+                    update(history_id, item["id"], datatype=params["datatype"])
+                else:
+                    update(history_id, item["id"], **_BULK_ITEM_UPDATES[operation])
+            except Exception as e:
+                return str(e)
+            return None
+
+        if not items:
+            return {"success_count": 0, "errors": []}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            errors = list(executor.map(update_item, items))
+        return {
+            "success_count": errors.count(None),
+            "errors": [{"item": item, "error": error} for item, error in zip(items, errors) if error is not None],
+        }
+
     def create_history_tag(self, history_id: str, tag: str) -> dict[str, Any]:
         """
         Create history tag
@@ -866,6 +1149,80 @@ class HistoryClient(Client):
                 state["percent_complete"] = 0
         return state
 
+    def changes_since(self, history_id: str, since: str | None = None, keys: list[str] | None = None) -> dict[str, Any]:
+        """
+        Get the history contents which have been updated since the given time.
+
+        This is meant to be called periodically to monitor a (possibly large)
+        history, with each call returning only the items which have changed
+        since the previous one. The history state counters are checked first:
+        if the history has not been updated since ``since``, the history
+        contents are not requested at all.
+
+        :type history_id: str
+        :param history_id: Encoded history ID
+
+        :type since: str
+        :param since: Cursor returned by the previous call, or an update time
+          in ISO 8601 format. If not set, all the history contents are
+          returned.
+
+        :type keys: List[str]
+        :param keys: List of fields to return for each history item. The
+          ``id`` and ``update_time`` fields are always included.
+
+        :rtype: dict
+        :return: A dict with the following keys:
+            'contents' = List of the history items updated after ``since``.
+            'cursor' = Value to pass as ``since`` to the next call, a string
+            which can be persisted to resume monitoring the history later.
+            'state' = Current state of the history.
+            'state_details' = Number of history datasets in each state.
+            'update_time' = Last update time of the history.
+
+        .. note::
+          This method works only on Galaxy 21.05 or later.
+        """
+        # The cursor is the latest update time of the returned items, followed
+        # by the ids of the items with this update time, which have already
+        # been returned
+        since_time, _, since_ids = since.partition(_CURSOR_SEPARATOR) if since is not None else (None, "", "")
+        seen = set(since_ids.split(",")) if since_ids else set()
+        history = self.show_history(history_id, keys=["state", "state_details", "update_time"])
+        changes: dict[str, Any] = {
+            "state": history["state"],
+            "state_details": history["state_details"],
+            "update_time": history["update_time"],
+        }
+        if since_time is not None and history["update_time"] <= since_time:
+            # An item updated at exactly since_time after the previous call
+            # is returned only after the next update of the history
+            changes.update(contents=[], cursor=since)
+            return changes
+        params: dict[str, Any] = {"v": "dev"}
+        if since_time is not None:
+            # items updated at since_time may not all have been returned yet
+            params["q"] = ["update_time-ge"]
+            params["qv"] = [since_time]
+        if keys:
+            params["keys"] = ",".join(dict.fromkeys(["id", "update_time", *keys]))
+        contents = [
+            item
+            for item in self._get(id=history_id, contents=True, params=params)
+            if not (item["update_time"] == since_time and item["id"] in seen)
+        ]
+        # The cursor is based only on the update times of the returned items,
+        # so that items updated while this method runs are not skipped
+        cursor_time, cursor_ids = since_time, set(seen)
+        for item in contents:
+            if cursor_time is None or item["update_time"] > cursor_time:
+                cursor_time, cursor_ids = item["update_time"], {item["id"]}
+            elif item["update_time"] == cursor_time:
+                cursor_ids.add(item["id"])
+        cursor = None if cursor_time is None else f"{cursor_time}{_CURSOR_SEPARATOR}{','.join(sorted(cursor_ids))}"
+        changes.update(contents=contents, cursor=cursor)
+        return changes
+
     def get_most_recently_used_history(self) -> dict[str, Any]:
         """
         Returns the current user's most recently used history (not deleted).
@@ -884,6 +1241,7 @@ class HistoryClient(Client):
         include_deleted: bool = False,
         wait: bool = False,
         maxwait: float | None = None,
+        interval: float | PollingStrategy | None = None,
     ) -> str:
         """
         Start a job to create an export archive for the given history.
@@ -910,6 +1268,12 @@ class HistoryClient(Client):
         :param maxwait: Total time (in seconds) to wait for the export to become
           ready. When set, implies that ``wait`` is ``True``.
 
+        :type interval: float
+        :param interval: Time (in seconds) to wait between 2 consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it. If
+          not set, the interval starts at 1 second and doubles after each
+          check, up to 30 seconds.
+
         :rtype: str
         :return: ``jeha_id`` of the export, or empty if ``wait`` is ``False``
           and the export is not ready.
@@ -926,27 +1290,22 @@ class HistoryClient(Client):
             "include_hidden": include_hidden,
             "include_deleted": include_deleted,
         }
+        if interval is None:
+            interval = ExponentialBackoff(initial=1, max_interval=30)
         url = f"{self._make_url(history_id)}/exports"
-        time_left = maxwait
-        while True:
+
+        def check_and_get_export() -> dict[str, Any]:
             try:
-                r = self._put(url=url, params=params)
+                return self._put(url=url, params=params)
             except ConnectionError as e:
-                if e.status_code == 202:  # export is not ready
-                    if time_left > 0:
-                        log.info(
-                            "Waiting for the export of history %s to complete. Will wait %i more s",
-                            history_id,
-                            time_left,
-                        )
-                        time.sleep(1)
-                        time_left -= 1
-                    else:
-                        return ""
-                else:
-                    raise
-            else:
-                break
+                if e.status_code == 202:
+                    raise NotReady(f"Export of history {history_id} is not ready")
+                raise
+
+        try:
+            r = wait_on(check_and_get_export, maxwait=maxwait, interval=interval)
+        except TimeoutException:
+            return ""
         jeha_id = r["download_url"].rsplit("/", 1)[-1]
         return jeha_id
 
@@ -979,6 +1338,119 @@ class HistoryClient(Client):
         for chunk in r.iter_content(chunk_size):
             outf.write(chunk)
 
+    def export_to(
+        self,
+        history_id: str,
+        sink: str | IO[bytes],
+        extract: bool = False,
+        model_store_format: str = "tar.gz",
+        include_files: bool = True,
+        include_hidden: bool = False,
+        include_deleted: bool = False,
+        maxwait: float = 12000,
+        interval: float | PollingStrategy | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> None:
+        """
+        Export a history and stream the archive to a file, or extract it to a
+        directory as it is downloaded.
+
+        The archive is prepared with a short term storage request. For Galaxy
+        releases older than 22.05, this falls back to :meth:`export_history`
+        and :meth:`download_history`.
+
+        :type history_id: str
+        :param history_id: history ID
+
+        :type sink: str or file
+        :param sink: Path of the file to write the archive to, or of the
+          directory to extract it to if ``extract`` is ``True``. Alternatively,
+          a file object open for writing in binary mode.
+
+        :type extract: bool
+        :param extract: if ``True``, extract the archive to the ``sink``
+          directory (created if needed) while it is downloaded, without writing
+          the archive to disk. Requires a tar ``model_store_format``.
+
+        :type model_store_format: str
+        :param model_store_format: format of the archive, e.g. 'tar.gz',
+          'tar', 'bag.tgz', 'bag.tar', 'bag.zip' or 'rocrate.zip'
+
+        :type include_files: bool
+        :param include_files: whether to include the dataset files in the
+          export
+
+        :type include_hidden: bool
+        :param include_hidden: whether to include hidden datasets in the export
+
+        :type include_deleted: bool
+        :param include_deleted: whether to include deleted datasets in the
+          export
+
+        :type maxwait: float
+        :param maxwait: Total time (in seconds) to wait for the export to become
+          ready. After this time, a ``TimeoutException`` will be raised.
+
+        :type interval: float
+        :param interval: Time (in seconds) to wait between 2 consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it. If
+          not set, the interval adapts to the duration of the previous exports
+          made with this client.
+
+        :type chunk_size: int
+        :param chunk_size: how many bytes at a time should be read into memory
+
+        :rtype: None
+        :return: None
+        """
+        tar_formats = ("tar.gz", "tgz", "tar", "bag.tgz", "bag.tar")
+        if extract:
+            if not isinstance(sink, str):
+                raise ValueError("sink must be a directory path when extract is True")
+            if model_store_format not in tar_formats:
+                raise ValueError(f"Cannot extract an archive in {model_store_format} format")
+        if interval is None:
+            interval = self._export_interval
+        payload = {
+            "model_store_format": model_store_format,
+            "include_files": include_files,
+            "include_hidden": include_hidden,
+            "include_deleted": include_deleted,
+        }
+        url = f"{self._make_url(history_id)}/prepare_store_download"
+        try:
+            psd = self._post(url=url, payload=payload)
+        except ConnectionError as e:
+            if e.status_code not in (400, 404) or model_store_format not in ("tar.gz", "tgz", "tar"):
+                raise
+            # Galaxy release_22.01 and earlier
+            jeha_id = self.export_history(
+                history_id,
+                gzip=model_store_format != "tar",
+                include_hidden=include_hidden,
+                include_deleted=include_deleted,
+                maxwait=maxwait,
+                interval=interval,
+            )
+            if not jeha_id:
+                raise TimeoutException(f"Export of history {history_id} is not ready after {maxwait} s")
+            r = self.gi.make_get_request(f"{self._make_url(history_id)}/exports/{jeha_id}", stream=True)
+            r.raise_for_status()
+        else:
+            r = self._wait_for_short_term_storage(
+                psd["storage_request_id"], maxwait=maxwait, interval=interval, json=False, stream=True
+            )
+        with r:
+            chunks = r.iter_content(chunk_size)
+            if extract:
+                assert isinstance(sink, str)
+                extract_tar(chunks_reader(chunks, chunk_size), sink, chunk_size)
+            elif isinstance(sink, str):
+                with open(sink, "wb") as f:
+                    f.writelines(chunks)
+            else:
+                sink.writelines(chunks)
+
     def copy_dataset(
         self, history_id: str, dataset_id: str, source: Literal["hda", "library", "library_folder"] = "hda"
     ) -> dict[str, Any]:
@@ -1030,6 +1502,57 @@ class HistoryClient(Client):
         url = self._make_url(history_id, contents=True)
         return self._post(payload=payload, url=url)
 
+    def copy_contents(
+        self,
+        history_id: str,
+        items: Sequence[str | dict[str, str]],
+        source: Literal["hda", "hdca", "library", "library_folder"] = "hda",
+        max_workers: int = 4,
+    ) -> list[CopiedContent]:
+        """
+        Copy many existing contents (e.g. datasets) to a history, with
+        concurrent requests.
+
+        :type history_id: str
+        :param history_id: ID of the history to which the contents should be
+          copied
+
+        :type items: list
+        :param items: Contents to copy, each either an ID or a dict with an
+          ``id`` key and optionally a ``src`` key overriding ``source`` for
+          that item
+
+        :type source: str
+        :param source: Default source of the contents to be copied, see
+          :meth:`copy_content`
+
+        :type max_workers: int
+        :param max_workers: Maximum number of concurrent copy requests. Since
+          the copies are made concurrently, the new history items may be
+          numbered in a different order than ``items``; set to 1 to copy them
+          one at a time, in order.
+
+        :rtype: list of :class:`CopiedContent`
+        :return: The outcome of each copy, in the same order as ``items``.
+          Copy errors are reported in these results instead of being raised.
+        """
+        contents = [
+            (item, source) if isinstance(item, str) else (item["id"], item.get("src", source)) for item in items
+        ]
+
+        def copy(content: tuple[str, Any]) -> CopiedContent:
+            content_id, content_source = content
+            try:
+                new_content = self.copy_content(history_id, content_id, content_source)
+            except Exception as e:
+                return CopiedContent(content_id, content_source, None, e)
+            return CopiedContent(content_id, content_source, new_content, None)
+
+        if not contents:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(contents))) as executor:
+            return list(executor.map(copy, contents))
+
     def open_history(self, history_id: str) -> None:
         """
         Open Galaxy in a new tab of the default web browser and switch to the
@@ -1048,6 +1571,8 @@ class HistoryClient(Client):
           any such tab is recommended.
         """
 
+        import webbrowser
+
         url = f"{self.gi.base_url}/history/switch_to_history?hist_id={history_id}"
         webbrowser.open_new_tab(url)
 
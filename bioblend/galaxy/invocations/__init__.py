@@ -14,6 +14,7 @@ from bioblend import (
     CHUNK_SIZE,
     ConnectionError,
     NotReady,
+    PollingStrategy,
     wait_on,
 )
 from bioblend.galaxy.client import Client
@@ -464,37 +465,6 @@ class InvocationClient(Client):
         with open(file_path, "wb") as outf:
             outf.writelines(r.iter_content(chunk_size))
 
-    # TODO: Move to a new ``bioblend.galaxy.short_term_storage`` module
-    def _wait_for_short_term_storage(
-        self, storage_request_id: str, maxwait: float = 60, interval: float = 3, json: bool = True, stream: bool = False
-    ) -> Any:
-        """
-        Wait until a short term storage request is ready
-
-        :type storage_request_id: str
-        :param storage_request_id: Storage request ID to wait for.
-
-        :type maxwait: float
-        :param maxwait: Total time (in seconds) to wait for the storage request
-          to become ready. After this time, a ``TimeoutException`` will be
-          raised.
-
-        :type interval: float
-        :param interval: Time (in seconds) to wait between 2 consecutive checks.
-
-        :return: The decoded response if ``json`` is set to ``True``, otherwise
-          the response object
-        """
-        url = f"{self.gi.url}/short_term_storage/{storage_request_id}"
-        is_ready_url = f"{url}/ready"
-
-        def check_and_get_short_term_storage() -> Any:
-            if self._get(url=is_ready_url):
-                return self._get(url=url, json=json, stream=stream)
-            raise NotReady(f"Storage request {storage_request_id} is not ready")
-
-        return wait_on(check_and_get_short_term_storage, maxwait=maxwait, interval=interval)
-
     def get_invocation_archive(
         self,
         invocation_id: str,
@@ -603,7 +573,7 @@ class InvocationClient(Client):
             return self._wait_for_short_term_storage(storage_request_id, maxwait=maxwait)
 
     def wait_for_invocation(
-        self, invocation_id: str, maxwait: float = 12000, interval: float = 3, check: bool = True
+        self, invocation_id: str, maxwait: float = 12000, interval: float | PollingStrategy = 3, check: bool = True
     ) -> dict[str, Any]:
         """
         Wait until an invocation is in a terminal state.
@@ -617,7 +587,8 @@ class InvocationClient(Client):
           raised.
 
         :type interval: float
-        :param interval: Time (in seconds) to wait between 2 consecutive checks.
+        :param interval: Time (in seconds) to wait between 2 consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it.
 
         :type check: bool
         :param check: Whether to check if the invocation terminal state is
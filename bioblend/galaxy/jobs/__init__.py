@@ -11,6 +11,7 @@ from typing import (
 
 from bioblend import (
     NotReady,
+    PollingStrategy,
     wait_on,
 )
 from bioblend.galaxy.client import Client
@@ -482,7 +483,7 @@ class JobsClient(Client):
         return response["active"]
 
     def wait_for_job(
-        self, job_id: str, maxwait: float = 12000, interval: float = 3, check: bool = True
+        self, job_id: str, maxwait: float = 12000, interval: float | PollingStrategy = 3, check: bool = True
     ) -> dict[str, Any]:
         """
         Wait until a job is in a terminal state.
@@ -496,7 +497,8 @@ class JobsClient(Client):
           raised.
 
         :type interval: float
-        :param interval: Time (in seconds) to wait between 2 consecutive checks.
+        :param interval: Time (in seconds) to wait between 2 consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it.
 
         :type check: bool
         :param check: Whether to check if the job terminal state is 'ok'.
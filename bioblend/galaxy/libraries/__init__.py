@@ -3,6 +3,7 @@ Contains possible interactions with the Galaxy Data Libraries
 """
 
 import logging
+import os
 from typing import (
     Any,
     Literal,
@@ -12,11 +13,16 @@ from typing import (
 
 from bioblend import (
     NotReady,
+    PollingStrategy,
     wait_on,
 )
 from bioblend.galaxy.client import Client
 from bioblend.galaxy.datasets import TERMINAL_STATES
-from bioblend.util import attach_file
+from bioblend.galaxyclient import UPLOAD_CHUNK_SIZE
+from bioblend.util import (
+    attach_file,
+    FileStream,
+)
 
 if TYPE_CHECKING:
     from bioblend.galaxy import GalaxyInstance
@@ -156,7 +162,7 @@ class LibraryClient(Client):
         return self._show_item(library_id, dataset_id)
 
     def wait_for_dataset(
-        self, library_id: str, dataset_id: str, maxwait: float = 12000, interval: float = 3
+        self, library_id: str, dataset_id: str, maxwait: float = 12000, interval: float | PollingStrategy = 3
     ) -> dict[str, Any]:
         """
         Wait until the library dataset state is terminal ('ok', 'empty',
@@ -174,7 +180,8 @@ class LibraryClient(Client):
           raised.
 
         :type interval: float
-        :param interval: Time (in seconds) to wait between 2 consecutive checks.
+        :param interval: Time (in seconds) to wait between 2 consecutive checks,
+          or a :class:`~bioblend.PollingStrategy` instance to compute it.
 
         :rtype: dict
         :return: A dictionary containing information about the dataset in the
@@ -363,7 +370,7 @@ class LibraryClient(Client):
         if kwargs.get("tags"):
             payload["tags"] = kwargs["tags"]
         # upload options
-        attached_file = None
+        attached_files: list[FileStream] = []
         if kwargs.get("file_url") is not None:
             payload["upload_option"] = "upload_file"
             payload["files_0|url_paste"] = kwargs["file_url"]
@@ -375,8 +382,13 @@ class LibraryClient(Client):
             payload["server_dir"] = kwargs["server_dir"]
         elif kwargs.get("file_local_path") is not None:
             payload["upload_option"] = "upload_file"
-            attached_file = attach_file(kwargs["file_local_path"])
-            payload["files_0|file_data"] = attached_file
+            file_local_paths = kwargs["file_local_path"]
+            if isinstance(file_local_paths, str):
+                file_local_paths = [file_local_paths]
+            for i, file_local_path in enumerate(file_local_paths):
+                attached_file = attach_file(file_local_path)
+                attached_files.append(attached_file)
+                payload[f"files_{i}|file_data"] = attached_file
             files_attached = True
         elif kwargs.get("filesystem_paths") is not None:
             payload["upload_option"] = "upload_paths"
@@ -385,7 +397,7 @@ class LibraryClient(Client):
         try:
             return self._post(payload, id=library_id, contents=True, files_attached=files_attached)
         finally:
-            if attached_file is not None:
+            for attached_file in attached_files:
                 attached_file.close()
 
     def upload_file_from_url(
@@ -467,7 +479,7 @@ class LibraryClient(Client):
     def upload_file_from_local_path(
         self,
         library_id: str,
-        file_local_path: str,
+        file_local_path: str | list[str],
         folder_id: str | None = None,
         file_type: str = "auto",
         dbkey: str = "?",
@@ -477,11 +489,18 @@ class LibraryClient(Client):
         Read local file contents from file_local_path and upload data to a
         library.
 
+        The files are streamed from disk as a multipart/form-data request, so
+        they are never entirely loaded in memory. For very large files, which
+        may exceed the maximum request body size allowed by a proxy in front
+        of Galaxy, consider using :meth:`upload_file_from_local_path_tus`
+        instead.
+
         :type library_id: str
         :param library_id: id of the library where to place the uploaded file
 
-        :type file_local_path: str
-        :param file_local_path: path of local file to upload
+        :type file_local_path: str or list of str
+        :param file_local_path: path of local file to upload, or a list of
+          paths to upload multiple files in a single request
 
         :type folder_id: str
         :param folder_id: id of the folder where to place the uploaded file.
@@ -497,7 +516,8 @@ class LibraryClient(Client):
         :param tags: A list of tags to add to the datasets
 
         :rtype: list
-        :return: List with a single dictionary containing information about the LDDA
+        :return: List of dictionaries (one for each uploaded file) containing
+          information about the LDDAs
         """
         return self._do_upload(
             library_id,
@@ -508,6 +528,88 @@ class LibraryClient(Client):
             tags=tags,
         )
 
+    def upload_file_from_local_path_tus(
+        self,
+        library_id: str,
+        file_local_path: str | list[str],
+        folder_id: str | None = None,
+        file_type: str = "auto",
+        dbkey: str = "?",
+        tags: list[str] | None = None,
+        storage: str | None = None,
+        chunk_size: int | None = UPLOAD_CHUNK_SIZE,
+    ) -> dict[str, Any]:
+        """
+        Upload one or more local files to a library using the tus protocol.
+
+        Each file is sent to the Galaxy tus endpoint in chunks of
+        ``chunk_size`` bytes, so that the size of each request is bounded
+        independently of the file size. The uploaded files are then added to
+        the library folder with a single request to the Galaxy Fetch API.
+
+        :type library_id: str
+        :param library_id: id of the library where to place the uploaded files
+
+        :type file_local_path: str or list of str
+        :param file_local_path: path of local file to upload, or a list of
+          paths to upload multiple files
+
+        :type folder_id: str
+        :param folder_id: id of the folder where to place the uploaded files.
+          If not provided, the root folder will be used
+
+        :type file_type: str
+        :param file_type: Galaxy file format name
+
+        :type dbkey: str
+        :param dbkey: Dbkey
+
+        :type tags: list
+        :param tags: A list of tags to add to the datasets
+
+        :type storage: str
+        :param storage: Local path to store URLs resuming uploads
+
+        :type chunk_size: int
+        :param chunk_size: Number of bytes to send in each chunk
+
+        :rtype: dict
+        :return: Information about the created upload job. Use
+          :meth:`get_folders` or :meth:`show_library` to retrieve the new
+          library datasets once the job has completed.
+
+        .. note::
+          This method works only on Galaxy 22.01 or later.
+        """
+        if folder_id is None:
+            folder_id = self._get_root_folder_id(library_id)
+        if isinstance(file_local_path, str):
+            file_local_path = [file_local_path]
+        elements = []
+        payload: dict[str, Any] = {}
+        for i, path in enumerate(file_local_path):
+            uploader = self.gi.get_tus_uploader(path, storage=storage, chunk_size=chunk_size)
+            uploader.upload()
+            file_name = os.path.basename(path)
+            element: dict[str, Any] = {
+                "src": "files",
+                "ext": file_type,
+                "dbkey": dbkey,
+                "name": file_name,
+            }
+            if tags:
+                element["tags"] = tags
+            elements.append(element)
+            payload[f"files_{i}|file_data"] = {"session_id": uploader.session_id, "name": file_name}  # type: ignore[attr-defined]  # ty:ignore[unresolved-attribute]
+        payload["targets"] = [
+            {
+                "destination": {"type": "library_folder", "library_folder_id": folder_id},
+                "elements": elements,
+            }
+        ]
+        url = f"{self.gi.url}/tools/fetch"
+        return self._post(payload, url=url)
+
     def upload_file_from_server(
         self,
         library_id: str,
@@ -7,8 +7,12 @@ via their handles in :class:`~.galaxy_instance.GalaxyInstance`.
 
 import abc
 import builtins
+import functools
 import json
-from collections.abc import Sequence
+from collections.abc import (
+    Iterator,
+    Sequence,
+)
 from typing import (
     Any,
     cast,
@@ -60,11 +64,26 @@ class ObjClient(abc.ABC):
 
         This method first gets the entity summaries, then gets the complete
         description for each entity with an additional GET call, so may be slow.
+        These calls are made concurrently, up to the ``max_workers`` of the
+        :class:`~.galaxy_instance.GalaxyInstance`.
 
         :rtype: list
         :return: a list of objects
         """
 
+    def _get_all(self, previews: Sequence[wrappers.Wrapper], lazy: bool = False) -> builtins.list:
+        """
+        Get the objects corresponding to the given previews, in the same
+        order.
+
+        The complete objects are retrieved concurrently, unless ``lazy`` is
+        ``True``, in which case a :class:`~.wrappers.LazyWrapper` is returned
+        for each preview.
+        """
+        if lazy:
+            return [wrappers.LazyWrapper(_, functools.partial(self.get, _.id)) for _ in previews]
+        return self.obj_gi._map(self.get, (_.id for _ in previews))
+
     def _select_id(self, id_: str | None = None, name: str | None = None) -> str:
         """
         Return the id that corresponds to the given id or name info.
@@ -114,18 +133,70 @@ class ObjDatasetContainerClient(ObjClient, Generic[DatasetContainerSubtype, Data
         self, name: str | None = None, deleted: bool = False, **kwargs: Any
     ) -> list[DatasetContainerPreviewSubtype]:
         dicts = self._get_f(name=name, deleted=deleted, **kwargs)
-        return [cast(DatasetContainerPreviewSubtype, self.CONTAINER_PREVIEW_TYPE(_, gi=self.obj_gi)) for _ in dicts]
+        self.obj_gi._observe(self.CONTAINER_TYPE, dicts)
+        return [
+            cast(
+                DatasetContainerPreviewSubtype,
+                self.CONTAINER_PREVIEW_TYPE(_, gi=self.obj_gi, copy=False, compact=self.obj_gi.compact),
+            )
+            for _ in dicts
+        ]
+
+    def get_preview(self, id_: str) -> DatasetContainerPreviewSubtype:
+        """
+        Retrieve the preview of the dataset container corresponding to the
+        given id.
+        """
+        return cast(
+            DatasetContainerPreviewSubtype,
+            self.CONTAINER_PREVIEW_TYPE(self._show_f(id_), gi=self.obj_gi, copy=False, compact=self.obj_gi.compact),
+        )
 
     def get(self, id_: str) -> DatasetContainerSubtype:
         """
         Retrieve the dataset container corresponding to the given id.
         """
+        return self.obj_gi._get_or_fetch(
+            cast(type[DatasetContainerSubtype], self.CONTAINER_TYPE), id_, lambda: self._fetch(id_)
+        )
+
+    def _fetch(self, id_: str) -> DatasetContainerSubtype:
+        """
+        Retrieve the dataset container corresponding to the given id from
+        Galaxy, bypassing the identity map. Its contents are loaded lazily.
+        """
         cdict = self._show_f(id_)
-        c_infos = self._show_f(id_, contents=True)
-        if not isinstance(c_infos, Sequence):
-            raise RuntimeError(f"{self._show_f.__name__}: unexpected reply: {c_infos!r}")
-        c_infos = [self.CONTAINER_TYPE.CONTENT_INFO_TYPE(_) for _ in c_infos]
-        return cast(DatasetContainerSubtype, self.CONTAINER_TYPE(cdict, content_infos=c_infos, gi=self.obj_gi))
+        return cast(DatasetContainerSubtype, self.CONTAINER_TYPE(cdict, gi=self.obj_gi, copy=False))
+
+    def iter_content_infos(self, id_: str, page_size: int | None = None) -> Iterator[wrappers.ContentInfo]:
+        """
+        Iterate over the info objects for the contents of the dataset
+        container with the given id, fetching them in pages when supported.
+
+        :type page_size: int
+        :param page_size: number of items to fetch per request, defaults to
+          the ``CONTENTS_PAGE_SIZE`` of the dataset container class
+        """
+        if page_size is None:
+            page_size = self.CONTAINER_TYPE.CONTENTS_PAGE_SIZE
+        for c_dicts in self._iter_content_pages(id_, page_size):
+            self.obj_gi._observe(
+                cast(type[wrappers.Dataset], self.CONTAINER_TYPE.DS_TYPE), (_ for _ in c_dicts if _["type"] == "file")
+            )
+            for c_dict in c_dicts:
+                yield self.CONTAINER_TYPE.CONTENT_INFO_TYPE(c_dict, copy=False, compact=self.obj_gi.compact)
+
+    def _iter_content_pages(self, id_: str, page_size: int) -> Iterator[builtins.list[dict[str, Any]]]:
+        """
+        Iterate over the pages of contents dictionaries of the dataset
+        container with the given id.
+
+        By default, all the contents are returned as a single page.
+        """
+        c_dicts = self._show_f(id_, contents=True)
+        if not isinstance(c_dicts, Sequence):
+            raise RuntimeError(f"{self._show_f.__name__}: unexpected reply: {c_dicts!r}")
+        yield list(c_dicts)
 
 
 class ObjLibraryClient(ObjDatasetContainerClient[wrappers.Library, wrappers.LibraryPreview]):
@@ -147,7 +218,24 @@ class ObjLibraryClient(ObjDatasetContainerClient[wrappers.Library, wrappers.Libr
         lib_info = self._get_dict("create_library", res)
         return self.get(lib_info["id"])
 
-    def list(self, name: str | None = None, deleted: bool = False) -> list[wrappers.Library]:
+    @overload
+    def list(
+        self, name: str | None = None, deleted: bool = False, lazy: Literal[False] = False
+    ) -> builtins.list[wrappers.Library]: ...
+
+    @overload
+    def list(
+        self, name: str | None = None, deleted: bool = False, *, lazy: Literal[True]
+    ) -> builtins.list[wrappers.LazyWrapper[wrappers.Library]]: ...
+
+    @overload
+    def list(
+        self, name: str | None = None, deleted: bool = False, lazy: bool = False
+    ) -> builtins.list[wrappers.Library] | builtins.list[wrappers.LazyWrapper[wrappers.Library]]: ...
+
+    def list(
+        self, name: str | None = None, deleted: bool = False, lazy: bool = False
+    ) -> builtins.list[wrappers.Library] | builtins.list[wrappers.LazyWrapper[wrappers.Library]]:
         """
         Get libraries owned by the user of this Galaxy instance.
 
@@ -155,17 +243,21 @@ class ObjLibraryClient(ObjDatasetContainerClient[wrappers.Library, wrappers.Libr
         :param name: return only libraries with this name
         :type deleted: bool
         :param deleted: if ``True``, return libraries that have been deleted
+        :type lazy: bool
+        :param lazy: if ``True``, return a :class:`~.wrappers.LazyWrapper`
+          for each library, which is retrieved only when an attribute not
+          available in its preview is accessed
 
-        :rtype: list of :class:`~.wrappers.Library`
+        :rtype: list of :class:`~.wrappers.Library` (or of
+          :class:`~.wrappers.LazyWrapper` if ``lazy`` is ``True``)
         """
-        dicts = self.gi.libraries.get_libraries(name=name, deleted=deleted)
+        previews = self.get_previews(name=name, deleted=deleted)
         if not deleted:
             # return Library objects only for not-deleted libraries since Galaxy
             # does not filter them out and Galaxy release_14.08 and earlier
             # crashes when trying to get a deleted library
-            return [self.get(_["id"]) for _ in dicts if not _["deleted"]]
-        else:
-            return [self.get(_["id"]) for _ in dicts]
+            previews = [_ for _ in previews if not _.deleted]
+        return self._get_all(previews, lazy=lazy)
 
     def delete(self, id_: str | None = None, name: str | None = None) -> None:
         """
@@ -181,6 +273,7 @@ class ObjLibraryClient(ObjDatasetContainerClient[wrappers.Library, wrappers.Libr
         res = self.gi.libraries.delete_library(id_)
         if not isinstance(res, dict):
             raise RuntimeError(f"delete_library: unexpected reply: {res!r}")
+        self.obj_gi._discard(wrappers.Library, id_)
 
 
 class ObjHistoryClient(ObjDatasetContainerClient[wrappers.History, wrappers.HistoryPreview]):
@@ -202,7 +295,24 @@ class ObjHistoryClient(ObjDatasetContainerClient[wrappers.History, wrappers.Hist
         hist_info = self._get_dict("create_history", res)
         return self.get(hist_info["id"])
 
-    def list(self, name: str | None = None, deleted: bool = False) -> list[wrappers.History]:
+    @overload
+    def list(
+        self, name: str | None = None, deleted: bool = False, lazy: Literal[False] = False
+    ) -> builtins.list[wrappers.History]: ...
+
+    @overload
+    def list(
+        self, name: str | None = None, deleted: bool = False, *, lazy: Literal[True]
+    ) -> builtins.list[wrappers.LazyWrapper[wrappers.History]]: ...
+
+    @overload
+    def list(
+        self, name: str | None = None, deleted: bool = False, lazy: bool = False
+    ) -> builtins.list[wrappers.History] | builtins.list[wrappers.LazyWrapper[wrappers.History]]: ...
+
+    def list(
+        self, name: str | None = None, deleted: bool = False, lazy: bool = False
+    ) -> builtins.list[wrappers.History] | builtins.list[wrappers.LazyWrapper[wrappers.History]]:
         """
         Get histories owned by the user of this Galaxy instance.
 
@@ -210,11 +320,37 @@ class ObjHistoryClient(ObjDatasetContainerClient[wrappers.History, wrappers.Hist
         :param name: return only histories with this name
         :type deleted: bool
         :param deleted: if ``True``, return histories that have been deleted
+        :type lazy: bool
+        :param lazy: if ``True``, return a :class:`~.wrappers.LazyWrapper`
+          for each history, which is retrieved only when an attribute not
+          available in its preview is accessed
 
-        :rtype: list of :class:`~.wrappers.History`
+        :rtype: list of :class:`~.wrappers.History` (or of
+          :class:`~.wrappers.LazyWrapper` if ``lazy`` is ``True``)
         """
-        dicts = self.gi.histories.get_histories(name=name, deleted=deleted)
-        return [self.get(_["id"]) for _ in dicts]
+        return self._get_all(self.get_previews(name=name, deleted=deleted), lazy=lazy)
+
+    def get_preview(self, id_: str) -> wrappers.HistoryPreview:
+        """
+        Retrieve the preview of the history corresponding to the given id.
+
+        Only the history attributes exposed by
+        :class:`~.wrappers.HistoryPreview` are requested.
+        """
+        p_dict = self.gi.histories.show_history(id_, keys=[*wrappers.HistoryPreview.BASE_ATTRS, "update_time"])
+        return wrappers.HistoryPreview(p_dict, gi=self.obj_gi, copy=False, compact=self.obj_gi.compact)
+
+    def _iter_content_pages(self, id_: str, page_size: int) -> Iterator[builtins.list[dict[str, Any]]]:
+        offset = 0
+        while True:
+            c_dicts = self.gi.histories.show_history(id_, contents=True, limit=page_size, offset=offset)
+            for c_dict in c_dicts:
+                # the paginated API does not return the 'type' key
+                c_dict.setdefault("type", "file" if c_dict["history_content_type"] == "dataset" else "collection")
+            yield c_dicts
+            if len(c_dicts) < page_size:
+                return
+            offset += page_size
 
     def delete(self, id_: str | None = None, name: str | None = None, purge: bool = False) -> None:
         """
@@ -234,6 +370,7 @@ class ObjHistoryClient(ObjDatasetContainerClient[wrappers.History, wrappers.Hist
         res = self.gi.histories.delete_history(id_, purge=purge)
         if not isinstance(res, dict):
             raise RuntimeError(f"delete_history: unexpected reply: {res!r}")
+        self.obj_gi._discard(wrappers.History, id_)
 
 
 class ObjWorkflowClient(ObjClient):
@@ -287,19 +424,41 @@ class ObjWorkflowClient(ObjClient):
         :rtype: :class:`~.wrappers.Workflow`
         :return: the workflow corresponding to ``id_``
         """
-        res = self.gi.workflows.show_workflow(id_)
-        wf_dict = self._get_dict("show_workflow", res)
-        return wrappers.Workflow(wf_dict, gi=self.obj_gi)
+
+        def fetch() -> wrappers.Workflow:
+            res = self.gi.workflows.show_workflow(id_)
+            wf_dict = self._get_dict("show_workflow", res)
+            return wrappers.Workflow(wf_dict, gi=self.obj_gi, copy=False)
+
+        return self.obj_gi._get_or_fetch(wrappers.Workflow, id_, fetch)
 
     # the 'deleted' option is not available for workflows
     def get_previews(
         self, name: str | None = None, published: bool = False, **kwargs: Any
     ) -> list[wrappers.WorkflowPreview]:
         dicts = self.gi.workflows.get_workflows(name=name, published=published, **kwargs)
-        return [wrappers.WorkflowPreview(_, gi=self.obj_gi) for _ in dicts]
+        self.obj_gi._observe(wrappers.Workflow, dicts)
+        return [wrappers.WorkflowPreview(_, gi=self.obj_gi, copy=False, compact=self.obj_gi.compact) for _ in dicts]
 
     # the 'deleted' option is not available for workflows
-    def list(self, name: str | None = None, published: bool = False) -> list[wrappers.Workflow]:
+    @overload
+    def list(
+        self, name: str | None = None, published: bool = False, lazy: Literal[False] = False
+    ) -> builtins.list[wrappers.Workflow]: ...
+
+    @overload
+    def list(
+        self, name: str | None = None, published: bool = False, *, lazy: Literal[True]
+    ) -> builtins.list[wrappers.LazyWrapper[wrappers.Workflow]]: ...
+
+    @overload
+    def list(
+        self, name: str | None = None, published: bool = False, lazy: bool = False
+    ) -> builtins.list[wrappers.Workflow] | builtins.list[wrappers.LazyWrapper[wrappers.Workflow]]: ...
+
+    def list(
+        self, name: str | None = None, published: bool = False, lazy: bool = False
+    ) -> builtins.list[wrappers.Workflow] | builtins.list[wrappers.LazyWrapper[wrappers.Workflow]]:
         """
         Get workflows owned by the user of this Galaxy instance.
 
@@ -307,11 +466,15 @@ class ObjWorkflowClient(ObjClient):
         :param name: return only workflows with this name
         :type published: bool
         :param published: if ``True``, return also published workflows
+        :type lazy: bool
+        :param lazy: if ``True``, return a :class:`~.wrappers.LazyWrapper`
+          for each workflow, which is retrieved only when an attribute not
+          available in its preview is accessed
 
-        :rtype: list of :class:`~.wrappers.Workflow`
+        :rtype: list of :class:`~.wrappers.Workflow` (or of
+          :class:`~.wrappers.LazyWrapper` if ``lazy`` is ``True``)
         """
-        dicts = self.gi.workflows.get_workflows(name=name, published=published)
-        return [self.get(_["id"]) for _ in dicts]
+        return self._get_all(self.get_previews(name=name, published=published), lazy=lazy)
 
     def delete(self, id_: str | None = None, name: str | None = None) -> None:
         """
@@ -325,6 +488,7 @@ class ObjWorkflowClient(ObjClient):
         """
         id_ = self._select_id(id_=id_, name=name)
         self.gi.workflows.delete_workflow(id_)
+        self.obj_gi._discard(wrappers.Workflow, id_)
 
 
 class ObjInvocationClient(ObjClient):
@@ -339,8 +503,11 @@ class ObjInvocationClient(ObjClient):
         :rtype: Invocation
         :return: invocation object
         """
-        inv_dict = self.gi.invocations.show_invocation(id_)
-        return wrappers.Invocation(inv_dict, self.obj_gi)
+        return self.obj_gi._get_or_fetch(
+            wrappers.Invocation,
+            id_,
+            lambda: wrappers.Invocation(self.gi.invocations.show_invocation(id_), self.obj_gi, copy=False),
+        )
 
     def get_previews(self, **kwargs: Any) -> list[wrappers.InvocationPreview]:
         """
@@ -350,7 +517,11 @@ class ObjInvocationClient(ObjClient):
         :return: previews of invocations
         """
         inv_list = self.gi.invocations.get_invocations(**kwargs)
-        return [wrappers.InvocationPreview(inv_dict, gi=self.obj_gi) for inv_dict in inv_list]
+        self.obj_gi._observe(wrappers.Invocation, inv_list)
+        return [
+            wrappers.InvocationPreview(inv_dict, gi=self.obj_gi, copy=False, compact=self.obj_gi.compact)
+            for inv_dict in inv_list
+        ]
 
     def list(
         self,
@@ -394,7 +565,7 @@ class ObjInvocationClient(ObjClient):
             view="element",
             step_details=True,
         )
-        return [wrappers.Invocation(inv_dict, self.obj_gi) for inv_dict in inv_dict_list]
+        return [wrappers.Invocation(inv_dict, self.obj_gi, copy=False) for inv_dict in inv_dict_list]
 
 
 class ObjToolClient(ObjClient):
@@ -402,6 +573,39 @@ class ObjToolClient(ObjClient):
     Interacts with Galaxy tools.
     """
 
+    def __init__(self, obj_gi: "GalaxyInstance") -> None:
+        super().__init__(obj_gi=obj_gi)
+        self._tool_ids: set[str] | None = None
+        self._toolbox_version = 0
+
+    def get_tool_ids(self, refresh: bool = False) -> set[str]:
+        """
+        Get the ids of the tools installed on the Galaxy instance.
+
+        The ids are cached after the first call, which lists all the tools.
+        The cache is cleared when the toolbox is reloaded or a repository is
+        installed or uninstalled through this Galaxy instance, but not when
+        the tools are changed by other clients.
+
+        :type refresh: bool
+        :param refresh: if ``True``, list the tools again instead of using the
+          cached ids
+
+        :rtype: set of str
+        :return: ids of the installed tools
+        """
+        if self._tool_ids is None or refresh or self._toolbox_version != self.gi._toolbox_version:
+            self._toolbox_version = self.gi._toolbox_version
+            self._tool_ids = {_["id"] for _ in self.gi.tools.get_tools()}
+        return self._tool_ids
+
+    def reload_toolbox(self) -> None:
+        """
+        Reload the Galaxy toolbox (but not individual tools), and clear the
+        cached tool ids.
+        """
+        self.gi.config.reload_toolbox()
+
     def get(self, id_: str, io_details: bool = False, link_details: bool = False) -> wrappers.Tool:
         """
         Retrieve the tool corresponding to the given id.
@@ -417,7 +621,7 @@ class ObjToolClient(ObjClient):
         """
         res = self.gi.tools.show_tool(id_, io_details=io_details, link_details=link_details)
         tool_dict = self._get_dict("show_tool", res)
-        return wrappers.Tool(tool_dict, gi=self.obj_gi)
+        return wrappers.Tool(tool_dict, gi=self.obj_gi, copy=False)
 
     def get_previews(self, name: str | None = None, trackster: bool = False, **kwargs: Any) -> list[wrappers.Tool]:
         """
@@ -433,7 +637,7 @@ class ObjToolClient(ObjClient):
         :rtype: list of :class:`~.wrappers.Tool`
         """
         dicts = self.gi.tools.get_tools(name=name, trackster=trackster, **kwargs)
-        return [wrappers.Tool(_, gi=self.obj_gi) for _ in dicts]
+        return [wrappers.Tool(_, gi=self.obj_gi, copy=False) for _ in dicts]
 
     # the 'deleted' option is not available for tools
     def list(self, name: str | None = None, trackster: bool = False) -> list[wrappers.Tool]:
@@ -479,11 +683,11 @@ class ObjJobClient(ObjClient):
         """
         res = self.gi.jobs.show_job(id_, full_details)
         job_dict = self._get_dict("show_job", res)
-        return wrappers.Job(job_dict, gi=self.obj_gi)
+        return wrappers.Job(job_dict, gi=self.obj_gi, copy=False)
 
     def get_previews(self, **kwargs: Any) -> list[wrappers.JobPreview]:
         dicts = self.gi.jobs.get_jobs(**kwargs)
-        return [wrappers.JobPreview(_, gi=self.obj_gi) for _ in dicts]
+        return [wrappers.JobPreview(_, gi=self.obj_gi, copy=False, compact=self.obj_gi.compact) for _ in dicts]
 
     def list(self) -> list[wrappers.Job]:
         """
@@ -517,17 +721,26 @@ class ObjDatasetClient(ObjClient):
         :rtype: :class:`~.wrappers.HistoryDatasetAssociation` or :class:`~.wrappers.LibraryDatasetDatasetAssociation`
         :return: the history or library dataset corresponding to ``id_``
         """
-        res = self.gi.datasets.show_dataset(id_, hda_ldda=hda_ldda)
-        ds_dict = self._get_dict("show_dataset", res)
+        cls: type[wrappers.Dataset]
         if hda_ldda == "hda":
-            hist = self.obj_gi.histories.get(ds_dict["history_id"])
-            return wrappers.HistoryDatasetAssociation(ds_dict, hist, gi=self.obj_gi)
+            cls = wrappers.HistoryDatasetAssociation
         elif hda_ldda == "ldda":
-            lib = self.obj_gi.libraries.get(ds_dict["parent_library_id"])
-            return wrappers.LibraryDatasetDatasetAssociation(ds_dict, lib, gi=self.obj_gi)
+            cls = wrappers.LibraryDatasetDatasetAssociation
         else:
             raise ValueError(f"Unsupported value for hda_ldda: {hda_ldda}")
 
+        def fetch() -> wrappers.Dataset:
+            res = self.gi.datasets.show_dataset(id_, hda_ldda=hda_ldda)
+            ds_dict = self._get_dict("show_dataset", res)
+            if hda_ldda == "hda":
+                hist = self.obj_gi.histories.get(ds_dict["history_id"])
+                return wrappers.HistoryDatasetAssociation(ds_dict, hist, gi=self.obj_gi, copy=False)
+            else:
+                lib = self.obj_gi.libraries.get(ds_dict["parent_library_id"])
+                return wrappers.LibraryDatasetDatasetAssociation(ds_dict, lib, gi=self.obj_gi, copy=False)
+
+        return self.obj_gi._get_or_fetch(cls, id_, fetch)
+
     def get_previews(self, **kwargs: Any) -> list:
         raise NotImplementedError()
 
@@ -547,10 +760,14 @@ class ObjDatasetCollectionClient(ObjClient):
         :rtype: :class:`~.wrappers.HistoryDatasetCollectionAssociation`
         :return: the history dataset collection corresponding to ``id_``
         """
-        res = self.gi.dataset_collections.show_dataset_collection(id_)
-        ds_dict = self._get_dict("show_dataset_collection", res)
-        hist = self.obj_gi.histories.get(ds_dict["history_id"])
-        return wrappers.HistoryDatasetCollectionAssociation(ds_dict, hist, gi=self.obj_gi)
+
+        def fetch() -> wrappers.HistoryDatasetCollectionAssociation:
+            res = self.gi.dataset_collections.show_dataset_collection(id_)
+            ds_dict = self._get_dict("show_dataset_collection", res)
+            hist = self.obj_gi.histories.get(ds_dict["history_id"])
+            return wrappers.HistoryDatasetCollectionAssociation(ds_dict, hist, gi=self.obj_gi, copy=False)
+
+        return self.obj_gi._get_or_fetch(wrappers.HistoryDatasetCollectionAssociation, id_, fetch)
 
     def get_previews(self, **kwargs: Any) -> list:
         raise NotImplementedError()
@@ -0,0 +1,130 @@
+"""
+Index of the directed acyclic graph (DAG) formed by the steps of a workflow.
+"""
+
+from collections import deque
+from collections.abc import (
+    Iterable,
+    Mapping,
+)
+
+
+class DAGIndex:
+    """
+    Precomputed index of a workflow DAG.
+
+    Step ids are mapped to consecutive integer positions, and the edges of
+    the DAG are stored as adjacency arrays of positions in both directions,
+    so that the predecessors and successors of a step, as well as the step
+    with a given label, are found in constant time. The topological order of
+    the steps is computed once, on first use, and cached.
+
+    The index is immutable: a new one must be built when the steps of the
+    workflow change.
+    """
+
+    __slots__ = ("_ids", "_labels", "_order", "_positions", "_predecessors", "_successors")
+
+    def __init__(self, input_steps: Mapping[str, Iterable[str]], labels: Mapping[str, str] | None = None) -> None:
+        """
+        :type input_steps: dict
+        :param input_steps: mapping of each step id to the ids of the steps
+          it takes its inputs from
+
+        :type labels: dict
+        :param labels: mapping of step labels to step ids
+        """
+        self._ids: list[str] = list(input_steps)
+        self._positions: dict[str, int] = {id_: pos for pos, id_ in enumerate(self._ids)}
+        self._predecessors: list[list[int]] = [[] for _ in self._ids]
+        self._successors: list[list[int]] = [[] for _ in self._ids]
+        for id_, source_ids in input_steps.items():
+            tail = self._positions[id_]
+            # a step may take several inputs from the same step
+            for head in dict.fromkeys(self._position(_) for _ in source_ids):
+                self._predecessors[tail].append(head)
+                self._successors[head].append(tail)
+        self._labels: dict[str, str] = dict(labels or {})
+        self._order: list[int] | None = None
+
+    def _position(self, id_: str) -> int:
+        """
+        Return the position of a step id, adding it to the index if needed.
+        """
+        pos = self._positions.get(id_)
+        if pos is None:
+            pos = self._positions[id_] = len(self._ids)
+            self._ids.append(id_)
+            self._predecessors.append([])
+            self._successors.append([])
+        return pos
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id_: object) -> bool:
+        return id_ in self._positions
+
+    @property
+    def ids(self) -> list[str]:
+        """
+        The ids of the indexed steps.
+        """
+        return list(self._ids)
+
+    def predecessors(self, id_: str) -> list[str]:
+        """
+        Return the ids of the steps the given step takes its inputs from.
+        """
+        return [self._ids[_] for _ in self._predecessors[self._positions[id_]]]
+
+    def successors(self, id_: str) -> list[str]:
+        """
+        Return the ids of the steps which take inputs from the given step.
+        """
+        return [self._ids[_] for _ in self._successors[self._positions[id_]]]
+
+    def in_degree(self, id_: str) -> int:
+        """
+        Return the number of predecessors of the given step.
+        """
+        return len(self._predecessors[self._positions[id_]])
+
+    def out_degree(self, id_: str) -> int:
+        """
+        Return the number of successors of the given step.
+        """
+        return len(self._successors[self._positions[id_]])
+
+    def get_step_id(self, label: str) -> str | None:
+        """
+        Return the id of the step with the given label, or ``None`` if there
+        is no such step.
+        """
+        return self._labels.get(label)
+
+    def sorted_ids(self) -> list[str]:
+        """
+        Return the step ids in topological order, i.e. each step comes after
+        all of its predecessors.
+
+        Steps which are part of a cycle, if any, are left out.
+        """
+        if self._order is None:
+            # Kahn's algorithm, visiting the steps in index order when there
+            # is a choice, so that the result is deterministic
+            in_degrees = [len(_) for _ in self._predecessors]
+            ready = deque(pos for pos, n in enumerate(in_degrees) if not n)
+            order: list[int] = []
+            while ready:
+                head = ready.popleft()
+                order.append(head)
+                for tail in self._successors[head]:
+                    in_degrees[tail] -= 1
+                    if not in_degrees[tail]:
+                        ready.append(tail)
+            self._order = order
+        return [self._ids[_] for _ in self._order]
+
+
+__all__ = ("DAGIndex",)
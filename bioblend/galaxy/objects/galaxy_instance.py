@@ -3,15 +3,28 @@ A representation of a Galaxy instance based on oo wrappers.
 """
 
 import time
-from collections.abc import Iterable
+from collections.abc import (
+    Callable,
+    Iterable,
+)
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    TypeVar,
+)
 
 import bioblend
 import bioblend.galaxy
 from bioblend.galaxy.datasets import TERMINAL_STATES
+from bioblend.galaxyclient import Transport
 from . import (
     client,
     wrappers,
 )
+from .identity_map import IdentityMap
+
+T = TypeVar("T")
+WrapperSubtype = TypeVar("WrapperSubtype", bound=wrappers.Wrapper)
 
 
 def _get_error_info(dataset: wrappers.Dataset) -> str:
@@ -36,6 +49,29 @@ class GalaxyInstance:
     :param api_key: user's API key for the given instance of Galaxy, obtained
       from the Galaxy web UI.
 
+    :type transport: callable
+    :param transport: transport used to send the requests, see
+      :mod:`bioblend.transport`
+
+    :type compact: bool
+    :param compact: if ``True``, the previews and content infos returned by
+      the clients only keep the keys of the Galaxy API dictionaries which are
+      exposed as attributes, to reduce memory usage when many of them are
+      held at once.
+
+    :type identity_map: bool
+    :param identity_map: if ``True``, keep an :class:`~.identity_map.IdentityMap`
+      of the objects retrieved by id through the clients (e.g. with
+      ``gi.histories.get()`` or ``history.get_dataset()``), so that retrieving
+      the same object again returns the same wrapper instance without
+      contacting the server, unless a listing has shown it to be out of date.
+      Deleted objects are removed from the map.
+
+    :type max_workers: int
+    :param max_workers: maximum number of concurrent requests used by the
+      ``list()`` methods of the clients to retrieve the complete objects. Set
+      to 1 to retrieve them one at a time.
+
     This is actually a factory class which instantiates the entity-specific
     clients.
 
@@ -56,10 +92,24 @@ class GalaxyInstance:
         token: str | None = None,
         verify: bool = True,
         user_agent: str | None = None,
+        transport: Transport | None = None,
+        compact: bool = False,
+        identity_map: bool = False,
+        max_workers: int = 4,
     ) -> None:
         self.gi = bioblend.galaxy.GalaxyInstance(
-            url, key=api_key, email=email, password=password, token=token, verify=verify, user_agent=user_agent
+            url,
+            key=api_key,
+            email=email,
+            password=password,
+            token=token,
+            verify=verify,
+            user_agent=user_agent,
+            transport=transport,
         )
+        self.compact = compact
+        self.identity_map = IdentityMap() if identity_map else None
+        self.max_workers = max_workers
         self.log = bioblend.log
         self.datasets = client.ObjDatasetClient(self)
         self.dataset_collections = client.ObjDatasetCollectionClient(self)
@@ -70,8 +120,49 @@ class GalaxyInstance:
         self.tools = client.ObjToolClient(self)
         self.jobs = client.ObjJobClient(self)
 
+    def _get_or_fetch(self, cls: type[WrapperSubtype], id_: str, fetch: Callable[[], WrapperSubtype]) -> WrapperSubtype:
+        """
+        Return the wrapper of class ``cls`` for the given id from the identity
+        map, if enabled, otherwise call ``fetch`` to create it.
+        """
+        if self.identity_map is None:
+            return fetch()
+        return self.identity_map.get_or_fetch(cls, id_, fetch)
+
+    def _discard(self, cls: type[wrappers.Wrapper], id_: str) -> None:
+        """
+        Remove the wrapper of class ``cls`` for the given id from the identity
+        map, if enabled, e.g. after deleting the object.
+        """
+        if self.identity_map is not None:
+            self.identity_map.discard(cls, id_)
+
+    def _map(self, func: Callable[[str], T], ids: Iterable[str]) -> list[T]:
+        """
+        Call ``func`` on each of the given ids, using up to ``max_workers``
+        threads, and return the results in the same order as the ids.
+        """
+        ids = list(ids)
+        if self.max_workers <= 1 or len(ids) <= 1:
+            return [func(id_) for id_ in ids]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ids))) as executor:
+            return list(executor.map(func, ids))
+
+    def _observe(self, cls: type[wrappers.Wrapper], dicts: Iterable[dict[str, Any]]) -> None:
+        """
+        Record in the identity map, if enabled, the update times of the
+        objects described by the dictionaries returned by a listing.
+        """
+        if self.identity_map is None:
+            return
+        for d in dicts:
+            self.identity_map.observe(cls, d["id"], d.get("update_time"))
+
     def _wait_datasets(
-        self, datasets: Iterable[wrappers.Dataset], polling_interval: float, break_on_error: bool = True
+        self,
+        datasets: Iterable[wrappers.Dataset],
+        polling_interval: float | bioblend.PollingStrategy,
+        break_on_error: bool = True,
     ) -> None:
         """
         Wait for datasets to come out of the pending states.
@@ -81,7 +172,8 @@ class GalaxyInstance:
         :param datasets: datasets
 
         :type polling_interval: float
-        :param polling_interval: polling interval in seconds
+        :param polling_interval: polling interval in seconds, or a
+          :class:`~bioblend.PollingStrategy` instance to compute it
 
         :type break_on_error: bool
         :param break_on_error: if ``True``, raise a RuntimeError exception as
@@ -91,14 +183,42 @@ class GalaxyInstance:
 
           This is a blocking operation that can take a very long time.
           Also, note that this method does not return anything;
-          however, each input dataset is refreshed (possibly multiple
-          times) during the execution.
+          however, the state of each input dataset is updated during the
+          execution, and each dataset is refreshed when it reaches a terminal
+          state.
         """
 
-        def poll(ds_list: Iterable[wrappers.Dataset]) -> list[wrappers.Dataset]:
+        def refresh_states(ds_list: list[wrappers.Dataset]) -> None:
+            """
+            Refresh the datasets whose state has changed since last poll.
+
+            The states of the history datasets are obtained with one history
+            contents request per history. Datasets whose new state is
+            terminal are fully refreshed, while for the others only the state
+            is updated in place.
+            """
+            by_history: dict[str, list[wrappers.Dataset]] = {}
+            for ds in ds_list:
+                if isinstance(ds, wrappers.HistoryDatasetAssociation):
+                    by_history.setdefault(ds.container.id, []).append(ds)
+                else:
+                    ds.refresh()
+            for history_id, hdas in by_history.items():
+                contents = self.gi.histories.show_history(
+                    history_id, contents=True, ids=[ds.id for ds in hdas], keys=["id", "state"]
+                )
+                states = {c["id"]: c["state"] for c in contents}
+                for ds in hdas:
+                    state = states.get(ds.id)
+                    if state is None or state in TERMINAL_STATES:
+                        ds.refresh()
+                    elif state != ds.state:
+                        ds._own_wrapped()["state"] = state
+
+        def poll(ds_list: list[wrappers.Dataset]) -> list[wrappers.Dataset]:
+            refresh_states(ds_list)
             pending = []
             for ds in ds_list:
-                ds.refresh()
                 if break_on_error and ds.state == "error":
                     raise RuntimeError(_get_error_info(ds))
                 if not ds.state:
@@ -108,7 +228,17 @@ class GalaxyInstance:
                     pending.append(ds)
             return pending
 
+        strategy = (
+            polling_interval
+            if isinstance(polling_interval, bioblend.PollingStrategy)
+            else bioblend.FixedInterval(polling_interval)
+        )
+        intervals = strategy.intervals()
+        start = time.monotonic()
         self.log.info("Waiting for datasets")
-        while datasets:
-            datasets = poll(datasets)
-            time.sleep(polling_interval)
+        pending = list(datasets)
+        while pending:
+            pending = poll(pending)
+            if pending:
+                time.sleep(next(intervals))
+        strategy.record(time.monotonic() - start)
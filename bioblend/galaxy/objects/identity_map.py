@@ -0,0 +1,123 @@
+"""
+Identity map for the object-oriented interface to Galaxy.
+"""
+
+import threading
+import weakref
+from collections.abc import Callable
+from typing import TypeVar
+
+from . import wrappers
+
+WrapperSubtype = TypeVar("WrapperSubtype", bound=wrappers.Wrapper)
+
+
+class IdentityMap:
+    """
+    Map Galaxy object ids to the wrappers already created for them.
+
+    The identity map allows the objects API to return the same wrapper
+    instance every time the same Galaxy object is retrieved, instead of
+    fetching it again from the server. Wrappers are held through weak
+    references, so they are evicted from the map as soon as they are no
+    longer referenced elsewhere.
+
+    A wrapper is considered stale when a listing (e.g. history previews or
+    history contents) reports an ``update_time`` different from the one of
+    the wrapped dictionary. Stale wrappers are refreshed the next time they
+    are retrieved. Retrieving a wrapper which is in the map does not contact
+    the server, so changes made to the Galaxy object by other clients are
+    not detected until a listing reports them; call ``refresh()`` on the
+    wrapper to update it explicitly.
+
+    The map can be used concurrently by several threads.
+    """
+
+    def __init__(self) -> None:
+        self._objects: weakref.WeakValueDictionary[tuple[type[wrappers.Wrapper], str], wrappers.Wrapper] = (
+            weakref.WeakValueDictionary()
+        )
+        self._stale: weakref.WeakSet[wrappers.Wrapper] = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def get(self, cls: type[WrapperSubtype], id_: str) -> WrapperSubtype | None:
+        """
+        Return the wrapper of class ``cls`` for the given id, or ``None`` if
+        it is not in the map.
+        """
+        with self._lock:
+            return self._objects.get((cls, id_))  # type: ignore[return-value]
+
+    def add(self, obj: wrappers.Wrapper) -> None:
+        """
+        Add a wrapper to the map, replacing any wrapper with the same class
+        and id.
+        """
+        with self._lock:
+            self._objects[(type(obj), obj.id)] = obj
+            self._stale.discard(obj)
+
+    def discard(self, cls: type[wrappers.Wrapper], id_: str) -> None:
+        """
+        Remove the wrapper of class ``cls`` for the given id from the map, if
+        present.
+        """
+        with self._lock:
+            obj = self._objects.pop((cls, id_), None)
+            if obj is not None:
+                self._stale.discard(obj)
+
+    def clear(self) -> None:
+        """
+        Remove all wrappers from the map.
+        """
+        with self._lock:
+            self._objects.clear()
+            self._stale.clear()
+
+    def observe(self, cls: type[wrappers.Wrapper], id_: str, update_time: str | None) -> None:
+        """
+        Record the last update time of a Galaxy object, as reported by a
+        listing, marking its wrapper as stale if it is out of date.
+        """
+        with self._lock:
+            obj = self._objects.get((cls, id_))
+            if obj is not None and update_time is not None and obj.wrapped.get("update_time") != update_time:
+                self._stale.add(obj)
+
+    def get_or_fetch(self, cls: type[WrapperSubtype], id_: str, fetch: Callable[[], WrapperSubtype]) -> WrapperSubtype:
+        """
+        Return the wrapper of class ``cls`` for the given id, calling
+        ``fetch`` to create it if it is not in the map.
+
+        If the wrapper in the map is stale, it is refreshed in place if it has
+        a ``refresh()`` method, otherwise it is replaced by a new one.
+
+        ``fetch`` is called without holding the lock of the map, so that
+        several threads can fetch different objects concurrently. If 2 threads
+        fetch the same object, the wrapper added first is returned to both.
+        """
+        key = (cls, id_)
+        with self._lock:
+            obj = self._objects.get(key)
+            stale = obj is not None and obj in self._stale
+            if obj is not None and stale:
+                self._stale.discard(obj)
+        if obj is None:
+            new_obj = fetch()
+            with self._lock:
+                obj = self._objects.setdefault(key, new_obj)
+        elif stale:
+            refresh = getattr(obj, "refresh", None)
+            if refresh is not None:
+                refresh()
+            else:
+                obj = fetch()
+                self.add(obj)
+        return obj  # type: ignore[return-value]
+
+
+__all__ = ("IdentityMap",)
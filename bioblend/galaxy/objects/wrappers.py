@@ -5,6 +5,7 @@ A basic object-oriented interface for Galaxy entities.
 """
 
 import abc
+import functools
 import json
 from collections.abc import (
     Callable,
@@ -31,6 +32,7 @@ from typing_extensions import Self
 import bioblend
 from bioblend.galaxy.workflows import InputsBy
 from bioblend.util import abstractclass
+from .dag import DAGIndex
 
 if TYPE_CHECKING:
     from bioblend.galaxy.dataset_collections import CollectionDescription
@@ -48,6 +50,7 @@ __all__ = (
     "HistoryDatasetCollectionAssociation",
     "HistoryPreview",
     "Job",
+    "LazyWrapper",
     "Library",
     "LibraryContentInfo",
     "LibraryDataset",
@@ -61,6 +64,18 @@ __all__ = (
 )
 
 
+def _wrapped_property(name: str) -> property:
+    """
+    Return a read-only property for the ``name`` key of the wrapped
+    dictionary of a :class:`Wrapper`.
+    """
+
+    def fget(self: "Wrapper") -> Any:
+        return self.wrapped.get(name)
+
+    return property(fget, doc=f"The ``{name}`` key of the wrapped dictionary.")
+
+
 @abstractclass
 class Wrapper:
     """
@@ -72,19 +87,38 @@ class Wrapper:
 
     Dict keys that are converted to attributes are listed in the
     ``BASE_ATTRS`` class variable: this is the 'stable' interface.
-    Note that the wrapped dictionary is accessible via the ``wrapped``
-    attribute.
+    These attributes are read-only properties reading through to the
+    wrapped dictionary, which is accessible via the ``wrapped`` attribute.
+
+    By default, the wrapped dictionary is validated and deep-copied on
+    construction. Passing ``copy=False`` makes the wrapper share the
+    dictionary with the caller instead, which is much cheaper when wrapping
+    large API responses: the dictionary is then copied (shallowly) only when
+    an attribute of the wrapper is first set.
+
+    The lightweight wrappers for previews and content infos use
+    ``__slots__`` to reduce their memory footprint.
     """
 
+    __slots__ = ("__weakref__", "_cached_parent", "_set_attrs", "_shared", "gi", "is_modified", "wrapped")
+
     BASE_ATTRS: tuple[str, ...] = ("id",)
     gi: Optional["GalaxyInstance"]
     id: str
     is_modified: bool
     wrapped: dict
     _cached_parent: Optional["Wrapper"]
+    _set_attrs: frozenset[str]
+    _shared: bool
 
     def __init__(
-        self, wrapped: dict[str, Any], parent: Optional["Wrapper"] = None, gi: Optional["GalaxyInstance"] = None
+        self,
+        wrapped: dict[str, Any],
+        parent: Optional["Wrapper"] = None,
+        gi: Optional["GalaxyInstance"] = None,
+        *,
+        copy: bool = True,
+        compact: bool = False,
     ) -> None:
         """
         :type wrapped: dict
@@ -95,21 +129,43 @@ class Wrapper:
 
         :type gi: :class:`GalaxyInstance`
         :param gi: the GalaxyInstance through which we can access this wrapper
+
+        :type copy: bool
+        :param copy: if ``True`` (the default), check that ``wrapped`` is
+          JSON-serializable and wrap a deep copy of it. If ``False``, wrap
+          ``wrapped`` itself without any validation, copying it only when an
+          attribute of this wrapper is set. Nested values are always shared
+          in this case, so the caller must not modify them afterwards.
+
+        :type compact: bool
+        :param compact: if ``True``, only keep the keys of ``wrapped`` listed
+          in ``BASE_ATTRS``, to reduce the memory used by wrappers which are
+          created in large numbers, e.g. previews and content infos.
         """
         if not isinstance(wrapped, Mapping):
             raise TypeError("wrapped object must be a mapping type")
-        # loads(dumps(x)) is a bit faster than deepcopy and allows type checks
-        try:
-            dumped = json.dumps(wrapped)
-        except (TypeError, ValueError):
-            raise ValueError("wrapped object must be JSON-serializable")
-        object.__setattr__(self, "wrapped", json.loads(dumped))
-        for k in self.BASE_ATTRS:
-            object.__setattr__(self, k, self.wrapped.get(k))
+        if copy:
+            # loads(dumps(x)) is a bit faster than deepcopy and allows type checks
+            try:
+                dumped = json.dumps(wrapped)
+            except (TypeError, ValueError):
+                raise ValueError("wrapped object must be JSON-serializable")
+            wrapped = json.loads(dumped)
+        if compact:
+            wrapped = {k: wrapped[k] for k in self.BASE_ATTRS if k in wrapped}
+        object.__setattr__(self, "wrapped", wrapped)
+        object.__setattr__(self, "_shared", not (copy or compact))
         object.__setattr__(self, "_cached_parent", parent)
+        object.__setattr__(self, "_set_attrs", frozenset())
         object.__setattr__(self, "is_modified", False)
         object.__setattr__(self, "gi", gi)
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        for name in cls.BASE_ATTRS:
+            if not hasattr(cls, name):
+                setattr(cls, name, _wrapped_property(name))
+
     @property
     def parent(self) -> Optional["Wrapper"]:
         """
@@ -126,9 +182,13 @@ class Wrapper:
 
     def unmap(self) -> None:
         """
-        Disconnect this wrapper from Galaxy.
+        Disconnect this wrapper from Galaxy, removing it from the identity map
+        of its Galaxy instance, if enabled.
         """
-        object.__setattr__(self, "id", None)
+        identity_map = getattr(self.gi, "identity_map", None)
+        if identity_map is not None and self.id is not None:
+            identity_map.discard(type(self), self.id)
+        self._own_wrapped()["id"] = None
 
     def clone(self) -> Self:
         """
@@ -157,14 +217,44 @@ class Wrapper:
         """
         return cls(json.loads(jdef))
 
+    def _own_wrapped(self) -> dict[str, Any]:
+        """
+        Return the wrapped dictionary, after making a shallow copy of it if
+        it is shared with the caller which created this wrapper.
+        """
+        if self._shared:
+            object.__setattr__(self, "wrapped", dict(self.wrapped))
+            object.__setattr__(self, "_shared", False)
+        return self.wrapped
+
     # FIXME: things like self.x[0] = 'y' do NOT call self.__setattr__
     def __setattr__(self, name: str, value: str) -> None:
         if name not in self.wrapped:
             raise AttributeError("can't set attribute")
-        self.wrapped[name] = value
-        object.__setattr__(self, name, value)
+        if name not in self.BASE_ATTRS:
+            # other keys are exposed as attributes only once they are set
+            if hasattr(self, "__dict__"):
+                object.__setattr__(self, name, value)
+            else:
+                # slotted wrappers read them from the wrapped dictionary
+                object.__setattr__(self, "_set_attrs", self._set_attrs | {name})
+        self._own_wrapped()[name] = value
         self.touch()
 
+    def __setstate__(self, state: Any) -> None:
+        # restore the attributes bypassing __setattr__, e.g. when unpickling
+        for attrs in state if isinstance(state, tuple) else (state,):
+            for name, value in (attrs or {}).items():
+                object.__setattr__(self, name, value)
+
+    if not TYPE_CHECKING:
+
+        def __getattr__(self, name: str) -> Any:
+            # called only when the attribute is not found otherwise
+            if name != "_set_attrs" and name in self._set_attrs:
+                return self.wrapped[name]
+            raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.wrapped!r})"
 
@@ -194,8 +284,8 @@ class Step(Wrapper):
     tool_inputs: dict
     tool_version: str | None
 
-    def __init__(self, step_dict: dict[str, Any], parent: Wrapper) -> None:
-        super().__init__(step_dict, parent=parent, gi=parent.gi)
+    def __init__(self, step_dict: dict[str, Any], parent: Wrapper, *, copy: bool = True) -> None:
+        super().__init__(step_dict, parent=parent, gi=parent.gi, copy=copy)
         try:
             stype = step_dict["type"]
         except KeyError:
@@ -235,8 +325,8 @@ class InvocationStep(Wrapper):
         assert ret is not None
         return ret
 
-    def __init__(self, wrapped: dict[str, Any], parent: Wrapper, gi: "GalaxyInstance") -> None:
-        super().__init__(wrapped, parent, gi)
+    def __init__(self, wrapped: dict[str, Any], parent: Wrapper, gi: "GalaxyInstance", *, copy: bool = True) -> None:
+        super().__init__(wrapped, parent, gi, copy=copy)
 
     def refresh(self) -> "InvocationStep":
         """
@@ -245,7 +335,7 @@ class InvocationStep(Wrapper):
         :return: self
         """
         step_dict = self.gi.gi.invocations.show_invocation_step(self.parent.id, self.id)
-        self.__init__(step_dict, parent=self.parent, gi=self.gi)  # type: ignore[misc]
+        self.__init__(step_dict, parent=self.parent, gi=self.gi, copy=False)  # type: ignore[misc]
         return self
 
     def get_outputs(self) -> dict[str, "HistoryDatasetAssociation"]:
@@ -292,58 +382,108 @@ class Workflow(Wrapper):
         "steps",
         "tags",
     )
-    dag: dict[str, set[str]]
     deleted: bool
     input_labels_to_ids: dict[str, set[str]]
     inputs: dict[str, dict]
-    inv_dag: dict[str, set[str]]
-    missing_ids: list
     name: str
     owner: str
     POLLING_INTERVAL = 10  # for output state monitoring
     published: bool
-    sink_ids: set[str]
-    source_ids: set[str]
     steps: dict[str, Step]
     tags: list[str]
     tool_labels_to_ids: dict[str, set[str]]
+    _dag_dicts: tuple[dict[str, set[str]], dict[str, set[str]]] | None
+    _dag_index: DAGIndex | None
+    _missing_ids: list[str] | None
 
-    def __init__(self, wf_dict: dict[str, Any], gi: Optional["GalaxyInstance"] = None) -> None:
-        super().__init__(wf_dict, gi=gi)
-        if gi:
-            tools_list_by_id = [t.id for t in gi.tools.get_previews()]
-        else:
-            tools_list_by_id = []
-        missing_ids = []
+    def __init__(self, wf_dict: dict[str, Any], gi: Optional["GalaxyInstance"] = None, *, copy: bool = True) -> None:
+        super().__init__(wf_dict, gi=gi, copy=copy)
         tool_labels_to_ids: dict[str, set[str]] = {}
+        steps: dict[str, Step] = {}
         for k, v in self.steps.items():
+            # build new step dicts instead of modifying the (possibly shared)
+            # ones, converting step ids to str for consistency with outer keys
             step_dict = cast(dict[str, Any], v)
-            # convert step ids to str for consistency with outer keys
-            step_dict["id"] = str(step_dict["id"])
-            for i in step_dict["input_steps"].values():
-                i["source_step"] = str(i["source_step"])
-            step = Step(step_dict, self)
-            self.steps[k] = step
+            step_dict = {**step_dict, "id": str(step_dict["id"])}
+            step_dict["input_steps"] = {
+                name: {**i, "source_step": str(i["source_step"])} for name, i in step_dict["input_steps"].items()
+            }
+            step = Step(step_dict, self, copy=False)
+            steps[k] = step
             if step.type == "tool":
-                if not step.tool_inputs or step.tool_id not in tools_list_by_id:
-                    missing_ids.append(k)
                 assert step.tool_id
                 tool_labels_to_ids.setdefault(step.tool_id, set()).add(step.id)
+        self._own_wrapped()["steps"] = steps
         input_labels_to_ids: dict[str, set[str]] = {}
         for id_, d in self.inputs.items():
             input_labels_to_ids.setdefault(d["label"], set()).add(id_)
         object.__setattr__(self, "input_labels_to_ids", input_labels_to_ids)
         object.__setattr__(self, "tool_labels_to_ids", tool_labels_to_ids)
-        dag, inv_dag = self._get_dag()
-        heads, tails = set(dag), set(inv_dag)
-        object.__setattr__(self, "dag", dag)
-        object.__setattr__(self, "inv_dag", inv_dag)
-        object.__setattr__(self, "source_ids", heads - tails)
         assert (
             set(self.inputs) == self.data_collection_input_ids | self.data_input_ids | self.parameter_input_ids
         ), f"inputs is {self.inputs!r}, while data_collection_input_ids is {self.data_collection_input_ids!r}, data_input_ids is {self.data_input_ids!r} and parameter_input_ids is {self.parameter_input_ids!r}"
-        object.__setattr__(self, "sink_ids", tails - heads)
-        object.__setattr__(self, "missing_ids", missing_ids)
+        object.__setattr__(self, "_dag_dicts", None)
+        object.__setattr__(self, "_dag_index", None)
+        object.__setattr__(self, "_missing_ids", None)
+
+    def touch(self) -> None:
+        # a step may have been modified, so the DAG has to be recomputed
+        object.__setattr__(self, "_dag_dicts", None)
+        object.__setattr__(self, "_dag_index", None)
+        super().touch()
+
+    @property
+    def dag_index(self) -> DAGIndex:
+        """
+        Return the index of the workflow's DAG, which allows to find the
+        predecessors and successors of a step, or the step with a given
+        label, in constant time.
+
+        The index is built on first access and rebuilt after the workflow or
+        one of its steps is modified through attribute assignment. Call
+        :meth:`touch` after modifying the steps in place.
+        """
+        index = self._dag_index
+        if index is None:
+            input_steps = {id_: [i["source_step"] for i in s.input_steps.values()] for id_, s in self.steps.items()}
+            labels = {s.wrapped["label"]: id_ for id_, s in self.steps.items() if s.wrapped.get("label")}
+            index = DAGIndex(input_steps, labels)
+            object.__setattr__(self, "_dag_index", index)
+        return index
+
+    @property
+    def dag(self) -> dict[str, set[str]]:
+        """
+        Return the 'direct' representation of the workflow's DAG (step =>
+        successors), see :meth:`_get_dag`.
+        """
+        return self._get_dag()[0]
+
+    @property
+    def inv_dag(self) -> dict[str, set[str]]:
+        """
+        Return the 'inverse' representation of the workflow's DAG (step =>
+        predecessors), see :meth:`_get_dag`.
+        """
+        return self._get_dag()[1]
+
+    @property
+    def source_ids(self) -> set[str]:
+        """
+        Return the ids of the steps which have successors but no
+        predecessors.
+        """
+        index = self.dag_index
+        return {id_ for id_ in index.ids if index.out_degree(id_) and not index.in_degree(id_)}
+
+    @property
+    def sink_ids(self) -> set[str]:
+        """
+        Return the ids of the steps which have predecessors but no
+        successors.
+        """
+        index = self.dag_index
+        return {id_ for id_ in index.ids if index.in_degree(id_) and not index.out_degree(id_)}
 
     def _get_dag(self) -> tuple[dict[str, set[str]], dict[str, set[str]]]:
         """
@@ -362,32 +502,23 @@ class Workflow(Wrapper):
 
           {'c': {'a', 'b'}, 'd': {'c'}, 'e': {'c'}, 'f': {'c'}}
         """
-        dag: dict[str, set[str]] = {}
-        inv_dag: dict[str, set[str]] = {}
-        for s in self.steps.values():
-            assert isinstance(s, Step)
-            for i in s.input_steps.values():
-                head, tail = i["source_step"], s.id
-                dag.setdefault(head, set()).add(tail)
-                inv_dag.setdefault(tail, set()).add(head)
-        return dag, inv_dag
+        dag_dicts = self._dag_dicts
+        if dag_dicts is None:
+            index = self.dag_index
+            dag = {id_: set(index.successors(id_)) for id_ in index.ids if index.out_degree(id_)}
+            inv_dag = {id_: set(index.predecessors(id_)) for id_ in index.ids if index.in_degree(id_)}
+            dag_dicts = (dag, inv_dag)
+            object.__setattr__(self, "_dag_dicts", dag_dicts)
+        return dag_dicts
 
     def sorted_step_ids(self) -> list[str]:
         """
         Return a topological sort of the workflow's DAG.
+
+        Steps which are not connected to any other step are not included.
         """
-        ids: list[str] = []
-        source_ids = self.source_ids.copy()
-        inv_dag = {k: v.copy() for k, v in self.inv_dag.items()}
-        while source_ids:
-            head = source_ids.pop()
-            ids.append(head)
-            for tail in self.dag.get(head, set()):
-                incoming = inv_dag[tail]
-                incoming.remove(head)
-                if not incoming:
-                    source_ids.add(tail)
-        return ids
+        index = self.dag_index
+        return [id_ for id_ in index.sorted_ids() if index.in_degree(id_) or index.out_degree(id_)]
 
     @property
     def data_input_ids(self) -> set[str]:
@@ -424,6 +555,26 @@ class Workflow(Wrapper):
         """
         return set(self.input_labels_to_ids)
 
+    @property
+    def missing_ids(self) -> list[str]:
+        """
+        Return the ids of the tool steps of this workflow whose tool is not
+        installed in the Galaxy instance or which have no tool inputs.
+
+        This is computed on first access, using the tool ids cached by
+        :meth:`~.client.ObjToolClient.get_tool_ids`.
+        """
+        missing_ids = self._missing_ids
+        if missing_ids is None:
+            tool_ids = self.gi.tools.get_tool_ids() if self.gi else set()
+            missing_ids = [
+                k
+                for k, step in self.steps.items()
+                if step.type == "tool" and (not step.tool_inputs or step.tool_id not in tool_ids)
+            ]
+            object.__setattr__(self, "_missing_ids", missing_ids)
+        return missing_ids
+
     @property
     def is_runnable(self) -> bool:
         """
@@ -674,11 +825,29 @@ class Invocation(Wrapper):
     update_time: str
     uuid: str
     workflow_id: str
+    _sorted_steps: list[InvocationStep] | None
 
-    def __init__(self, inv_dict: dict[str, Any], gi: "GalaxyInstance") -> None:
-        super().__init__(inv_dict, gi=gi)
-        self.steps = [InvocationStep(step, parent=self, gi=gi) for step in inv_dict["steps"]]
+    def __init__(self, inv_dict: dict[str, Any], gi: "GalaxyInstance", *, copy: bool = True) -> None:
+        super().__init__(inv_dict, gi=gi, copy=copy)
+        self.steps = [InvocationStep(step, parent=self, gi=gi, copy=copy) for step in inv_dict["steps"]]
         self.inputs = [{**v, "label": k} for k, v in inv_dict["inputs"].items()]
+        object.__setattr__(self, "_sorted_steps", None)
+
+    def touch(self) -> None:
+        # the steps may have been replaced, so they have to be sorted again
+        object.__setattr__(self, "_sorted_steps", None)
+        super().touch()
+
+    def _get_sorted_steps(self) -> list[InvocationStep]:
+        """
+        Return the steps of this invocation sorted by order index, sorting
+        them only once.
+        """
+        sorted_steps = self._sorted_steps
+        if sorted_steps is None:
+            sorted_steps = sorted(self.steps, key=lambda step: step.order_index)
+            object.__setattr__(self, "_sorted_steps", sorted_steps)
+        return sorted_steps
 
     def sorted_step_ids(self) -> list[str]:
         """
@@ -687,7 +856,7 @@ class Invocation(Wrapper):
         :rtype: list of str
         :return: sorted step IDs
         """
-        return [step.id for step in sorted(self.steps, key=lambda step: step.order_index)]
+        return [step.id for step in self._get_sorted_steps()]
 
     def step_states(self) -> set[str]:
         """
@@ -729,14 +898,17 @@ class Invocation(Wrapper):
         :rtype: list of InvocationStep
         :return: invocation steps
         """
-        steps: list[InvocationStep] | filter = self.steps
+        steps: list[InvocationStep] | filter = self._get_sorted_steps()
         if indices is not None:
-            steps = filter(lambda step: step.order_index in indices, steps)
+            index_set = set(indices)
+            steps = filter(lambda step: step.order_index in index_set, steps)
         if states is not None:
-            steps = filter(lambda step: step.state in states, steps)
+            state_set = set(states)
+            steps = filter(lambda step: step.state in state_set, steps)
         if step_ids is not None:
-            steps = filter(lambda step: step.id in step_ids, steps)
-        return sorted(steps, key=lambda step: step.order_index)
+            step_id_set = set(step_ids)
+            steps = filter(lambda step: step.id in step_id_set, steps)
+        return list(steps)
 
     def cancel(self) -> None:
         """
@@ -746,7 +918,7 @@ class Invocation(Wrapper):
           On success, this method updates the Invocation object's internal variables.
         """
         inv_dict = self.gi.gi.invocations.cancel_invocation(self.id)
-        self.__init__(inv_dict, gi=self.gi)  # type: ignore[misc]
+        self.__init__(inv_dict, gi=self.gi, copy=False)  # type: ignore[misc]
 
     def refresh(self) -> "Invocation":
         """
@@ -755,7 +927,7 @@ class Invocation(Wrapper):
         :return: self
         """
         inv_dict = self.gi.gi.invocations.show_invocation(self.id)
-        self.__init__(inv_dict, gi=self.gi)  # type: ignore[misc]
+        self.__init__(inv_dict, gi=self.gi, copy=False)  # type: ignore[misc]
         return self
 
     def run_step_actions(self, steps: list[InvocationStep], actions: list[object]) -> None:
@@ -780,7 +952,7 @@ class Invocation(Wrapper):
             for step, action in zip(steps, actions)
         ]
         for step, step_dict in zip(steps, step_dict_list):
-            step.__init__(step_dict, parent=self, gi=self.gi)  # type: ignore[misc]
+            step.__init__(step_dict, parent=self, gi=self.gi, copy=False)  # type: ignore[misc]
 
     def summary(self) -> dict[str, Any]:
         """
@@ -830,7 +1002,7 @@ class Invocation(Wrapper):
         """
         return self.gi.gi.invocations.get_invocation_biocompute_object(self.id)
 
-    def wait(self, maxwait: float = 12000, interval: float = 3, check: bool = True) -> None:
+    def wait(self, maxwait: float = 12000, interval: float | bioblend.PollingStrategy = 3, check: bool = True) -> None:
         """
         Wait for this invocation to reach a terminal state.
 
@@ -838,7 +1010,8 @@ class Invocation(Wrapper):
         :param maxwait: upper limit on waiting time
 
         :type interval: float
-        :param interval: polling interval in secconds
+        :param interval: polling interval in secconds, or a
+          :class:`~bioblend.PollingStrategy` instance to compute it
 
         :type check: bool
         :param check: if ``true``, raise an error if the terminal state is not
@@ -848,7 +1021,7 @@ class Invocation(Wrapper):
           On success, this method updates the Invocation object's internal variables.
         """
         inv_dict = self.gi.gi.invocations.wait_for_invocation(self.id, maxwait=maxwait, interval=interval, check=check)
-        self.__init__(inv_dict, gi=self.gi)  # type: ignore[misc]
+        self.__init__(inv_dict, gi=self.gi, copy=False)  # type: ignore[misc]
 
 
 class Dataset(Wrapper, metaclass=abc.ABCMeta):
@@ -874,8 +1047,10 @@ class Dataset(Wrapper, metaclass=abc.ABCMeta):
     POLLING_INTERVAL = 1  # for state monitoring
     state: str
 
-    def __init__(self, ds_dict: dict[str, Any], container: "DatasetContainer", gi: "GalaxyInstance") -> None:
-        super().__init__(ds_dict, gi=gi)
+    def __init__(
+        self, ds_dict: dict[str, Any], container: "DatasetContainer", gi: "GalaxyInstance", *, copy: bool = True
+    ) -> None:
+        super().__init__(ds_dict, gi=gi, copy=copy)
         object.__setattr__(self, "container", container)
 
     @property
@@ -942,15 +1117,18 @@ class Dataset(Wrapper, metaclass=abc.ABCMeta):
         """
         gi_client = getattr(self.gi.gi, self.container.API_MODULE)
         ds_dict = gi_client.show_dataset(self.container.id, self.id)
-        self.__init__(ds_dict, self.container, self.gi)  # type: ignore[misc]
+        self.__init__(ds_dict, self.container, self.gi, copy=False)  # type: ignore[misc]
         return self
 
-    def wait(self, polling_interval: float = POLLING_INTERVAL, break_on_error: bool = True) -> None:
+    def wait(
+        self, polling_interval: float | bioblend.PollingStrategy = POLLING_INTERVAL, break_on_error: bool = True
+    ) -> None:
         """
         Wait for this dataset to come out of the pending states.
 
         :type polling_interval: float
-        :param polling_interval: polling interval in seconds
+        :param polling_interval: polling interval in seconds, or a
+          :class:`~bioblend.PollingStrategy` instance to compute it
 
         :type break_on_error: bool
         :param break_on_error: if ``True``, raise a RuntimeError exception if
@@ -1018,7 +1196,7 @@ class HistoryDatasetAssociation(Dataset):
         res = self.gi.gi.histories.update_dataset(self.container.id, self.id, **kwargs)
         # Refresh also the history because the dataset may have been (un)deleted
         self.container.refresh()
-        self.__init__(res, self.container, gi=self.gi)  # type: ignore[misc]
+        self.__init__(res, self.container, gi=self.gi, copy=False)  # type: ignore[misc]
         return self
 
     def delete(self, purge: bool = False, wait: bool = False) -> None:
@@ -1059,9 +1237,14 @@ class DatasetCollection(Wrapper, metaclass=abc.ABCMeta):
     name: str
 
     def __init__(
-        self, dsc_dict: dict[str, Any], container: Union["DatasetCollection", "History"], gi: "GalaxyInstance"
+        self,
+        dsc_dict: dict[str, Any],
+        container: Union["DatasetCollection", "History"],
+        gi: "GalaxyInstance",
+        *,
+        copy: bool = True,
     ) -> None:
-        super().__init__(dsc_dict, gi=gi)
+        super().__init__(dsc_dict, gi=gi, copy=copy)
         object.__setattr__(self, "container", container)
 
     def refresh(self) -> Self:
@@ -1072,7 +1255,7 @@ class DatasetCollection(Wrapper, metaclass=abc.ABCMeta):
         """
         gi_client = getattr(self.gi.gi, self.container.API_MODULE)
         dsc_dict = gi_client.show_dataset_collection(self.container.id, self.id)
-        self.__init__(dsc_dict, self.container, self.gi)  # type: ignore[misc]
+        self.__init__(dsc_dict, self.container, self.gi, copy=False)  # type: ignore[misc]
         return self
 
     @abc.abstractmethod
@@ -1152,7 +1335,7 @@ class LibraryDataset(LibRelatedDataset):
         """
         res = self.gi.gi.libraries.update_library_dataset(self.id, **kwargs)
         self.container.refresh()
-        self.__init__(res, self.container, gi=self.gi)  # type: ignore[misc]
+        self.__init__(res, self.container, gi=self.gi, copy=False)  # type: ignore[misc]
         return self
 
 
@@ -1163,6 +1346,8 @@ class ContentInfo(Wrapper):
     ``/api/{histories,libraries}/<ID>/contents`` from Galaxy.
     """
 
+    __slots__ = ()
+
     BASE_ATTRS = Wrapper.BASE_ATTRS + (
         "name",
         "type",
@@ -1177,6 +1362,8 @@ class LibraryContentInfo(ContentInfo):
     ``/api/libraries/<ID>/contents`` from Galaxy.
     """
 
+    __slots__ = ()
+
 
 class HistoryContentInfo(ContentInfo):
     """
@@ -1184,6 +1371,8 @@ class HistoryContentInfo(ContentInfo):
     ``/api/histories/<ID>/contents`` from Galaxy.
     """
 
+    __slots__ = ()
+
     BASE_ATTRS = ContentInfo.BASE_ATTRS + ("deleted", "state", "visible")
     deleted: bool
     state: str
@@ -1204,30 +1393,65 @@ class DatasetContainer(Wrapper, Generic[DatasetSubtype], metaclass=abc.ABCMeta):
     )
     API_MODULE: str
     CONTENT_INFO_TYPE: type[ContentInfo]
+    CONTENTS_PAGE_SIZE = 500  # number of content infos fetched per request
     DS_TYPE: ClassVar[Callable]
-    content_infos: list[ContentInfo]
     deleted: bool
     gi: "GalaxyInstance"
     name: str
     obj_gi_client: "client.ObjDatasetContainerClient"
+    _content_infos: list[ContentInfo] | None
 
     def __init__(
         self,
         c_dict: dict[str, Any],
         content_infos: list[ContentInfo] | None = None,
         gi: Optional["GalaxyInstance"] = None,
+        *,
+        copy: bool = True,
     ) -> None:
         """
         :type content_infos: list of :class:`ContentInfo`
-        :param content_infos: info objects for the container's contents
+        :param content_infos: info objects for the container's contents. If
+          not provided, they are fetched on first access to the
+          ``content_infos`` attribute.
         """
         assert gi is not None
-        super().__init__(c_dict, gi=gi)
-        if content_infos is None:
-            content_infos = []
-        object.__setattr__(self, "content_infos", content_infos)
+        super().__init__(c_dict, gi=gi, copy=copy)
+        object.__setattr__(self, "_content_infos", content_infos)
         object.__setattr__(self, "obj_gi_client", getattr(self.gi, self.API_MODULE))
 
+    @property
+    def content_infos(self) -> list[ContentInfo]:
+        """
+        Info objects for the container's contents.
+
+        These are fetched from Galaxy on first access, then kept until the
+        container is refreshed. Use :meth:`iter_content_infos` to process the
+        contents of large containers without holding all of them in memory.
+        """
+        content_infos = self._content_infos
+        if content_infos is None:
+            content_infos = list(self.iter_content_infos()) if self.is_mapped else []
+            object.__setattr__(self, "_content_infos", content_infos)
+        return content_infos
+
+    def iter_content_infos(self, page_size: int | None = None) -> Iterator[ContentInfo]:
+        """
+        Iterate over the info objects for the container's contents.
+
+        If the contents have not been loaded yet, they are fetched from Galaxy
+        in pages of ``page_size`` items (when supported by the container type)
+        as the iteration proceeds, without being kept.
+
+        :type page_size: int
+        :param page_size: number of items to fetch per request, defaults to
+          ``CONTENTS_PAGE_SIZE``
+        """
+        if self._content_infos is not None:
+            yield from self._content_infos
+        elif self.is_mapped:
+            yield from self.obj_gi_client.iter_content_infos(self.id, page_size=page_size)
+
     @property
     def dataset_ids(self) -> list[str]:
         """
@@ -1237,16 +1461,15 @@ class DatasetContainer(Wrapper, Generic[DatasetSubtype], metaclass=abc.ABCMeta):
 
     # I think we should deprecate this method - NS
     def preview(self) -> "DatasetContainerPreview":
-        getf = self.obj_gi_client.get_previews
-        # self.state could be stale: check both regular and deleted containers
+        """
+        Get the preview of this dataset container, fetched from Galaxy by id.
+        """
         try:
-            p = next(_ for _ in getf() if _.id == self.id)
-        except IndexError:
-            try:
-                p = next(_ for _ in getf(deleted=True) if _.id == self.id)
-            except IndexError:
-                raise ValueError(f"no object for id {self.id}")
-        return p
+            return self.obj_gi_client.get_preview(self.id)
+        except bioblend.ConnectionError as e:
+            if e.status_code in (400, 403, 404):
+                raise ValueError(f"no object for id {self.id}") from e
+            raise
 
     def refresh(self) -> Self:
         """
@@ -1254,8 +1477,8 @@ class DatasetContainer(Wrapper, Generic[DatasetSubtype], metaclass=abc.ABCMeta):
 
         :return: self
         """
-        fresh = self.obj_gi_client.get(self.id)
-        self.__init__(fresh.wrapped, content_infos=fresh.content_infos, gi=self.gi)  # type: ignore[misc]
+        fresh = self.obj_gi_client._fetch(self.id)
+        self.__init__(fresh.wrapped, gi=self.gi, copy=False)  # type: ignore[misc]
         return self
 
     def get_dataset(self, ds_id: str) -> DatasetSubtype:
@@ -1269,9 +1492,13 @@ class DatasetContainer(Wrapper, Generic[DatasetSubtype], metaclass=abc.ABCMeta):
           :class:`~.LibraryDataset`
         :return: the dataset corresponding to ``ds_id``
         """
-        gi_client = getattr(self.gi.gi, self.API_MODULE)
-        ds_dict = gi_client.show_dataset(self.id, ds_id)
-        return self.DS_TYPE(ds_dict, self, gi=self.gi)
+
+        def fetch() -> DatasetSubtype:
+            gi_client = getattr(self.gi.gi, self.API_MODULE)
+            ds_dict = gi_client.show_dataset(self.id, ds_id)
+            return self.DS_TYPE(ds_dict, self, gi=self.gi, copy=False)
+
+        return self.gi._get_or_fetch(cast(type[DatasetSubtype], self.DS_TYPE), ds_id, fetch)
 
     def get_datasets(self, name: str | None = None) -> list[DatasetSubtype]:
         """
@@ -1358,6 +1585,40 @@ class History(DatasetContainer[HistoryDatasetAssociation]):
         self.refresh()
         return self
 
+    def get_datasets(self, name: str | None = None) -> list[HistoryDatasetAssociation]:
+        """
+        Get all datasets contained inside this history.
+
+        The datasets are fetched with ``CONTENTS_PAGE_SIZE`` datasets per
+        request, instead of one request per dataset.
+
+        :type name: str
+        :param name: return only datasets with this name
+
+        :rtype: list of :class:`~.HistoryDatasetAssociation`
+        :return: datasets with the given name contained inside this history
+        """
+        datasets = []
+        offset = 0
+        while True:
+            ds_dicts = self.gi.gi.datasets.get_datasets(
+                limit=self.CONTENTS_PAGE_SIZE,
+                offset=offset,
+                name=name,
+                history_id=self.id,
+                order="hid-asc",
+                view="detailed",
+            )
+            self.gi._observe(self.DS_TYPE, ds_dicts)
+            for ds_dict in ds_dicts:
+                if ds_dict.get("history_content_type", "dataset") != "dataset":
+                    continue
+                fetch = functools.partial(self.DS_TYPE, ds_dict, self, gi=self.gi, copy=False)
+                datasets.append(self.gi._get_or_fetch(self.DS_TYPE, ds_dict["id"], fetch))
+            if len(ds_dicts) < self.CONTENTS_PAGE_SIZE:
+                return datasets
+            offset += self.CONTENTS_PAGE_SIZE
+
     def delete(self, purge: bool = False) -> None:
         """
         Delete this history.
@@ -1394,6 +1655,64 @@ class History(DatasetContainer[HistoryDatasetAssociation]):
         self.refresh()
         return self.get_dataset(res["id"])
 
+    def copy_contents(
+        self,
+        contents: Iterable[Union[HistoryDatasetAssociation, "HistoryDatasetCollectionAssociation", LibraryDataset]],
+        max_workers: int | None = None,
+    ) -> list[Union[HistoryDatasetAssociation, "HistoryDatasetCollectionAssociation", Exception]]:
+        """
+        Copy many history datasets, history dataset collections or library
+        datasets into this history, with concurrent requests.
+
+        :type contents: list
+        :param contents: the datasets and dataset collections to copy
+
+        :type max_workers: int
+        :param max_workers: maximum number of concurrent copy requests,
+          defaults to the ``max_workers`` of the Galaxy instance. See
+          :meth:`~bioblend.galaxy.histories.HistoryClient.copy_contents`.
+
+        :rtype: list
+        :return: for each of ``contents``, in the same order, the new
+          :class:`~.HistoryDatasetAssociation` or
+          :class:`~.HistoryDatasetCollectionAssociation`, or the exception
+          raised if its copy failed
+        """
+        if not self.is_mapped:
+            raise RuntimeError("history is not mapped to a Galaxy object")
+        items = []
+        for content in contents:
+            if isinstance(content, HistoryDatasetAssociation):
+                items.append({"id": content.id, "src": "hda"})
+            elif isinstance(content, HistoryDatasetCollectionAssociation):
+                items.append({"id": content.id, "src": "hdca"})
+            elif isinstance(content, LibraryDataset):
+                items.append({"id": content.id, "src": "library"})
+            else:
+                raise TypeError(f"cannot copy {content!r} to a history")
+        copies = self.gi.gi.histories.copy_contents(
+            self.id, items, max_workers=self.gi.max_workers if max_workers is None else max_workers
+        )
+        results: list[HistoryDatasetAssociation | HistoryDatasetCollectionAssociation | Exception] = []
+        for copy_ in copies:
+            if copy_.error is not None:
+                results.append(copy_.error)
+                continue
+            if not isinstance(copy_.content, dict):
+                results.append(RuntimeError(f"copy_content: unexpected reply: {copy_.content!r}"))
+                continue
+            # the copies are new objects, so they are not in the identity map
+            new_content: HistoryDatasetAssociation | HistoryDatasetCollectionAssociation
+            if copy_.source == "hdca":
+                new_content = self.DSC_TYPE(copy_.content, self, gi=self.gi, copy=False)
+            else:
+                new_content = self.DS_TYPE(copy_.content, self, gi=self.gi, copy=False)
+            if self.gi.identity_map is not None:
+                self.gi.identity_map.add(new_content)
+            results.append(new_content)
+        self.refresh()
+        return results
+
     def upload_file(self, path: str, **kwargs: Any) -> HistoryDatasetAssociation:
         """
         Upload the file specified by ``path`` to this history.
@@ -1513,8 +1832,12 @@ class History(DatasetContainer[HistoryDatasetAssociation]):
         :rtype: :class:`~.HistoryDatasetCollectionAssociation`
         :return: the dataset collection corresponding to ``dsc_id``
         """
-        dsc_dict = self.gi.gi.histories.show_dataset_collection(self.id, dsc_id)
-        return self.DSC_TYPE(dsc_dict, self, gi=self.gi)
+
+        def fetch() -> HistoryDatasetCollectionAssociation:
+            dsc_dict = self.gi.gi.histories.show_dataset_collection(self.id, dsc_id)
+            return self.DSC_TYPE(dsc_dict, self, gi=self.gi, copy=False)
+
+        return self.gi._get_or_fetch(self.DSC_TYPE, dsc_id, fetch)
 
 
 class Library(DatasetContainer[LibraryDataset]):
@@ -1690,7 +2013,7 @@ class Library(DatasetContainer[LibraryDataset]):
         :return: the folder corresponding to ``f_id``
         """
         f_dict = self.gi.gi.libraries.show_folder(self.id, f_id)
-        return Folder(f_dict, self, gi=self.gi)
+        return Folder(f_dict, self, gi=self.gi, copy=False)
 
     @property
     def root_folder(self) -> "Folder":
@@ -1721,8 +2044,8 @@ class Folder(Wrapper):
     name: str
     _cached_parent: Optional["Folder"]
 
-    def __init__(self, f_dict: dict[str, Any], container: Library, gi: "GalaxyInstance") -> None:
-        super().__init__(f_dict, gi=gi)
+    def __init__(self, f_dict: dict[str, Any], container: Library, gi: "GalaxyInstance", *, copy: bool = True) -> None:
+        super().__init__(f_dict, gi=gi, copy=copy)
         object.__setattr__(self, "container", container)
 
     @property
@@ -1754,7 +2077,7 @@ class Folder(Wrapper):
         :return: self
         """
         f_dict = self.gi.gi.libraries.show_folder(self.container.id, self.id)
-        self.__init__(f_dict, self.container, gi=self.gi)  # type: ignore[misc]
+        self.__init__(f_dict, self.container, gi=self.gi, copy=False)  # type: ignore[misc]
         return self
 
 
@@ -1772,7 +2095,11 @@ class Tool(Wrapper):
     POLLING_INTERVAL = 10  # for output state monitoring
 
     def run(
-        self, inputs: dict[str, Any], history: History, wait: bool = False, polling_interval: float = POLLING_INTERVAL
+        self,
+        inputs: dict[str, Any],
+        history: History,
+        wait: bool = False,
+        polling_interval: float | bioblend.PollingStrategy = POLLING_INTERVAL,
     ) -> list[HistoryDatasetAssociation]:
         """
         Execute this tool in the given history with inputs from dict
@@ -1790,7 +2117,8 @@ class Tool(Wrapper):
           in a pending state
 
         :type polling_interval: float
-        :param polling_interval: polling interval in seconds
+        :param polling_interval: polling interval in seconds, or a
+          :class:`~bioblend.PollingStrategy` instance to compute it
 
         :rtype: list of :class:`HistoryDatasetAssociation`
         :return: list of output datasets
@@ -1836,6 +2164,8 @@ class DatasetContainerPreview(Wrapper):
     Abstract base class for dataset container (history and library) 'previews'.
     """
 
+    __slots__ = ()
+
     BASE_ATTRS = Wrapper.BASE_ATTRS + (
         "deleted",
         "name",
@@ -1852,6 +2182,8 @@ class LibraryPreview(DatasetContainerPreview):
     ``/api/libraries`` from Galaxy.
     """
 
+    __slots__ = ()
+
 
 class HistoryPreview(DatasetContainerPreview):
     """
@@ -1861,6 +2193,8 @@ class HistoryPreview(DatasetContainerPreview):
     ``/api/histories`` from Galaxy.
     """
 
+    __slots__ = ()
+
     BASE_ATTRS = DatasetContainerPreview.BASE_ATTRS + (
         "annotation",
         "published",
@@ -1881,6 +2215,8 @@ class WorkflowPreview(Wrapper):
     ``/api/workflows`` from Galaxy.
     """
 
+    __slots__ = ()
+
     BASE_ATTRS = Wrapper.BASE_ATTRS + (
         "deleted",
         "latest_workflow_uuid",
@@ -1907,6 +2243,8 @@ class InvocationPreview(Wrapper):
     ``/api/invocations`` from Galaxy.
     """
 
+    __slots__ = ()
+
     BASE_ATTRS = Wrapper.BASE_ATTRS + (
         "history_id",
         "state",
@@ -1929,5 +2267,50 @@ class JobPreview(Wrapper):
     ``/api/jobs`` from Galaxy.
     """
 
+    __slots__ = ()
+
     BASE_ATTRS = Wrapper.BASE_ATTRS + ("state",)
     state: str
+
+
+WrapperSubtype = TypeVar("WrapperSubtype", bound=Wrapper)
+
+
+class LazyWrapper(Generic[WrapperSubtype]):
+    """
+    Proxy for a Galaxy object which is retrieved from Galaxy only when
+    needed.
+
+    The attributes exposed by the preview of the object are read from the
+    preview, while accessing (or setting) any other attribute retrieves the
+    complete object, once, and forwards the access to it.
+
+    Instances of this class are returned by the ``list()`` methods of the
+    clients when called with ``lazy=True``.
+    """
+
+    __slots__ = ("_fetch", "_obj", "_preview")
+
+    def __init__(self, preview: Wrapper, fetch: Callable[[], WrapperSubtype]) -> None:
+        object.__setattr__(self, "_preview", preview)
+        object.__setattr__(self, "_fetch", fetch)
+        object.__setattr__(self, "_obj", None)
+
+    def _resolve(self) -> WrapperSubtype:
+        """
+        Return the complete object, retrieving it if needed.
+        """
+        if self._obj is None:
+            object.__setattr__(self, "_obj", self._fetch())
+        return cast(WrapperSubtype, self._obj)
+
+    def __getattr__(self, name: str) -> Any:
+        if self._obj is None and name in self._preview.BASE_ATTRS:
+            return getattr(self._preview, name)
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._obj if self._obj is not None else self._preview!r})"
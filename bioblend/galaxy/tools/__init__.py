@@ -572,7 +572,7 @@ class ToolClient(Client):
           The following parameters work only on Galaxy 22.01 or later:
           ``storage``, ``metadata``, ``chunk_size``, ``auto_decompress``.
         """
-        if self.gi.config.get_version()["version_major"] >= "22.01":
+        if self.gi.server_version["version_major"] >= "22.01":
             # Use the tus protocol
             uploader = self.gi.get_tus_uploader(path, storage=storage, metadata=metadata, chunk_size=chunk_size)
             uploader.upload()
@@ -14,6 +14,7 @@ if TYPE_CHECKING:
 
 
 class ToolShedClient(Client):
+    gi: "GalaxyInstance"
     module = "tool_shed_repositories"
 
     def __init__(self, galaxy_instance: "GalaxyInstance") -> None:
@@ -155,7 +156,9 @@ class ToolShedClient(Client):
             payload["new_tool_panel_section_label"] = new_tool_panel_section_label
 
         url = self._make_url() + "/new/install_repository_revision"
-        return self._post(url=url, payload=payload)
+        ret = self._post(url=url, payload=payload)
+        self.gi._toolbox_version += 1
+        return ret
 
     def uninstall_repository_revision(
         self, name: str, owner: str, changeset_revision: str, tool_shed_url: str, remove_from_disk: bool = True
@@ -190,4 +193,6 @@ class ToolShedClient(Client):
             "changeset_revision": changeset_revision,
             "remove_from_disk": remove_from_disk,
         }
-        return self._delete(params=payload)
+        ret = self._delete(params=payload)
+        self.gi._toolbox_version += 1
+        return ret
@@ -0,0 +1,536 @@
+"""
+Wait for many Galaxy objects (jobs, datasets, invocations, ...) at once.
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import (
+    Callable,
+    Iterable,
+    Iterator,
+)
+from typing import (
+    Any,
+    NamedTuple,
+    TYPE_CHECKING,
+)
+
+from bioblend import (
+    FixedInterval,
+    NotReady,
+    PollingStrategy,
+    TimeoutException,
+    wait_on,
+)
+from bioblend.galaxy.datasets import TERMINAL_STATES
+from bioblend.galaxy.invocations import (
+    INVOCATION_SUCCESS_STATES,
+    INVOCATION_TERMINAL_STATES,
+)
+from bioblend.galaxy.jobs import JOB_TERMINAL_STATES
+
+if TYPE_CHECKING:
+    from bioblend.galaxy import GalaxyInstance
+
+log = logging.getLogger(__name__)
+
+# Maximum number of items to request in a single listing call
+PAGE_SIZE = 500
+# Keys of the history datasets requested when refreshing their states
+DATASET_KEYS = ["id", "state", "name", "hid", "history_id"]
+
+
+class WaitResult(NamedTuple):
+    """
+    An object which has reached a terminal state.
+    """
+
+    type: str
+    """Object type: 'dataset', 'dataset_collection', 'invocation', 'job' or 'library_dataset'"""
+    id: str
+    """Object ID"""
+    state: str
+    """Terminal state of the object"""
+    details: dict[str, Any]
+    """Dictionary describing the object, as returned by the Galaxy API. For
+    datasets tracked with their history, only the ``DATASET_KEYS`` keys are
+    included."""
+
+
+class Waiter:
+    """
+    Track many Galaxy objects at once and wait for them to reach a terminal
+    state.
+
+    Instead of polling each object separately, the states of the tracked
+    objects are refreshed in batches whenever possible: for example, the
+    states of all the datasets tracked in the same history are obtained with
+    a single history contents request, and the states of all the jobs tracked
+    in the same history with a (paginated) jobs listing. Objects for which no
+    batch query is available, whose history is not known, or which are
+    missing from the batch query (e.g. because the wrong history was given),
+    are polled individually.
+
+    Example: wait for many jobs, processing them as they terminate::
+
+        from bioblend.galaxy.waiter import Waiter
+
+        waiter = Waiter(gi)
+        for job_id in job_ids:
+            waiter.add_job(job_id, history_id=history_id)
+        for result in waiter.wait():
+            print(result.id, result.state)
+    """
+
+    def __init__(
+        self,
+        gi: "GalaxyInstance",
+        maxwait: float = 12000,
+        interval: float | PollingStrategy = 3,
+        check: bool = False,
+    ) -> None:
+        """
+        :type gi: GalaxyInstance
+        :param gi: the GalaxyInstance through which to poll the objects
+
+        :type maxwait: float
+        :param maxwait: Total time (in seconds) to wait for all the objects to
+          reach a terminal state. After this time, a ``TimeoutException`` will
+          be raised.
+
+        :type interval: float
+        :param interval: Time (in seconds) to wait between 2 consecutive
+          checks, or a :class:`~bioblend.PollingStrategy` instance to compute
+          it.
+
+        :type check: bool
+        :param check: Whether to raise an exception as soon as an object
+          reaches a terminal state which is not successful (e.g. a job or
+          dataset in the 'error' state).
+        """
+        assert maxwait >= 0
+        self.gi = gi
+        self.maxwait = maxwait
+        self.strategy = interval if isinstance(interval, PollingStrategy) else FixedInterval(interval)
+        self.check = check
+        # history_id (or None if unknown) -> ids of the pending objects
+        self._jobs: dict[str | None, set[str]] = {}
+        self._datasets: dict[str | None, set[str]] = {}
+        self._invocations: dict[str | None, set[str]] = {}
+        self._dataset_collections: set[str] = set()
+        # (library_id, dataset_id) pairs
+        self._library_datasets: set[tuple[str, str]] = set()
+
+    def add_job(self, job_id: str, history_id: str | None = None) -> None:
+        """
+        Track a job.
+
+        :type job_id: str
+        :param job_id: job ID
+
+        :type history_id: str
+        :param history_id: ID of the history the job belongs to. If provided,
+          the job state is refreshed together with the other jobs of the same
+          history.
+        """
+        self._jobs.setdefault(history_id, set()).add(job_id)
+
+    def add_dataset(self, dataset_id: str, history_id: str | None = None) -> None:
+        """
+        Track a history dataset.
+
+        :type dataset_id: str
+        :param dataset_id: dataset ID
+
+        :type history_id: str
+        :param history_id: ID of the history the dataset belongs to. If
+          provided, the dataset state is refreshed together with the other
+          datasets of the same history.
+        """
+        self._datasets.setdefault(history_id, set()).add(dataset_id)
+
+    def add_invocation(self, invocation_id: str, history_id: str | None = None) -> None:
+        """
+        Track a workflow invocation.
+
+        :type invocation_id: str
+        :param invocation_id: invocation ID
+
+        :type history_id: str
+        :param history_id: ID of the history the invocation belongs to. If
+          provided, the invocation state is refreshed together with the other
+          invocations of the same history.
+        """
+        self._invocations.setdefault(history_id, set()).add(invocation_id)
+
+    def add_dataset_collection(self, dataset_collection_id: str) -> None:
+        """
+        Track a history dataset collection, which is considered terminal when
+        it has been populated and all its elements are in a terminal state.
+
+        :type dataset_collection_id: str
+        :param dataset_collection_id: dataset collection ID
+        """
+        self._dataset_collections.add(dataset_collection_id)
+
+    def add_library_dataset(self, library_id: str, dataset_id: str) -> None:
+        """
+        Track a library dataset.
+
+        :type library_id: str
+        :param library_id: ID of the library the dataset belongs to
+
+        :type dataset_id: str
+        :param dataset_id: library dataset ID
+        """
+        self._library_datasets.add((library_id, dataset_id))
+
+    def __len__(self) -> int:
+        """
+        Return the number of objects which have not reached a terminal state
+        yet.
+        """
+        return (
+            sum(len(ids) for ids in self._jobs.values())
+            + sum(len(ids) for ids in self._datasets.values())
+            + sum(len(ids) for ids in self._invocations.values())
+            + len(self._dataset_collections)
+            + len(self._library_datasets)
+        )
+
+    def wait(self) -> Iterator[WaitResult]:
+        """
+        Wait for all the tracked objects to reach a terminal state, yielding
+        each object as soon as its terminal state is detected.
+
+        :rtype: iterator of :class:`WaitResult`
+        :return: the objects which have reached a terminal state
+        """
+        intervals = self.strategy.intervals()
+        start = time.monotonic()
+        time_left = self.maxwait
+        while True:
+            yield from self.poll()
+            pending = len(self)
+            if not pending:
+                self.strategy.record(time.monotonic() - start)
+                return
+            if time_left > 0:
+                log.info("%s objects are in a non-terminal state. Will wait %s more s", pending, time_left)
+                sleep_time = next(intervals)
+                time.sleep(min(time_left, sleep_time))
+                time_left -= sleep_time
+            else:
+                raise TimeoutException(f"{pending} objects are in a non-terminal state after {self.maxwait} s")
+
+    def poll(self) -> list[WaitResult]:
+        """
+        Refresh the states of all the tracked objects once, without waiting.
+
+        The objects which have reached a terminal state are returned and are
+        no longer tracked.
+
+        :rtype: list of :class:`WaitResult`
+        :return: the objects which have reached a terminal state
+        """
+        results: list[WaitResult] = []
+        for history_id, job_ids in self._jobs.items():
+            details = {}
+            if history_id is not None:
+                details = self._get_paged(self.gi.jobs.get_jobs, job_ids, history_id=history_id)
+            details.update(self._show_missing(self.gi.jobs.show_job, job_ids, details))
+            results.extend(self._collect("job", job_ids, details, JOB_TERMINAL_STATES, {"ok"}))
+        for history_id, dataset_ids in self._datasets.items():
+            details = {}
+            if history_id is not None:
+                contents = self.gi.histories.show_history(
+                    history_id, contents=True, types=["dataset"], ids=sorted(dataset_ids), keys=DATASET_KEYS
+                )
+                details = {c["id"]: c for c in contents if c["id"] in dataset_ids}
+            details.update(self._show_missing(self.gi.datasets.show_dataset, dataset_ids, details))
+            results.extend(self._collect("dataset", dataset_ids, details, TERMINAL_STATES, {"ok"}))
+        for history_id, invocation_ids in self._invocations.items():
+            details = {}
+            if history_id is not None:
+                details = self._get_paged(self.gi.invocations.get_invocations, invocation_ids, history_id=history_id)
+            details.update(self._show_missing(self.gi.invocations.show_invocation, invocation_ids, details))
+            results.extend(
+                self._collect(
+                    "invocation", invocation_ids, details, INVOCATION_TERMINAL_STATES, INVOCATION_SUCCESS_STATES
+                )
+            )
+        for dataset_collection_id in list(self._dataset_collections):
+            dataset_collection = self.gi.dataset_collections.show_dataset_collection(dataset_collection_id)
+            populated_state = dataset_collection.get(
+                "populated_state", "ok" if dataset_collection.get("populated", True) else "new"
+            )
+            states = {elem["object"]["state"] for elem in dataset_collection["elements"]}
+            if populated_state == "failed" or (populated_state == "ok" and states <= TERMINAL_STATES):
+                state = "ok" if populated_state == "ok" and states <= {"ok"} else "error"
+                results.append(self._terminal("dataset_collection", dataset_collection_id, state, dataset_collection))
+                self._dataset_collections.remove(dataset_collection_id)
+        for library_id, dataset_id in list(self._library_datasets):
+            dataset = self.gi.libraries.show_dataset(library_id, dataset_id)
+            if dataset["state"] in TERMINAL_STATES:
+                results.append(self._terminal("library_dataset", dataset_id, dataset["state"], dataset))
+                self._library_datasets.remove((library_id, dataset_id))
+        for pending in (self._jobs, self._datasets, self._invocations):
+            for history_id in [h for h, ids in pending.items() if not ids]:
+                del pending[history_id]
+        return results
+
+    def _collect(
+        self,
+        type_: str,
+        ids: set[str],
+        details: dict[str, dict[str, Any]],
+        terminal_states: set[str],
+        success_states: set[str],
+    ) -> list[WaitResult]:
+        """
+        Remove from ``ids`` the objects whose state in ``details`` is
+        terminal, and return them.
+        """
+        results = []
+        for id_, obj in details.items():
+            state = obj["state"]
+            if state in terminal_states:
+                results.append(self._terminal(type_, id_, state, obj, success_states))
+                ids.remove(id_)
+            else:
+                log.debug("%s %s is in non-terminal state %s", type_, id_, state)
+        return results
+
+    def _terminal(
+        self, type_: str, id_: str, state: str, details: dict[str, Any], success_states: set[str] | None = None
+    ) -> WaitResult:
+        if success_states is None:
+            success_states = {"ok"}
+        if self.check and state not in success_states:
+            raise Exception(f"{type_} {id_} is in terminal state {state}")
+        return WaitResult(type_, id_, state, details)
+
+    @staticmethod
+    def _show_missing(
+        show: Callable[[str], dict[str, Any]], ids: set[str], found: dict[str, dict[str, Any]]
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get individually the objects with the given ``ids`` which were not
+        ``found`` by a batch query. Invalid IDs make ``show`` raise an
+        exception, instead of being polled until the timeout.
+        """
+        return {id_: show(id_) for id_ in sorted(ids.difference(found))}
+
+    @staticmethod
+    def _get_paged(
+        get_page: Callable[..., list[dict[str, Any]]], ids: set[str], **kwargs: Any
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Page through a listing, calling ``get_page`` with ``limit``, ``offset``
+        and ``kwargs`` as keyword arguments, until all the objects with the
+        given ``ids`` have been found or the listing is exhausted.
+        """
+        found: dict[str, dict[str, Any]] = {}
+        offset = 0
+        while True:
+            page = get_page(limit=PAGE_SIZE, offset=offset, **kwargs)
+            found.update((obj["id"], obj) for obj in page if obj["id"] in ids)
+            if len(found) == len(ids) or len(page) < PAGE_SIZE:
+                return found
+            offset += PAGE_SIZE
+
+
+class InvocationProgress:
+    """
+    Track the progress of many workflow invocations at once, aggregating the
+    states of their jobs.
+
+    Each refresh lists the non-terminal invocations in bulk (with a paginated
+    invocations request), then gets the step jobs summary only of the
+    invocations which have changed since the previous refresh, or which
+    still have jobs in a non-terminal state. The details of an invocation
+    are requested individually only once, when it leaves the listing of
+    non-terminal invocations.
+
+    Example: print the job state counts of many invocations until all their
+    jobs have terminated::
+
+        from bioblend.galaxy.waiter import InvocationProgress
+
+        progress = InvocationProgress(gi, invocation_ids)
+        while not progress.done:
+            progress.refresh()
+            print(progress.job_states())
+            time.sleep(60)
+    """
+
+    def __init__(
+        self,
+        gi: "GalaxyInstance",
+        invocation_ids: Iterable[str] = (),
+        history_id: str | None = None,
+        workflow_id: str | None = None,
+    ) -> None:
+        """
+        :type gi: GalaxyInstance
+        :param gi: the GalaxyInstance through which to poll the invocations
+
+        :type invocation_ids: list of str
+        :param invocation_ids: IDs of the invocations to track
+
+        :type history_id: str
+        :param history_id: ID of the history all the tracked invocations
+          belong to, if any. It is used to restrict the listing of the
+          non-terminal invocations.
+
+        :type workflow_id: str
+        :param workflow_id: ID of the workflow all the tracked invocations
+          belong to, if any. It is used to restrict the listing of the
+          non-terminal invocations.
+        """
+        self.gi = gi
+        self._filters = {"history_id": history_id, "workflow_id": workflow_id}
+        # invocation_id -> last known invocation state and update time
+        self._states: dict[str, str | None] = {}
+        self._update_times: dict[str, str | None] = {}
+        # invocation_id -> job state histogram
+        self._job_states: dict[str, dict[str, int]] = {}
+        for invocation_id in invocation_ids:
+            self.add_invocation(invocation_id)
+
+    def add_invocation(self, invocation_id: str) -> None:
+        """
+        Track a workflow invocation.
+
+        :type invocation_id: str
+        :param invocation_id: invocation ID
+        """
+        self._states.setdefault(invocation_id, None)
+        self._update_times.setdefault(invocation_id, None)
+
+    def __len__(self) -> int:
+        """
+        Return the number of tracked invocations.
+        """
+        return len(self._states)
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether all the tracked invocations are in a terminal state and all
+        their jobs have terminated, as of the last refresh.
+        """
+        return all(self._is_done(invocation_id) for invocation_id in self._states)
+
+    def _is_done(self, invocation_id: str) -> bool:
+        return self._states[invocation_id] in INVOCATION_TERMINAL_STATES and not self._has_active_jobs(invocation_id)
+
+    def _has_active_jobs(self, invocation_id: str) -> bool:
+        job_states = self._job_states.get(invocation_id)
+        if job_states is None:
+            return True
+        return any(count and state not in JOB_TERMINAL_STATES for state, count in job_states.items())
+
+    def refresh(self) -> set[str]:
+        """
+        Refresh the states of the tracked invocations and of their jobs.
+
+        :rtype: set of str
+        :return: IDs of the invocations whose state or job states have
+          changed
+        """
+        changed: set[str] = set()
+        pending = {
+            invocation_id for invocation_id, state in self._states.items() if state not in INVOCATION_TERMINAL_STATES
+        }
+        if pending:
+            filters = {k: v for k, v in self._filters.items() if v is not None}
+            listed = Waiter._get_paged(self.gi.invocations.get_invocations, pending, include_terminal=False, **filters)
+            for invocation_id in pending:
+                invocation = listed.get(invocation_id)
+                if invocation is None:
+                    # the invocation has reached a terminal state
+                    invocation = self.gi.invocations.show_invocation(invocation_id)
+                if (
+                    invocation["state"] != self._states[invocation_id]
+                    or invocation.get("update_time") != self._update_times[invocation_id]
+                ):
+                    self._states[invocation_id] = invocation["state"]
+                    self._update_times[invocation_id] = invocation.get("update_time")
+                    changed.add(invocation_id)
+        for invocation_id in self._states:
+            if invocation_id in changed or self._has_active_jobs(invocation_id):
+                job_states: Counter[str] = Counter()
+                for step_summary in self.gi.invocations.get_invocation_step_jobs_summary(invocation_id):
+                    job_states.update(step_summary["states"])
+                if job_states != self._job_states.get(invocation_id):
+                    self._job_states[invocation_id] = dict(job_states)
+                    changed.add(invocation_id)
+        return changed
+
+    def invocation_states(self) -> dict[str, str | None]:
+        """
+        Get the state of each tracked invocation, as of the last refresh.
+
+        :rtype: dict
+        :return: dictionary mapping invocation IDs to invocation states
+          (``None`` if not refreshed yet)
+        """
+        return dict(self._states)
+
+    def job_states(self, invocation_id: str | None = None) -> dict[str, int]:
+        """
+        Get the histogram of the job states of one or all the tracked
+        invocations, as of the last refresh.
+
+        :type invocation_id: str
+        :param invocation_id: ID of the invocation whose job states to get.
+          If not specified, the job states of all the tracked invocations are
+          aggregated.
+
+        :rtype: dict
+        :return: dictionary mapping job states to the number of jobs in that
+          state, e.g. ``{'ok': 120, 'running': 8, 'queued': 30}``
+        """
+        if invocation_id is not None:
+            return dict(self._job_states.get(invocation_id, {}))
+        total: Counter[str] = Counter()
+        for job_states in self._job_states.values():
+            total.update(job_states)
+        return dict(total)
+
+    def wait(self, maxwait: float = 12000, interval: float | PollingStrategy = 3) -> dict[str, int]:
+        """
+        Wait until all the tracked invocations are in a terminal state and
+        all their jobs have terminated.
+
+        :type maxwait: float
+        :param maxwait: Total time (in seconds) to wait. After this time, a
+          ``TimeoutException`` will be raised.
+
+        :type interval: float
+        :param interval: Time (in seconds) to wait between 2 consecutive
+          refreshes, or a :class:`~bioblend.PollingStrategy` instance to
+          compute it.
+
+        :rtype: dict
+        :return: the aggregated histogram of the job states, see
+          :meth:`job_states`
+        """
+
+        def check_and_get_job_states() -> dict[str, int]:
+            self.refresh()
+            if not self.done:
+                pending = sum(not self._is_done(invocation_id) for invocation_id in self._states)
+                raise NotReady(f"{pending} invocations have not terminated yet")
+            return self.job_states()
+
+        return wait_on(check_and_get_job_states, maxwait=maxwait, interval=interval)
+
+
+__all__ = (
+    "InvocationProgress",
+    "WaitResult",
+    "Waiter",
+)
@@ -3,22 +3,92 @@ Contains possible interactions with the Galaxy Workflows
 """
 
 import json
+import logging
 import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
     Literal,
+    NamedTuple,
     TYPE_CHECKING,
+    TypeVar,
 )
 
-import yaml
+import requests
 
+from bioblend import (
+    ConnectionError,
+    ExponentialBackoff,
+    PollingStrategy,
+)
 from bioblend.galaxy.client import Client
 
 if TYPE_CHECKING:
     from bioblend.galaxy import GalaxyInstance
 
+log = logging.getLogger(__name__)
+
 InputsBy = Literal["step_index|step_uuid", "step_index", "step_id", "step_uuid", "name"]
 
+# HTTP status codes of the errors after which a request is retried
+TRANSIENT_STATUS_CODES = {429, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class BatchInvocation(NamedTuple):
+    """
+    Outcome of the submission of one of the workflow invocations requested
+    with :meth:`WorkflowClient.invoke_workflow_batch`.
+    """
+
+    inputs: dict[str, Any]
+    """Inputs of the invocation, as passed to ``invoke_workflow_batch()``"""
+    invocation: dict[str, Any] | None
+    """Dictionary describing the invocation, or ``None`` if its submission failed"""
+    error: Exception | None
+    """Exception raised by the last submission attempt, if it failed"""
+    attempts: int
+    """Number of submission attempts"""
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the invocation was submitted successfully.
+        """
+        return self.invocation is not None
+
+    @property
+    def invocation_id(self) -> str | None:
+        """
+        ID of the invocation, or ``None`` if its submission failed.
+        """
+        return self.invocation["id"] if self.invocation is not None else None
+
+
+def _is_transient(e: Exception) -> bool:
+    """
+    Return whether a request which failed with the given exception may
+    succeed if retried.
+    """
+    if isinstance(e, ConnectionError):
+        return e.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _batch_inputs(inputs_list: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """
+    Merge the inputs of several invocations of the same workflow into the
+    linked batch inputs of a single invocation request, or return ``None``
+    if they do not all reference the same workflow inputs.
+    """
+    keys = set(inputs_list[0])
+    if not keys or any(set(inputs) != keys for inputs in inputs_list):
+        return None
+    return {key: {"batch": True, "product": False, "values": [inputs[key] for inputs in inputs_list]} for key in keys}
+
 
 class WorkflowClient(Client):
     module = "workflows"
@@ -243,6 +313,8 @@ class WorkflowClient(Client):
         json = style != "format2"
         response = self._get(url=url, params=params, json=json)
         if not json:
+            import yaml
+
             return yaml.safe_load(response.text)
         return response
 
@@ -542,6 +614,54 @@ class WorkflowClient(Client):
           (which is stable across workflow imports) or the step UUID which is
           also stable.
         """
+        payload = self._invocation_payload(
+            inputs=inputs,
+            params=params,
+            history_id=history_id,
+            history_name=history_name,
+            import_inputs_to_history=import_inputs_to_history,
+            replacement_params=replacement_params,
+            allow_tool_state_corrections=allow_tool_state_corrections,
+            inputs_by=inputs_by,
+            parameters_normalized=parameters_normalized,
+            require_exact_tool_versions=require_exact_tool_versions,
+            version=version,
+            use_cached_job=use_cached_job,
+            parameters=parameters,
+            instance=instance,
+            resource_params=resource_params,
+            preferred_object_store_id=preferred_object_store_id,
+            preferred_intermediate_object_store_id=preferred_intermediate_object_store_id,
+            preferred_outputs_object_store_id=preferred_outputs_object_store_id,
+        )
+        url = self._invocations_url(workflow_id)
+        return self._post(payload, url=url)
+
+    def _invocation_payload(
+        self,
+        inputs: dict | None = None,
+        params: dict | None = None,
+        history_id: str | None = None,
+        history_name: str | None = None,
+        import_inputs_to_history: bool = False,
+        replacement_params: dict | None = None,
+        allow_tool_state_corrections: bool = False,
+        inputs_by: InputsBy | None = None,
+        parameters_normalized: bool = False,
+        require_exact_tool_versions: bool = True,
+        version: int | None = None,
+        use_cached_job: bool = False,
+        parameters: dict | None = None,
+        instance: bool = False,
+        resource_params: dict[str, Any] | None = None,
+        preferred_object_store_id: str | None = None,
+        preferred_intermediate_object_store_id: str | None = None,
+        preferred_outputs_object_store_id: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Build the payload of a workflow invocation request, see
+        :meth:`invoke_workflow` for the parameters.
+        """
         payload: dict[str, Any] = {
             "allow_tool_state_corrections": allow_tool_state_corrections,
             "require_exact_tool_versions": require_exact_tool_versions,
@@ -588,9 +708,111 @@ class WorkflowClient(Client):
             payload["parameters_normalized"] = parameters_normalized
         if resource_params:
             payload["resource_params"] = resource_params
+        return payload
+
+    def invoke_workflow_batch(
+        self,
+        workflow_id: str,
+        inputs_list: list[dict[str, Any]],
+        max_workers: int = 4,
+        max_retries: int = 3,
+        retry_interval: float | PollingStrategy = 1,
+        batch_size: int = 0,
+        **kwargs: Any,
+    ) -> list[BatchInvocation]:
+        """
+        Invoke the workflow identified by ``workflow_id`` once for each
+        element of ``inputs_list``, submitting the invocations concurrently.
+
+        :type workflow_id: str
+        :param workflow_id: Encoded workflow ID
+
+        :type inputs_list: list of dicts
+        :param inputs_list: The ``inputs`` of each invocation, see
+          :meth:`invoke_workflow`
+
+        :type max_workers: int
+        :param max_workers: Maximum number of concurrent submission requests
+
+        :type max_retries: int
+        :param max_retries: Maximum number of times a submission request is
+          retried after a transient error, i.e. a connection error, a timeout
+          or an HTTP status code in ``TRANSIENT_STATUS_CODES``
+
+        :type retry_interval: float
+        :param retry_interval: Time (in seconds) to wait before the first
+          retry, doubled after each retry, or a
+          :class:`~bioblend.PollingStrategy` instance to compute it
+
+        :type batch_size: int
+        :param batch_size: If greater than 1, submit up to this number of
+          invocations with each request, using the ``batch`` invocation
+          parameter of Galaxy. This requires all the elements of
+          ``inputs_list`` to reference the same workflow inputs. If Galaxy
+          rejects a batch request, its invocations are submitted one by one.
+
+        :param kwargs: Any other parameter of :meth:`invoke_workflow`, which
+          is applied to all the invocations
 
+        :rtype: list of :class:`BatchInvocation`
+        :return: The outcome of each submission, in the same order as
+          ``inputs_list``. Submission errors are reported in these results
+          instead of being raised.
+
+        .. warning::
+          A request which failed with a transient error may have been
+          processed by Galaxy anyway, so retrying it may create duplicate
+          invocations. Set ``max_retries`` to 0 to avoid this.
+        """
+        payload = self._invocation_payload(**kwargs)
         url = self._invocations_url(workflow_id)
-        return self._post(payload, url=url)
+        strategy = (
+            retry_interval
+            if isinstance(retry_interval, PollingStrategy)
+            else ExponentialBackoff(initial=retry_interval, max_interval=max(retry_interval, 60))
+        )
+
+        def attempt(func: Callable[[], T]) -> tuple[T | None, Exception | None, int]:
+            intervals = strategy.intervals()
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    return func(), None, attempts
+                except Exception as e:
+                    if attempts > max_retries or not _is_transient(e):
+                        return None, e, attempts
+                    log.warning("Transient error while invoking workflow %s, retrying: %s", workflow_id, e)
+                    time.sleep(next(intervals))
+
+        def submit_one(inputs: dict[str, Any]) -> BatchInvocation:
+            one_payload = {**payload, "inputs": inputs} if inputs else payload
+            invocation, error, attempts = attempt(lambda: self._post(one_payload, url=url))
+            return BatchInvocation(inputs, invocation, error, attempts)
+
+        def submit(chunk: list[dict[str, Any]]) -> list[BatchInvocation]:
+            batch_inputs = _batch_inputs(chunk) if len(chunk) > 1 else None
+            if batch_inputs is None:
+                return [submit_one(inputs) for inputs in chunk]
+            invocations, error, attempts = attempt(
+                lambda: self._post({**payload, "inputs": batch_inputs, "batch": True}, url=url)
+            )
+            if error is None and not (isinstance(invocations, list) and len(invocations) == len(chunk)):
+                error = RuntimeError(f"invoke_workflow_batch: unexpected reply: {invocations!r}")
+            if error is None:
+                assert isinstance(invocations, list)
+                return [BatchInvocation(inputs, inv, None, attempts) for inputs, inv in zip(chunk, invocations)]
+            if isinstance(error, ConnectionError) and error.status_code is not None and 400 <= error.status_code < 500:
+                log.warning("Batch invocation of workflow %s rejected, submitting one by one: %s", workflow_id, error)
+                return [submit_one(inputs) for inputs in chunk]
+            return [BatchInvocation(inputs, None, error, attempts) for inputs in chunk]
+
+        chunk_size = max(batch_size, 1)
+        chunks = [inputs_list[i : i + chunk_size] for i in range(0, len(inputs_list), chunk_size)]
+        if not chunks:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            return [result for results in executor.map(submit, chunks) for result in results]
 
     def show_invocation(self, workflow_id: str, invocation_id: str) -> dict[str, Any]:
         """
@@ -862,4 +1084,7 @@ class WorkflowClient(Client):
         return "/".join((self._make_url(workflow_id), "invocations"))
 
 
-__all__ = ("WorkflowClient",)
+__all__ = (
+    "BatchInvocation",
+    "WorkflowClient",
+)
@@ -8,27 +8,90 @@ A base representation of an instance
 
 import base64
 import contextlib
+import functools
 import json
 import logging
+import time
+from collections.abc import (
+    Callable,
+    Iterator,
+    Mapping,
+)
 from typing import (
     Any,
+    NamedTuple,
+    TYPE_CHECKING,
 )
 
 import requests
-import tusclient.client
-import tusclient.exceptions
-from requests_toolbelt import MultipartEncoder
-from tusclient.storage.filestorage import FileStorage
-from tusclient.uploader.uploader import Uploader
 
 from bioblend import ConnectionError
 from bioblend.util import FileStream
 
+# tusclient and requests_toolbelt are slow to import, so they are imported
+# only when needed
+if TYPE_CHECKING:
+    from tusclient.uploader.uploader import Uploader
+
+    from bioblend.metrics import (
+        Metrics,
+        RequestBudget,
+    )
+
 log = logging.getLogger(__name__)
 
 UPLOAD_CHUNK_SIZE = 10**7
 
 
+class RequestDescriptor(NamedTuple):
+    """
+    Description of an HTTP request made by a ``GalaxyClient``, passed to its
+    request and response hooks.
+
+    Request hooks are appended to the ``request_hooks`` list of a
+    ``GalaxyInstance`` (or ``ToolShedInstance``) and are called with the
+    request descriptor just before the request is sent.
+
+    Response hooks are appended to the ``response_hooks`` list and are called
+    with 4 arguments once the request has completed: the same request
+    descriptor object, the response, the time (in seconds) taken by the
+    request and the exception raised, if any. The response is a
+    ``requests.Response`` object, whose body is not read beforehand for
+    streamed requests, or ``None`` if no response was received. For the
+    chunks of a tus upload, it is instead the ``tusclient.request.TusRequest``
+    object, which exposes ``status_code`` and ``response_headers``, while for
+    the creation of a tus upload it is always ``None``.
+
+    The values of the ``x-api-key`` and ``Authorization`` headers are masked
+    in ``headers``, so that hooks cannot leak the credentials, e.g. in logs.
+
+    Since the same descriptor object is passed to both kinds of hooks, it can
+    be used as a key to match them, e.g. to start and end tracing spans.
+    Exceptions raised by the hooks are not caught.
+    """
+
+    method: str
+    url: str
+    params: Any
+    headers: Mapping[str, Any]
+
+
+_MASKED_HEADERS = frozenset(("x-api-key", "authorization"))
+
+
+def _mask_headers(headers: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Return a copy of the request headers with the credentials masked.
+    """
+    return {k: "********" if k.lower() in _MASKED_HEADERS else v for k, v in headers.items()}
+
+
+RequestHook = Callable[[RequestDescriptor], None]
+ResponseHook = Callable[[RequestDescriptor, Any, float, Exception | None], None]
+# Callable with the same signature as requests.request, see bioblend.transport
+Transport = Callable[..., requests.Response]
+
+
 class GalaxyClient:
     def __init__(
         self,
@@ -41,15 +104,28 @@ class GalaxyClient:
         verify: bool = True,
         timeout: float | None = None,
         user_agent: str | None = None,
+        transport: Transport | None = None,
     ) -> None:
         """
         :param verify: Whether to verify the server's TLS certificate
         :type verify: bool
         :param timeout: Timeout for requests operations, set to None for no timeout (the default).
         :type timeout: float
+        :param transport: Transport used to send the requests, including the
+          ones made while connecting, see :mod:`bioblend.transport`
+        :type transport: callable
         """
         self.verify = verify
         self.timeout = timeout
+        # Callable with the same signature as requests.request used to send
+        # the requests, see bioblend.transport. Default: requests.request
+        self.transport = transport
+        # Collector of request metrics, see bioblend.metrics
+        self.metrics: Metrics | None = None
+        # Functions called before each request and after each response, see
+        # RequestDescriptor
+        self.request_hooks: list[RequestHook] = []
+        self.response_hooks: list[ResponseHook] = []
         # Make sure the URL scheme is defined (otherwise requests will not work)
         if not url.lower().startswith("http"):
             found_scheme = None
@@ -57,7 +133,8 @@ class GalaxyClient:
             for scheme in ("https://", "http://"):
                 log.warning("Missing scheme in url, trying with %s", scheme)
                 with contextlib.suppress(requests.RequestException):
-                    r = requests.get(
+                    r = self._request(
+                        "GET",
                         scheme + url,
                         timeout=self.timeout,
                         verify=self.verify,
@@ -129,6 +206,93 @@ class GalaxyClient:
             raise ValueError(f"Retry delay must be >= 0 (got: {value})")
         self._get_retry_delay = value
 
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Make an HTTP request with the transport, calling the request and
+        response hooks and recording its metrics if enabled.
+
+        Keyword arguments are the same as in requests.request.
+        """
+        transport = self.transport or requests.request
+        if self.metrics is None and not self.request_hooks and not self.response_hooks:
+            return transport(method, url, **kwargs)
+        request = RequestDescriptor(method, url, kwargs.get("params"), _mask_headers(kwargs.get("headers") or {}))
+        for request_hook in self.request_hooks:
+            request_hook(request)
+        start = time.perf_counter()
+        try:
+            r = transport(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            elapsed = time.perf_counter() - start
+            if self.metrics is not None:
+                self.metrics.record(method, url, None, elapsed, _body_size(kwargs.get("data")))
+            self._run_response_hooks(request, None, elapsed, e)
+            raise
+        elapsed = time.perf_counter() - start
+        if self.metrics is not None:
+            if kwargs.get("stream"):
+                # do not read the body of streamed responses
+                try:
+                    bytes_in = int(r.headers.get("Content-Length", 0))
+                except ValueError:
+                    bytes_in = 0
+            else:
+                bytes_in = len(r.content)
+            self.metrics.record(method, url, r.status_code, elapsed, _body_size(kwargs.get("data")), bytes_in)
+        self._run_response_hooks(request, r, elapsed, None)
+        return r
+
+    def _run_response_hooks(
+        self, request: RequestDescriptor, response: Any, elapsed: float, error: Exception | None
+    ) -> None:
+        for response_hook in self.response_hooks:
+            response_hook(request, response, elapsed, error)
+
+    @contextlib.contextmanager
+    def request_budget(
+        self, name: str | None = None, max_requests: int | None = None, threshold: int = 5, window: float = 2.0
+    ) -> Iterator["RequestBudget"]:
+        """
+        Context manager counting the requests made within it, as a debugging
+        and profiling aid.
+
+        It warns when more than ``max_requests`` requests are made, and when
+        the same endpoint is requested with ``threshold`` or more different
+        ids within ``window`` seconds, which usually means that a single batch
+        request could have been used instead (N+1 pattern). The warnings
+        point to the code calling BioBlend and name the BioBlend function
+        making the requests. For example::
+
+            with gi.request_budget("list datasets", max_requests=5) as budget:
+                datasets = history.get_datasets()
+            print(budget.report())
+
+        :type name: str
+        :param name: Name of the operation, used in the warnings
+
+        :type max_requests: int
+        :param max_requests: Maximum number of requests expected
+
+        :type threshold: int
+        :param threshold: Number of different ids above which repeated
+          requests to an endpoint are reported
+
+        :type window: float
+        :param window: Duration (in seconds) of the N+1 detection window
+
+        :rtype: :class:`~bioblend.metrics.RequestBudget`
+        :return: the request budget, whose ``counts``, ``n_plus_one`` and
+          ``report()`` give the requests made and the N+1 patterns detected
+        """
+        from bioblend.metrics import RequestBudget
+
+        budget = RequestBudget(name=name, max_requests=max_requests, threshold=threshold, window=window)
+        self.request_hooks.append(budget)
+        try:
+            yield budget
+        finally:
+            self.request_hooks.remove(budget)
+
     def make_get_request(self, url: str, **kwargs: Any) -> requests.Response:
         """
         Make a GET request using the provided ``url``.
@@ -143,7 +307,7 @@ class GalaxyClient:
         headers = self.json_headers
         kwargs.setdefault("timeout", self.timeout)
         kwargs.setdefault("verify", self.verify)
-        r = requests.get(url, headers=headers, **kwargs)
+        r = self._request("GET", url, headers=headers, **kwargs)
         return r
 
     def make_post_request(
@@ -160,22 +324,23 @@ class GalaxyClient:
 
         def my_dumps(d: dict) -> dict:
             """
-            Apply ``json.dumps()`` to the values of the dict ``d`` if they are
-            not of type ``FileStream``.
+            Return a new dict with ``json.dumps()`` applied to the values of
+            the dict ``d`` which are not of type ``FileStream``, ``str`` or
+            ``bytes``.
             """
-            for k, v in d.items():
-                if not isinstance(v, (FileStream, str, bytes)):
-                    d[k] = json.dumps(v)
-            return d
+            return {k: v if isinstance(v, (FileStream, str, bytes)) else json.dumps(v) for k, v in d.items()}
 
         # Compute data, headers, params arguments for request.post,
         # leveraging the requests-toolbelt library if any files have
-        # been attached.
+        # been attached. MultipartEncoder reads the attached files lazily,
+        # so they are streamed from disk instead of being loaded in memory.
         if files_attached:
-            payload_copy = payload.copy() if payload is not None else {}
+            from requests_toolbelt import MultipartEncoder
+
+            fields = my_dumps(payload) if payload is not None else {}
             if params:
-                payload_copy.update(params)
-            data = MultipartEncoder(fields=my_dumps(payload_copy))
+                fields.update(my_dumps(params))
+            data = MultipartEncoder(fields=fields)
             headers = self.json_headers.copy()
             headers["Content-Type"] = data.content_type
             post_params = None
@@ -184,7 +349,8 @@ class GalaxyClient:
             headers = self.json_headers
             post_params = params
 
-        r = requests.post(
+        r = self._request(
+            "POST",
             url,
             params=post_params,
             data=data,
@@ -224,7 +390,8 @@ class GalaxyClient:
         """
         data = json.dumps(payload) if payload is not None else None
         headers = self.json_headers
-        r = requests.delete(
+        r = self._request(
+            "DELETE",
             url,
             params=params,
             data=data,
@@ -246,7 +413,8 @@ class GalaxyClient:
         """
         data = json.dumps(payload) if payload is not None else None
         headers = self.json_headers
-        r = requests.put(
+        r = self._request(
+            "PUT",
             url,
             params=params,
             data=data,
@@ -282,7 +450,8 @@ class GalaxyClient:
         """
         data = json.dumps(payload) if payload is not None else None
         headers = self.json_headers
-        r = requests.patch(
+        r = self._request(
+            "PATCH",
             url,
             params=params,
             data=data,
@@ -314,7 +483,7 @@ class GalaxyClient:
         storage: str | None = None,
         metadata: dict | None = None,
         chunk_size: int | None = UPLOAD_CHUNK_SIZE,
-    ) -> Uploader:
+    ) -> "Uploader":
         """
         Return the tus client uploader object for uploading to the Galaxy tus endpoint
 
@@ -336,14 +505,24 @@ class GalaxyClient:
         :rtype: tusclient.uploader.Uploader
         :return: tus uploader object
         """
+        import tusclient.client
+        import tusclient.exceptions
+        from tusclient.storage.filestorage import FileStorage
+        from tusclient.uploader.uploader import Uploader
+
+        if not hasattr(Uploader, "session_id"):
+            # monkeypatch a session_id property on to uploader
+            Uploader.session_id = property(_tus_uploader_session_id)  # type: ignore[attr-defined]  # ty:ignore[unresolved-attribute]
         key = self.key
         assert key is not None
         headers = {"x-api-key": key}
         client = tusclient.client.TusClient(self.url + url, headers=headers)
         url_storage = FileStorage(storage) if storage else None  # type: ignore[no-untyped-call]
         try:
-            return client.uploader(
+            return _get_uploader_class()(
+                self,
                 file_path=path,
+                client=client,
                 chunk_size=chunk_size,
                 metadata=metadata,
                 store_url=url_storage is not None,
@@ -366,7 +545,8 @@ class GalaxyClient:
             auth_url = f"{self.url}/authenticate/baseauth"
             # Use lower level method instead of make_get_request() because we
             # need the additional Authorization header.
-            r = requests.get(
+            r = self._request(
+                "GET",
                 auth_url,
                 headers=headers,
                 timeout=self.timeout,
@@ -382,10 +562,64 @@ class GalaxyClient:
         return self._key
 
 
-def _tus_uploader_session_id(self: Uploader) -> str:
+def _tus_uploader_session_id(self: "Uploader") -> str:
     assert self.url
     return self.url.rsplit("/", 1)[1]  # type: ignore[unreachable]
 
 
-# monkeypatch a session_id property on to uploader
-Uploader.session_id = property(_tus_uploader_session_id)  # type: ignore[attr-defined]  # ty:ignore[unresolved-attribute]
+def _body_size(data: Any) -> int:
+    """
+    Return the size (in bytes) of a request body.
+    """
+    if data is None:
+        return 0
+    if isinstance(data, (str, bytes)):
+        return len(data)
+    # e.g. a MultipartEncoder
+    return getattr(data, "len", 0)
+
+
+@functools.cache
+def _get_uploader_class() -> Callable[..., "Uploader"]:
+    """
+    Return a subclass of the tus uploader which calls the request and response
+    hooks of a ``GalaxyClient`` around the creation of the upload and the
+    upload of each chunk.
+    """
+    from tusclient.uploader.uploader import Uploader
+
+    class HookedUploader(Uploader):
+        def __init__(self, gi: GalaxyClient, *args: Any, **kwargs: Any) -> None:
+            self.gi = gi
+            super().__init__(*args, **kwargs)
+
+        def _call_with_hooks(
+            self, request: RequestDescriptor, func: Callable[[], Any], response: Callable[[], Any]
+        ) -> Any:
+            if not self.gi.request_hooks and not self.gi.response_hooks:
+                return func()
+            for request_hook in self.gi.request_hooks:
+                request_hook(request)
+            start = time.perf_counter()
+            try:
+                ret = func()
+            except Exception as e:
+                self.gi._run_response_hooks(request, None, time.perf_counter() - start, e)
+                raise
+            self.gi._run_response_hooks(request, response(), time.perf_counter() - start, None)
+            return ret
+
+        def create_url(self) -> str:
+            assert self.client
+            headers = _mask_headers(self.get_url_creation_headers())  # type: ignore[no-untyped-call]
+            request = RequestDescriptor("POST", self.client.url, None, headers)
+            # tusclient does not expose the response to the creation request
+            return self._call_with_hooks(request, super().create_url, lambda: None)
+
+        def upload_chunk(self) -> None:
+            assert self.client
+            headers = _mask_headers(self.get_headers())  # type: ignore[no-untyped-call]
+            request = RequestDescriptor("PATCH", self.url or self.client.url, None, headers)
+            self._call_with_hooks(request, super().upload_chunk, lambda: self.request)
+
+    return HookedUploader
@@ -0,0 +1,462 @@
+"""
+Collect metrics about the HTTP requests made to the Galaxy or Tool Shed API.
+
+Metrics collection is disabled by default. To enable it, assign a
+:class:`Metrics` instance to the ``metrics`` attribute of a ``GalaxyInstance``
+(or ``ToolShedInstance``)::
+
+    from bioblend.metrics import Metrics
+
+    gi.metrics = Metrics()
+    ...
+    for (method, endpoint), stats in gi.metrics.snapshot().items():
+        print(method, endpoint, stats["count"], stats["total_time"])
+
+The same :class:`Metrics` instance can be shared by several instances.
+
+To count the requests made by a logical operation and detect N+1 request
+patterns, i.e. the same endpoint requested repeatedly with different ids
+where a single (batch) request could have been used, see
+:meth:`~bioblend.galaxyclient.GalaxyClient.request_budget`.
+"""
+
+import os
+import re
+import sysconfig
+import threading
+import time
+import traceback
+import warnings
+from bisect import bisect_left
+from collections import (
+    Counter,
+    deque,
+)
+from typing import (
+    Any,
+    NamedTuple,
+    TYPE_CHECKING,
+)
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from bioblend.galaxyclient import RequestDescriptor
+
+# Upper bounds (in seconds) of the latency histogram buckets, the same as the
+# default ones of the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Path segments which are replaced by ``{id}`` in endpoint templates: encoded
+# Galaxy IDs, integers and UUIDs
+ID_SEGMENT_PATTERN = re.compile(r"[0-9a-f]{16,}|[0-9]+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+# Batch alternatives to requesting these endpoints once per id
+BATCH_ALTERNATIVES = {
+    ("GET", "/api/datasets/{id}"): "HistoryClient.show_history(history_id, contents=True, ids=..., keys=...)",
+    ("GET", "/api/histories/{id}/contents/{id}"): "HistoryClient.show_history(history_id, contents=True, ids=...)",
+    ("GET", "/api/histories/{id}"): "HistoryClient.get_histories(keys=...)",
+    ("GET", "/api/jobs/{id}"): "JobsClient.get_jobs(history_id=..., invocation_id=...)",
+    ("GET", "/api/invocations/{id}"): "InvocationClient.get_invocations(workflow_id=..., history_id=...)",
+    ("GET", "/api/workflows/{id}"): "WorkflowClient.get_workflows()",
+}
+
+_BIOBLEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_TESTS_DIR = os.path.join(_BIOBLEND_DIR, "_tests")
+_STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+
+
+def _split_url(url: str) -> tuple[str, tuple[str, ...]]:
+    """
+    Return the endpoint template of a URL and the ids it contains.
+    """
+    segments = urlsplit(url).path.split("/")
+    if "api" in segments:
+        segments = ["", *segments[segments.index("api") :]]
+    ids = []
+    for i, segment in enumerate(segments):
+        if ID_SEGMENT_PATTERN.fullmatch(segment):
+            ids.append(segment)
+            segments[i] = "{id}"
+    return "/".join(segments), tuple(ids)
+
+
+def endpoint_template(url: str) -> str:
+    """
+    Return the endpoint template of a URL, i.e. its path starting from the
+    ``/api`` segment, with the ID segments replaced by ``{id}``.
+
+    For example, the template of
+    ``https://usegalaxy.org/api/histories/f2db41e1fa331b3e/contents?deleted=true``
+    is ``/api/histories/{id}/contents``.
+    """
+    return _split_url(url)[0]
+
+
+class EndpointMetrics:
+    """
+    Metrics of the requests made with an HTTP method to an endpoint.
+    """
+
+    __slots__ = ("bucket_counts", "bytes_in", "bytes_out", "count", "retries", "status_codes", "total_time")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        # the last bucket counts the requests slower than all the bounds
+        self.bucket_counts = [0] * (n_buckets + 1)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.status_codes: Counter[int | None] = Counter()
+
+
+class Metrics:
+    """
+    Thread-safe collector of the number, latency, payload sizes, retries and
+    status codes of the HTTP requests, per HTTP method and endpoint template
+    (see :func:`endpoint_template`).
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """
+        :type buckets: tuple of float
+        :param buckets: Sorted upper bounds (in seconds) of the latency
+          histogram buckets
+        """
+        assert list(buckets) == sorted(buckets)
+        self.buckets = buckets
+        self._endpoints: dict[tuple[str, str], EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get_endpoint(self, method: str, url: str) -> EndpointMetrics:
+        key = (method, endpoint_template(url))
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = self._endpoints[key] = EndpointMetrics(len(self.buckets))
+        return endpoint
+
+    def record(
+        self, method: str, url: str, status_code: int | None, elapsed: float, bytes_out: int = 0, bytes_in: int = 0
+    ) -> None:
+        """
+        Record a request.
+
+        :type method: str
+        :param method: HTTP method, e.g. ``GET``
+
+        :type url: str
+        :param url: Request URL
+
+        :type status_code: int
+        :param status_code: Status code of the response, or ``None`` if no
+          response was received (e.g. because of a connection error)
+
+        :type elapsed: float
+        :param elapsed: Time (in seconds) taken by the request
+
+        :type bytes_out: int
+        :param bytes_out: Size (in bytes) of the request body
+
+        :type bytes_in: int
+        :param bytes_in: Size (in bytes) of the response body
+        """
+        with self._lock:
+            endpoint = self._get_endpoint(method, url)
+            endpoint.count += 1
+            endpoint.total_time += elapsed
+            endpoint.bucket_counts[bisect_left(self.buckets, elapsed)] += 1
+            endpoint.bytes_out += bytes_out
+            endpoint.bytes_in += bytes_in
+            endpoint.status_codes[status_code] += 1
+
+    def record_retry(self, method: str, url: str) -> None:
+        """
+        Record that a failed request is about to be retried.
+        """
+        with self._lock:
+            self._get_endpoint(method, url).retries += 1
+
+    def reset(self) -> None:
+        """
+        Discard all the recorded metrics.
+        """
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self) -> dict[tuple[str, str], dict[str, Any]]:
+        """
+        Get a copy of the recorded metrics.
+
+        :rtype: dict
+        :return: dictionary mapping ``(method, endpoint_template)`` tuples to
+          dictionaries with the following keys: ``count``, ``total_time``,
+          ``latency_buckets`` (mapping each bucket upper bound, including
+          ``float('inf')``, to the number of requests which took at most that
+          time), ``bytes_in``, ``bytes_out``, ``retries`` and
+          ``status_codes`` (mapping status codes, or ``None`` for requests
+          without a response, to the number of requests).
+        """
+        with self._lock:
+            snapshot = {}
+            for key, endpoint in sorted(self._endpoints.items()):
+                cumulative = 0
+                latency_buckets = {}
+                for bound, count in zip((*self.buckets, float("inf")), endpoint.bucket_counts):
+                    cumulative += count
+                    latency_buckets[bound] = cumulative
+                snapshot[key] = {
+                    "count": endpoint.count,
+                    "total_time": endpoint.total_time,
+                    "latency_buckets": latency_buckets,
+                    "bytes_in": endpoint.bytes_in,
+                    "bytes_out": endpoint.bytes_out,
+                    "retries": endpoint.retries,
+                    "status_codes": dict(endpoint.status_codes),
+                }
+            return snapshot
+
+    def to_prometheus(self, prefix: str = "bioblend", openmetrics: bool = False) -> str:
+        """
+        Export the recorded metrics in the Prometheus text exposition format.
+
+        :type prefix: str
+        :param prefix: Prefix of the metric names
+
+        :type openmetrics: bool
+        :param openmetrics: Whether to use the OpenMetrics text format instead
+
+        :rtype: str
+        :return: the metrics in text format
+        """
+        snapshot = self.snapshot()
+        lines: list[str] = []
+
+        def family(name: str, type_: str, help_: str) -> str:
+            # OpenMetrics counter families are named without the _total suffix
+            family_name = name.removesuffix("_total") if openmetrics and type_ == "counter" else name
+            lines.append(f"# HELP {family_name} {help_}")
+            lines.append(f"# TYPE {family_name} {type_}")
+            return name
+
+        name = family(f"{prefix}_requests_total", "counter", "Number of HTTP requests.")
+        for (method, endpoint), stats in snapshot.items():
+            for status_code, count in sorted(stats["status_codes"].items(), key=lambda _: str(_[0])):
+                status = "error" if status_code is None else str(status_code)
+                lines.append(f"{name}{_labels(method=method, endpoint=endpoint, status=status)} {count}")
+        name = family(f"{prefix}_request_duration_seconds", "histogram", "Duration of HTTP requests.")
+        for (method, endpoint), stats in snapshot.items():
+            for bound, count in stats["latency_buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{name}_bucket{_labels(method=method, endpoint=endpoint, le=le)} {count}")
+            labels = _labels(method=method, endpoint=endpoint)
+            lines.append(f"{name}_sum{labels} {stats['total_time']!r}")
+            lines.append(f"{name}_count{labels} {stats['count']}")
+        for key, metric, help_ in (
+            ("bytes_out", "request_bytes_total", "Size of the HTTP request bodies."),
+            ("bytes_in", "response_bytes_total", "Size of the HTTP response bodies."),
+            ("retries", "request_retries_total", "Number of retried HTTP requests."),
+        ):
+            name = family(f"{prefix}_{metric}", "counter", help_)
+            for (method, endpoint), stats in snapshot.items():
+                lines.append(f"{name}{_labels(method=method, endpoint=endpoint)} {stats[key]}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class RequestBudgetWarning(UserWarning):
+    """
+    Warning issued when an operation makes more requests than its budget.
+    """
+
+
+class NPlusOneWarning(UserWarning):
+    """
+    Warning issued when an endpoint is requested repeatedly with different
+    ids in a short time.
+    """
+
+
+class NPlusOne(NamedTuple):
+    """
+    N+1 request pattern detected by a :class:`RequestBudget`.
+    """
+
+    method: str
+    endpoint: str
+    #: Number of different ids requested within the detection window
+    n_ids: int
+    #: BioBlend function called by the user code, as ``file:line function``
+    api: str | None
+    #: User code calling BioBlend, as ``file:line function``
+    caller: str | None
+    #: Batch alternative to the repeated requests
+    suggestion: str
+
+
+class RequestBudget:
+    """
+    Request hook counting the requests of a logical operation, per HTTP
+    method and endpoint template, and detecting N+1 request patterns.
+
+    Usually created with
+    :meth:`~bioblend.galaxyclient.GalaxyClient.request_budget`.
+    """
+
+    def __init__(
+        self, name: str | None = None, max_requests: int | None = None, threshold: int = 5, window: float = 2.0
+    ) -> None:
+        """
+        :type name: str
+        :param name: Name of the operation, used in the warnings
+
+        :type max_requests: int
+        :param max_requests: Maximum number of requests expected for the
+          operation. A :class:`RequestBudgetWarning` is issued when it is
+          exceeded.
+
+        :type threshold: int
+        :param threshold: Number of requests to the same endpoint template
+          with different ids within ``window`` seconds above which a
+          :class:`NPlusOneWarning` is issued, once per endpoint template
+
+        :type window: float
+        :param window: Duration (in seconds) of the N+1 detection window
+        """
+        if threshold < 2:
+            raise ValueError(f"Threshold must be >= 2 (got: {threshold})")
+        self.name = name
+        self.max_requests = max_requests
+        self.threshold = threshold
+        self.window = window
+        self.total = 0
+        #: Number of requests per ``(method, endpoint_template)``
+        self.counts: Counter[tuple[str, str]] = Counter()
+        #: N+1 request patterns detected
+        self.n_plus_one: list[NPlusOne] = []
+        self._recent: dict[tuple[str, str], deque[tuple[float, tuple[str, ...]]]] = {}
+        self._reported: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, request: "RequestDescriptor") -> None:
+        template, ids = _split_url(request.url)
+        key = (request.method, template)
+        now = time.monotonic()
+        over_budget = n_plus_one_count = 0
+        with self._lock:
+            self.total += 1
+            self.counts[key] += 1
+            if self.max_requests is not None and self.total == self.max_requests + 1:
+                over_budget = self.total
+            if ids and key not in self._reported:
+                recent = self._recent.setdefault(key, deque())
+                recent.append((now, ids))
+                while recent[0][0] < now - self.window:
+                    recent.popleft()
+                n_distinct = len({_[1] for _ in recent})
+                if n_distinct >= self.threshold:
+                    n_plus_one_count = n_distinct
+                    self._reported.add(key)
+                    del self._recent[key]
+        if not (over_budget or n_plus_one_count):
+            return
+        caller_frame, api_frame = _find_caller()
+        caller, api = _format_frame(caller_frame), _format_frame(api_frame)
+        in_operation = f" in {self.name}" if self.name else ""
+        location = _location_message(caller, api)
+        if over_budget:
+            _warn(
+                f"Request budget of {self.max_requests} exceeded{in_operation} by {request.method} {template}{location}",
+                RequestBudgetWarning,
+                caller_frame,
+            )
+        if n_plus_one_count:
+            suggestion = BATCH_ALTERNATIVES.get(key) or f"a single request to {template.rsplit('/{id}', 1)[0]}"
+            with self._lock:
+                self.n_plus_one.append(NPlusOne(request.method, template, n_plus_one_count, api, caller, suggestion))
+            _warn(
+                f"Possible N+1 requests{in_operation}: {request.method} {template} requested with "
+                f"{n_plus_one_count} different ids within {self.window} s{location}; consider using {suggestion}",
+                NPlusOneWarning,
+                caller_frame,
+            )
+
+    def report(self) -> str:
+        """
+        Return a human-readable report of the requests made and of the N+1
+        patterns detected.
+        """
+        with self._lock:
+            lines = [f"{self.total} requests" + (f" in {self.name}" if self.name else "")]
+            lines.extend(f"  {count:6d} {method} {template}" for (method, template), count in self.counts.most_common())
+            for n_plus_one in self.n_plus_one:
+                lines.append(
+                    f"N+1: {n_plus_one.method} {n_plus_one.endpoint}{_location_message(n_plus_one.caller, n_plus_one.api)}"
+                    f" -> {n_plus_one.suggestion}"
+                )
+        return "\n".join(lines)
+
+
+def _in_library(filename: str) -> bool:
+    filename = os.path.abspath(filename)
+    if filename.startswith(_BIOBLEND_DIR + os.sep):
+        return not filename.startswith(_TESTS_DIR + os.sep)
+    return filename.startswith((_STDLIB_DIR + os.sep, "<"))
+
+
+def _find_caller() -> tuple[traceback.FrameSummary | None, traceback.FrameSummary | None]:
+    """
+    Return the innermost frame of the current stack which is outside BioBlend
+    and the standard library (i.e. the user code), and the outermost BioBlend
+    frame called by it.
+    """
+    api = None
+    for frame in reversed(traceback.extract_stack()):
+        if not _in_library(frame.filename):
+            return frame, api
+        if frame.filename.startswith(_BIOBLEND_DIR):
+            api = frame
+    # e.g. a request made in a worker thread
+    return None, api
+
+
+def _format_frame(frame: traceback.FrameSummary | None) -> str | None:
+    return f"{frame.filename}:{frame.lineno} {frame.name}" if frame else None
+
+
+def _location_message(caller: str | None, api: str | None) -> str:
+    if api and caller:
+        return f", from {api} called at {caller}"
+    if api or caller:
+        return f", from {api or caller}"
+    return ""
+
+
+def _warn(message: str, category: type[Warning], caller: traceback.FrameSummary | None) -> None:
+    if caller and caller.lineno is not None:
+        # report the warning at the user code calling BioBlend
+        warnings.warn_explicit(message, category, caller.filename, caller.lineno)
+    else:
+        warnings.warn(message, category, stacklevel=2)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+__all__ = (
+    "BATCH_ALTERNATIVES",
+    "DEFAULT_BUCKETS",
+    "EndpointMetrics",
+    "Metrics",
+    "NPlusOne",
+    "NPlusOneWarning",
+    "RequestBudget",
+    "RequestBudgetWarning",
+    "endpoint_template",
+)
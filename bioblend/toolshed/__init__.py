@@ -2,7 +2,10 @@
 A base representation of an instance of Tool Shed
 """
 
-from bioblend.galaxyclient import GalaxyClient
+from bioblend.galaxyclient import (
+    GalaxyClient,
+    Transport,
+)
 from bioblend.toolshed import (
     categories,
     repositories,
@@ -20,6 +23,7 @@ class ToolShedInstance(GalaxyClient):
         *,
         verify: bool = True,
         user_agent: str | None = None,
+        transport: Transport | None = None,
     ) -> None:
         """
         A base representation of a connection to a ToolShed instance, identified
@@ -59,8 +63,23 @@ class ToolShedInstance(GalaxyClient):
 
         :param verify: Whether to verify the server's TLS certificate
         :type verify: bool
+
+        :type transport: callable
+        :param transport: Transport used to send the requests, see
+                          :mod:`bioblend.transport`. It can also be assigned
+                          to the ``transport`` attribute later, but passing it
+                          here also covers the request made to get the API
+                          key from the email and password.
         """
-        super().__init__(url, key=key, email=email, password=password, verify=verify, user_agent=user_agent)
+        super().__init__(
+            url,
+            key=key,
+            email=email,
+            password=password,
+            verify=verify,
+            user_agent=user_agent,
+            transport=transport,
+        )
         self.categories = categories.ToolShedCategoryClient(self)
         self.repositories = repositories.ToolShedRepositoryClient(self)
         self.tools = tools.ToolShedToolClient(self)
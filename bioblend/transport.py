@@ -0,0 +1,263 @@
+"""
+Transports used by ``GalaxyClient`` to send HTTP requests, including ones to
+record the interactions with a Galaxy (or Tool Shed) server to a cassette
+file and to replay them later without a server.
+
+A transport is a callable with the same signature as ``requests.request``.
+To use one, assign it to the ``transport`` attribute of a ``GalaxyInstance``
+(or ``ToolShedInstance``)::
+
+    from bioblend.transport import RecordingTransport, ReplayTransport
+
+    with RecordingTransport("workflow_run.json.gz") as gi.transport:
+        ...  # interact with a real Galaxy server
+
+and later, possibly with a newer BioBlend version::
+
+    gi.transport = ReplayTransport("workflow_run.json.gz")
+    ...  # same code as above, no Galaxy server needed
+
+When connecting with an email and password instead of an API key, pass the
+transport to the ``GalaxyInstance`` constructor, so that the request made to
+get the API key also goes through it::
+
+    gi = GalaxyInstance(url, email=email, password=password, transport=ReplayTransport("workflow_run.json.gz"))
+
+Responses are replayed in the order in which they were recorded for each
+request, so that e.g. polling a job gives the same sequence of states. This
+can be combined with ``bioblend.metrics`` to compare the number of requests
+made by different versions of the client code.
+
+Requests made by the tus uploader do not go through the transport and are
+neither recorded nor replayed.
+"""
+
+import base64
+import gzip
+import io
+import json
+import threading
+import time
+from collections import (
+    defaultdict,
+    deque,
+)
+from collections.abc import Callable
+from typing import (
+    Any,
+    IO,
+)
+from urllib.parse import (
+    parse_qsl,
+    urlencode,
+    urlsplit,
+)
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from typing_extensions import Self
+
+CASSETTE_VERSION = 1
+# Response headers stored in cassettes, the others are dropped to keep them
+# compact
+RECORDED_HEADERS = (
+    "Content-Disposition",
+    "Content-Length",
+    "Content-Type",
+    "Location",
+    "Upload-Offset",
+)
+
+
+# Path of the API endpoint returning the API key for an email and password,
+# whose responses are recorded with REDACTED_API_KEY instead
+BASEAUTH_PATH = "/api/authenticate/baseauth"
+REDACTED_API_KEY = "redacted"
+
+
+class CassetteError(Exception):
+    """
+    Raised when no recorded interaction matches a replayed request.
+    """
+
+
+def _open(path: str, write: bool = False) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt" if write else "rt", encoding="utf-8")
+    return open(path, "w" if write else "r", encoding="utf-8")
+
+
+def _request_key(method: str, url: str, params: Any, data: Any, match_body: bool) -> tuple[str, str, str | None]:
+    """
+    Return the key used to match a request with the recorded interactions:
+    the HTTP method, the URL path with the sorted query parameters (without
+    scheme and host), and the body.
+    """
+    prepared_url = requests.Request(method, url, params=params).prepare().url
+    assert prepared_url
+    split_url = urlsplit(prepared_url)
+    path = split_url.path
+    if split_url.query:
+        path += "?" + urlencode(sorted(parse_qsl(split_url.query, keep_blank_values=True)))
+    body = None
+    if match_body:
+        if isinstance(data, bytes):
+            body = data.decode("utf-8", errors="replace")
+        elif isinstance(data, str):
+            body = data
+    return method.upper(), path, body
+
+
+def _encode_body(content: bytes) -> dict[str, str]:
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(response: dict[str, Any]) -> bytes:
+    if "body_base64" in response:
+        return base64.b64decode(response["body_base64"])
+    return response["body"].encode("utf-8")
+
+
+class RecordingTransport:
+    """
+    Transport sending the requests with another transport (by default
+    ``requests.request``) and recording the interactions, which are written
+    to the cassette file by :meth:`save` or on exiting the ``with`` block.
+
+    The request headers, which contain the API key, are not recorded, nor is
+    the API key returned when authenticating with an email and password.
+    """
+
+    def __init__(self, path: str, transport: Callable[..., requests.Response] | None = None) -> None:
+        """
+        :type path: str
+        :param path: Path of the cassette file, which is compressed with gzip
+          if it ends with ``.gz``
+
+        :type transport: callable
+        :param transport: Transport used to send the requests, with the same
+          signature as ``requests.request``
+        """
+        self.path = path
+        self.transport = transport
+        self.interactions: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        transport = self.transport or requests.request
+        start = time.perf_counter()
+        r = transport(method, url, **kwargs)
+        # read the whole body, also for streamed responses, which are then
+        # served from memory
+        content = r.content
+        elapsed = time.perf_counter() - start
+        method, path, body = _request_key(method, url, kwargs.get("params"), kwargs.get("data"), True)
+        if path.endswith(BASEAUTH_PATH):
+            # do not record the API key obtained with the email and password
+            content = json.dumps({"api_key": REDACTED_API_KEY}).encode("utf-8")
+        interaction = {
+            "request": {"method": method, "url": path, "body": body},
+            "response": {
+                "status_code": r.status_code,
+                "headers": {k: r.headers[k] for k in RECORDED_HEADERS if k in r.headers},
+                **_encode_body(content),
+            },
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+        return r
+
+    def save(self) -> None:
+        """
+        Write the recorded interactions to the cassette file.
+        """
+        with self._lock:
+            cassette = {"version": CASSETTE_VERSION, "interactions": self.interactions}
+        with _open(self.path, write=True) as f:
+            json.dump(cassette, f, separators=(",", ":"))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.save()
+
+
+class ReplayTransport:
+    """
+    Transport replaying the interactions recorded in a cassette file, without
+    making any actual HTTP request.
+
+    A :class:`CassetteError` is raised if a request does not match any of the
+    interactions left to replay.
+    """
+
+    def __init__(self, path: str, time_scale: float = 0.0, match_body: bool = True) -> None:
+        """
+        :type path: str
+        :param path: Path of the cassette file
+
+        :type time_scale: float
+        :param time_scale: Factor applied to the recorded duration of each
+          request to get the time to wait before returning its response, e.g.
+          ``1`` to replay at the recorded speed, ``0.5`` to replay twice as
+          fast. The default ``0`` replays without waiting.
+
+        :type match_body: bool
+        :param match_body: Whether the request bodies must also match the
+          recorded ones
+        """
+        if time_scale < 0:
+            raise ValueError(f"Time scale must be >= 0 (got: {time_scale})")
+        self.time_scale = time_scale
+        self.match_body = match_body
+        with _open(path) as f:
+            cassette = json.load(f)
+        if cassette.get("version") != CASSETTE_VERSION:
+            raise CassetteError(f"Unsupported cassette version: {cassette.get('version')}")
+        self._interactions: defaultdict[tuple[str, str, str | None], deque[dict[str, Any]]] = defaultdict(deque)
+        for interaction in cassette["interactions"]:
+            request = interaction["request"]
+            body = request["body"] if match_body else None
+            self._interactions[(request["method"], request["url"], body)].append(interaction)
+        self.replayed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        """
+        Number of recorded interactions not replayed yet.
+        """
+        with self._lock:
+            return sum(len(_) for _ in self._interactions.values())
+
+    def __call__(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        key = _request_key(method, url, kwargs.get("params"), kwargs.get("data"), self.match_body)
+        with self._lock:
+            interactions = self._interactions.get(key)
+            if not interactions:
+                raise CassetteError(f"No recorded interaction left for {key[0]} {key[1]}")
+            interaction = interactions.popleft()
+            self.replayed += 1
+        if self.time_scale:
+            time.sleep(interaction["elapsed"] * self.time_scale)
+        response = interaction["response"]
+        r = requests.Response()
+        r.status_code = response["status_code"]
+        r.headers = CaseInsensitiveDict(response["headers"])
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+        # the body is read lazily from raw, so that streaming works as usual
+        r.raw = io.BytesIO(_decode_body(response))
+        r.url = url
+        return r
+
+
+__all__ = (
+    "CassetteError",
+    "RecordingTransport",
+    "ReplayTransport",
+)
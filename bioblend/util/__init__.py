@@ -1,4 +1,9 @@
+import io
 import os
+from collections.abc import (
+    Callable,
+    Iterable,
+)
 from typing import (
     Any,
     IO,
@@ -34,6 +39,161 @@ def attach_file(path: str, name: str | None = None) -> FileStream:
     return FileStream(name, open(path, "rb"))
 
 
+class _ChunksReader(io.RawIOBase):
+    """
+    Read-only binary file object over an iterable of bytes chunks.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._chunk:
+            try:
+                self._chunk = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self._chunk))
+        buffer[:n] = self._chunk[:n]
+        self._chunk = self._chunk[n:]
+        return n
+
+
+def chunks_reader(chunks: Iterable[bytes], buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> IO[bytes]:
+    """
+    Wrap an iterable of bytes chunks (e.g. the ``iter_content()`` of a
+    streamed ``requests.Response``) in a read-only binary file object, to
+    process a download as it arrives.
+
+    :type chunks: iterable
+    :param chunks: Chunks of bytes
+
+    :type buffer_size: int
+    :param buffer_size: Size (in bytes) of the read buffer
+
+    :rtype: file
+    :return: Binary file object reading the concatenated chunks
+    """
+    return io.BufferedReader(_ChunksReader(chunks), buffer_size=buffer_size)
+
+
+def _safe_path(root: str, name: str) -> str:
+    """
+    Return the path of an archive member ``name`` extracted to directory
+    ``root``, raising ``ValueError`` if it would end up outside of ``root``.
+    """
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Archive member {name!r} would be extracted outside of {root!r}")
+    return path
+
+
+def extract_tar(
+    fileobj: IO[bytes],
+    path: str,
+    buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+    select: Callable[[str], bool] | None = None,
+) -> list[str]:
+    """
+    Extract a (possibly compressed) tar archive while reading it sequentially
+    from a file object, so that it can be streamed without being saved first.
+
+    Only regular files and directories are extracted, other members (e.g.
+    links) are skipped. File permissions and modification times are not
+    restored.
+
+    :type fileobj: file
+    :param fileobj: Binary file object to read the archive from
+
+    :type path: str
+    :param path: Directory to extract the archive to, created if needed
+
+    :type buffer_size: int
+    :param buffer_size: Size (in bytes) of the blocks in which the files are
+      written
+
+    :type select: callable
+    :param select: If provided, only the files for whose archive member name
+      this function returns ``True`` are extracted
+
+    :rtype: list of str
+    :return: Paths of the extracted files
+    """
+    import shutil
+    import tarfile
+
+    root = os.path.realpath(path)
+    os.makedirs(root, exist_ok=True)
+    extracted = []
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            if member.isdir():
+                if select is None:
+                    os.makedirs(_safe_path(root, member.name), exist_ok=True)
+            elif member.isfile() and (select is None or select(member.name)):
+                member_path = _safe_path(root, member.name)
+                os.makedirs(os.path.dirname(member_path), exist_ok=True)
+                member_file = tar.extractfile(member)
+                assert member_file
+                with member_file, open(member_path, "wb") as f:
+                    shutil.copyfileobj(member_file, f, buffer_size)
+                extracted.append(member_path)
+    return extracted
+
+
+def extract_zip(
+    fileobj: IO[bytes],
+    path: str,
+    buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+    select: Callable[[str], bool] | None = None,
+) -> list[str]:
+    """
+    Extract a zip archive while reading it sequentially from a file object,
+    so that it can be streamed without being saved first.
+
+    Unlike :mod:`zipfile`, the central directory at the end of the archive is
+    not used, the entries are read from their local headers. Only stored and
+    deflated entries are supported.
+
+    :type fileobj: file
+    :param fileobj: Binary file object to read the archive from
+
+    :type path: str
+    :param path: Directory to extract the archive to, created if needed
+
+    :type buffer_size: int
+    :param buffer_size: Size (in bytes) of the blocks in which the archive is
+      read
+
+    :type select: callable
+    :param select: If provided, only the files for whose archive entry name
+      this function returns ``True`` are extracted
+
+    :rtype: list of str
+    :return: Paths of the extracted files
+    """
+    from bioblend.util._zip import ZipStream
+
+    root = os.path.realpath(path)
+    os.makedirs(root, exist_ok=True)
+    extracted = []
+    for name, content in ZipStream(fileobj, buffer_size).entries():
+        if name.endswith("/"):
+            if select is None:
+                os.makedirs(_safe_path(root, name), exist_ok=True)
+        elif select is None or select(name):
+            member_path = _safe_path(root, name)
+            os.makedirs(os.path.dirname(member_path), exist_ok=True)
+            with open(member_path, "wb") as f:
+                f.writelines(content)
+            extracted.append(member_path)
+    return extracted
+
+
 T = TypeVar("T")
 
 
@@ -58,4 +218,7 @@ def abstractclass(decorated_cls: type[T]) -> type[T]:
 __all__ = (
     "abstractclass",
     "attach_file",
+    "chunks_reader",
+    "extract_tar",
+    "extract_zip",
 )
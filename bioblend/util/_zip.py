@@ -0,0 +1,195 @@
+"""
+Sequential reader of zip archives, imported only when one is extracted.
+"""
+
+import collections
+import struct
+import zipfile
+import zlib
+from collections.abc import Iterator
+from typing import IO
+
+_ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_ZIP_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+# Signatures of the central directory records following the entries
+_ZIP_END_SIGNATURES = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06")
+# Size of the first read of an entry whose size is unknown, doubled up to the
+# buffer size for the next reads, so that the data read past the end of small
+# entries stays small
+_INITIAL_READ_SIZE = 16 * 1024
+
+
+class ZipStream:
+    """
+    Sequential reader of the entries of a zip archive, using only their local
+    headers, so that the archive does not need to be seekable.
+    """
+
+    def __init__(self, fileobj: IO[bytes], buffer_size: int) -> None:
+        self.fileobj = fileobj
+        self.buffer_size = buffer_size
+        # Data read ahead and put back, as views so that taking a few bytes
+        # from the front does not copy the rest
+        self._pending: collections.deque[memoryview] = collections.deque()
+
+    def read(self, n: int) -> bytes:
+        """
+        Read up to ``n`` bytes, returning fewer bytes only at the end of the
+        archive.
+        """
+        parts: list[bytes | memoryview] = []
+        while n and self._pending:
+            view = self._pending.popleft()
+            if len(view) > n:
+                self._pending.appendleft(view[n:])
+                view = view[:n]
+            parts.append(view)
+            n -= len(view)
+        while n:
+            block = self.fileobj.read(n)
+            if not block:
+                break
+            parts.append(block)
+            n -= len(block)
+        return b"".join(parts)
+
+    def read_exact(self, n: int) -> bytes:
+        data = self.read(n)
+        if len(data) < n:
+            raise zipfile.BadZipFile("Truncated zip archive")
+        return data
+
+    def unread(self, data: bytes | memoryview) -> None:
+        if data:
+            self._pending.appendleft(memoryview(data))
+
+    def entries(self) -> Iterator[tuple[str, Iterator[bytes]]]:
+        """
+        Yield the name of each entry of the archive and an iterator over its
+        uncompressed content, which must be consumed before getting the next
+        entry.
+        """
+        while True:
+            signature = self.read(4)
+            if not signature or signature in _ZIP_END_SIGNATURES:
+                return
+            if signature != _ZIP_LOCAL_HEADER_SIGNATURE:
+                raise zipfile.BadZipFile("Bad signature of zip entry")
+            flags, method, crc, compressed_size, size, name_length, extra_length = struct.unpack(
+                "<2xHH4xLLLHH", self.read_exact(26)
+            )
+            name = self.read_exact(name_length).decode("utf-8" if flags & 0x800 else "cp437")
+            zip64 = False
+            extra = self.read_exact(extra_length)
+            while len(extra) >= 4:
+                header_id, data_size = struct.unpack("<HH", extra[:4])
+                if header_id == 0x0001:
+                    zip64 = True
+                    # the field contains only the sizes which do not fit in
+                    # the header, in this order
+                    offset = 4
+                    if size == 0xFFFFFFFF:
+                        (size,) = struct.unpack_from("<Q", extra, offset)
+                        offset += 8
+                    if compressed_size == 0xFFFFFFFF:
+                        (compressed_size,) = struct.unpack_from("<Q", extra, offset)
+                extra = extra[4 + data_size :]
+            if flags & 0x1:
+                raise zipfile.BadZipFile(f"Encrypted zip entry {name!r} is not supported")
+            if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                raise zipfile.BadZipFile(f"Compression method {method} of zip entry {name!r} is not supported")
+            if flags & 0x8:
+                if method == zipfile.ZIP_STORED:
+                    content = self._stored_with_descriptor(name, zip64)
+                else:
+                    content = self._deflated_with_descriptor(name, zip64)
+            else:
+                content = self._content(name, method, crc, compressed_size, size)
+            yield name, content
+            # skip the content if not consumed by the caller
+            for _ in content:
+                pass
+
+    def _content(self, name: str, method: int, crc: int, compressed_size: int, size: int) -> Iterator[bytes]:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == zipfile.ZIP_DEFLATED else None
+        actual_crc = actual_size = 0
+        left = compressed_size
+        while left:
+            block = self.read_exact(min(left, self.buffer_size))
+            left -= len(block)
+            if decompressor:
+                block = decompressor.decompress(block)
+            actual_crc = zlib.crc32(block, actual_crc)
+            actual_size += len(block)
+            yield block
+        if decompressor:
+            block = decompressor.flush()
+            actual_crc = zlib.crc32(block, actual_crc)
+            actual_size += len(block)
+            yield block
+        if (actual_crc, actual_size) != (crc, size):
+            raise zipfile.BadZipFile(f"Bad CRC-32 or size of zip entry {name!r}")
+
+    def _read_descriptor(self, zip64: bool) -> tuple[int, int, int]:
+        size_format = "Q" if zip64 else "L"
+        descriptor_format = f"<L{size_format}{size_format}"
+        signature = self.read_exact(4)
+        if signature != _ZIP_DESCRIPTOR_SIGNATURE:
+            # the signature of the data descriptor is optional
+            self.unread(signature)
+        return struct.unpack(descriptor_format, self.read_exact(struct.calcsize(descriptor_format)))
+
+    def _deflated_with_descriptor(self, name: str, zip64: bool) -> Iterator[bytes]:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        actual_crc = actual_size = compressed_size = 0
+        read_size = min(_INITIAL_READ_SIZE, self.buffer_size)
+        while not decompressor.eof:
+            block = self.read(read_size)
+            read_size = min(2 * read_size, self.buffer_size)
+            if not block:
+                raise zipfile.BadZipFile("Truncated zip archive")
+            data = decompressor.decompress(block)
+            compressed_size += len(block) - len(decompressor.unused_data)
+            actual_crc = zlib.crc32(data, actual_crc)
+            actual_size += len(data)
+            yield data
+        self.unread(decompressor.unused_data)
+        if self._read_descriptor(zip64) != (actual_crc, compressed_size, actual_size):
+            raise zipfile.BadZipFile(f"Bad CRC-32 or size of zip entry {name!r}")
+
+    def _stored_with_descriptor(self, name: str, zip64: bool) -> Iterator[bytes]:
+        # The size of the entry is unknown, so its end is found by looking for
+        # a data descriptor (with signature) matching the data read so far
+        descriptor_length = 24 if zip64 else 16
+        descriptor_format = "<4xLQQ" if zip64 else "<4xLLL"
+        actual_crc = actual_size = 0
+        buf = b""
+        read_size = min(_INITIAL_READ_SIZE, self.buffer_size)
+        while True:
+            block = self.read(read_size)
+            read_size = min(2 * read_size, self.buffer_size)
+            if not block:
+                raise zipfile.BadZipFile(f"Data descriptor of zip entry {name!r} not found")
+            buf += block
+            start = 0
+            safe = len(buf) - len(_ZIP_DESCRIPTOR_SIGNATURE) + 1
+            while (position := buf.find(_ZIP_DESCRIPTOR_SIGNATURE, start)) != -1:
+                if len(buf) < position + descriptor_length:
+                    # wait for more data to check this candidate descriptor
+                    safe = min(safe, position)
+                    break
+                crc, compressed_size, size = struct.unpack(
+                    descriptor_format, buf[position : position + descriptor_length]
+                )
+                data = buf[:position]
+                if crc == zlib.crc32(data, actual_crc) and compressed_size == size == actual_size + position:
+                    yield data
+                    self.unread(memoryview(buf)[position + descriptor_length :])
+                    return
+                start = position + 1
+            if safe > 0:
+                data = buf[:safe]
+                actual_crc = zlib.crc32(data, actual_crc)
+                actual_size += safe
+                buf = buf[safe:]
+                yield data